@@ -0,0 +1,35 @@
+"""Add generation_jobs.owner / lease_expires_at
+
+Revision ID: a7c3e9d15b48
+Revises: f3b8d61a9c42
+Create Date: 2026-10-18 10:42:19.604127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9d15b48'
+down_revision: Union[str, None] = 'f3b8d61a9c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('generation_jobs', sa.Column('owner', sa.String(length=100), nullable=True))
+    op.add_column('generation_jobs', sa.Column('lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_generation_jobs_status_lease',
+        'generation_jobs',
+        ['status', 'lease_expires_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generation_jobs_status_lease', table_name='generation_jobs')
+    op.drop_column('generation_jobs', 'lease_expires_at')
+    op.drop_column('generation_jobs', 'owner')
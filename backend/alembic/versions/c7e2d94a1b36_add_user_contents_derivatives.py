@@ -0,0 +1,26 @@
+"""Add derivatives column to user_contents
+
+Revision ID: c7e2d94a1b36
+Revises: b1fac52e0cd8
+Create Date: 2026-10-17 20:40:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2d94a1b36'
+down_revision: Union[str, None] = 'b1fac52e0cd8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_contents', sa.Column('derivatives', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user_contents', 'derivatives')
@@ -0,0 +1,41 @@
+"""Add generation_jobs.user_id
+
+Revision ID: c9d2f4a6b813
+Revises: a7c3e9d15b48
+Create Date: 2026-10-18 14:05:37.218406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d2f4a6b813'
+down_revision: Union[str, None] = 'a7c3e9d15b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('generation_jobs', sa.Column('user_id', sa.String(length=36), nullable=True))
+    op.create_foreign_key(
+        'fk_generation_jobs_user_id',
+        'generation_jobs', 'users',
+        ['user_id'], ['user_id'],
+        ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_generation_jobs_user_id'), 'generation_jobs', ['user_id'], unique=False)
+    # 기존 작업은 콘텐츠 소유자가 제출한 것으로 채움 (이전에는 본인 콘텐츠만 제출 가능)
+    op.execute(
+        "UPDATE generation_jobs SET user_id = ("
+        "SELECT user_contents.user_id FROM user_contents "
+        "WHERE user_contents.content_id = generation_jobs.content_id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_generation_jobs_user_id'), table_name='generation_jobs')
+    op.drop_constraint('fk_generation_jobs_user_id', 'generation_jobs', type_='foreignkey')
+    op.drop_column('generation_jobs', 'user_id')
@@ -0,0 +1,45 @@
+"""Add generation_cache table and generation_jobs.seed
+
+Revision ID: e91b3c5d7f20
+Revises: d4a8f0c6e2b1
+Create Date: 2026-10-17 21:31:05.772914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91b3c5d7f20'
+down_revision: Union[str, None] = 'd4a8f0c6e2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('generation_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('source_hash', sa.String(length=64), nullable=False),
+    sa.Column('style', sa.String(length=50), nullable=False),
+    sa.Column('prompt', sa.Text(), nullable=False),
+    sa.Column('num_inference_steps', sa.Integer(), nullable=False),
+    sa.Column('aspect_ratio', sa.String(length=20), nullable=False),
+    sa.Column('seed', sa.Integer(), nullable=True),
+    sa.Column('result_url', sa.String(length=1000), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.Column('hit_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('last_hit_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(op.f('ix_generation_cache_source_hash'), 'generation_cache', ['source_hash'], unique=False)
+    op.add_column('generation_jobs', sa.Column('seed', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('generation_jobs', 'seed')
+    op.drop_index(op.f('ix_generation_cache_source_hash'), table_name='generation_cache')
+    op.drop_table('generation_cache')
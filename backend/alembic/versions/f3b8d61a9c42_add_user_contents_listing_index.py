@@ -0,0 +1,31 @@
+"""Add (user_id, created_at DESC, content_id DESC) index on user_contents
+
+Revision ID: f3b8d61a9c42
+Revises: e91b3c5d7f20
+Create Date: 2026-10-17 22:14:37.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d61a9c42'
+down_revision: Union[str, None] = 'e91b3c5d7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_user_contents_user_created',
+        'user_contents',
+        ['user_id', sa.text('created_at DESC'), sa.text('content_id DESC')],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_contents_user_created', table_name='user_contents')
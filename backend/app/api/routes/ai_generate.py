@@ -1,47 +1,60 @@
 """
 /api/v1/generate-ad 엔드포인트
 이미 업로드된 콘텐츠(content_id)로 AI 광고 생성
+/api/v1/generate-ad/styles - 여러 스타일 동시 생성 (끝나는 순서대로 NDJSON 스트리밍)
+/api/v1/generate-ad/jobs - 비동기 작업으로 제출 (즉시 job_id 반환, /api/v1/jobs/{job_id} 로 조회)
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Form
-from sqlalchemy.orm import Session
-from PIL import Image
-import io
+from fastapi import APIRouter, HTTPException, Depends, Form, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
 import time
-import uuid
 import logging
 from typing import Optional
 
-from app.db.base import get_db
+from app.api.routes.auth import get_current_user_id, get_requester_key
+from app.db.base import get_async_db
 from app.models.schemas import UserContent
-from app.services.ai.replicate_generator import ReplicateBackgroundGenerator
-from app.services.ai.style_prompts import StylePrompts
-from app.core.storage import download_from_gcs, upload_to_gcs
+from app.schemas.job import JobSubmitResponse
+from app.services.ai.generation import (
+    STYLE_MAP,
+    GenerationError,
+    generate_ad,
+    generate_ad_styles,
+    load_source
+)
+from app.services.ai.generation_cache import MAX_SEED
+from app.services.ai.generation_jobs import create_job
 
 logger = logging.getLogger(__name__)
 
-# Replicate Generator (싱글톤)
-replicate_generator = None
 
-def get_replicate_generator() -> ReplicateBackgroundGenerator:
-    """Get or create Replicate generator instance"""
-    global replicate_generator
-    if replicate_generator is None:
-        from config import settings
-        logger.info("Initializing ReplicateBackgroundGenerator...")
-        api_token = settings.REPLICATE_API_TOKEN
-        replicate_generator = ReplicateBackgroundGenerator(api_token=api_token)
-    return replicate_generator
+router = APIRouter()
 
 
-router = APIRouter()
+async def get_content_or_404(db: AsyncSession, content_id: str) -> UserContent:
+    """
+    콘텐츠 조회 후 조회 트랜잭션 종료
+    (생성은 수 초 ~ 수십 초 걸리므로 그동안 커넥션을 풀에 돌려줌, expire_on_commit=False → 속성 유지)
+    """
+    content = (await db.execute(
+        select(UserContent).where(UserContent.content_id == content_id)
+    )).scalar_one_or_none()
+    await db.commit()
+    if not content:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return content
 
 
 @router.post("/generate-ad")
 async def generate_ad_from_content(
     content_id: str = Form(..., description="업로드된 콘텐츠 ID"),
     style: str = Form(default="minimal", description="스타일: vintage, modern, minimal, natural, luxury"),
-    db: Session = Depends(get_db)
+    seed: Optional[int] = Form(default=None, ge=0, le=MAX_SEED, description="생성 시드 (없으면 이미지 + 스타일로 결정, 같은 시드는 캐시된 결과 재사용 / 다른 결과는 다른 시드로)"),
+    requester: str = Depends(get_requester_key),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     이미 업로드된 콘텐츠로 AI 광고 생성
@@ -51,123 +64,154 @@ async def generate_ad_from_content(
     2. GCS에서 원본 이미지 다운로드
     3. 스타일에 맞는 프롬프트 생성
     4. AI 배경 생성 (Replicate SDXL)
-    5. 결과를 GCS에 저장
+    5. 결과를 GCS에 저장 (출력 스트림 그대로, 필요 시에만 JPEG 변환)
     6. URL 반환
     
+    동시 생성 수는 요청자별로 제한 (로그인 시 사용자, 아니면 클라이언트 IP)
+    
     Args:
         content_id: 업로드된 콘텐츠 ID
         style: AI 스타일 (vintage/modern/minimal/natural/luxury)
+        seed: 생성 시드 (선택, 없으면 이미지 + 스타일로 결정)
     
     Returns:
         result_url: 생성된 이미지 GCS URL
         processing_time: 처리 시간 (초)
+        seed: 사용한 시드 (같은 시드로 다시 요청하면 캐시된 결과)
+        cached: 캐시된 결과 여부 (같은 이미지 + 스타일 + 시드)
+        input_payload: Replicate 입력 전송 방식, 크기, 인코딩 시간 (캐시 적중 시 null)
+        output: 출력 저장 포맷, 크기, JPEG 변환 여부 (캐시 적중 시 null)
     """
     start_time = time.time()
     
     try:
         # 1. 콘텐츠 조회 (✅ UserContent 모델 사용)
-        content = db.query(UserContent).filter(UserContent.content_id == content_id).first()
-        if not content:
-            raise HTTPException(status_code=404, detail="Content not found")
-        
-        logger.info(f"[AI Generate] Starting for content_id={content_id}, style={style}")
-        
-        # 2. GCS에서 원본 이미지 다운로드
-        # image_url 예: https://storage.googleapis.com/bucket-name/uploads/xxx.jpg
-        # 또는 /uploads/xxx.jpg (로컬)
-        
-        image_url = content.image_url
-        if not image_url:
-            raise HTTPException(status_code=400, detail="No image URL in content")
-        
-        # GCS 경로 추출
-        if image_url.startswith('http'):
-            # https://storage.googleapis.com/bucket-name/uploads/xxx.jpg
-            # → uploads/xxx.jpg
-            gcs_path = '/'.join(image_url.split('/')[-2:])
-        else:
-            # /uploads/xxx.jpg → uploads/xxx.jpg
-            gcs_path = image_url.lstrip('/')
-        
-        logger.info(f"[AI Generate] Downloading from GCS: {gcs_path}")
-        
-        # GCS에서 다운로드
-        image_bytes = download_from_gcs(gcs_path)
-        original_image = Image.open(io.BytesIO(image_bytes))
-        
-        logger.info(f"[AI Generate] Image loaded: {original_image.size}")
-        
-        # 3. 스타일 프롬프트 생성
-        # 스타일 매핑 (프론트엔드 → 백엔드)
-        style_map = {
-            'minimal': 'minimal',
-            'vintage': 'emotional',
-            'modern': 'street',
-            'natural': 'emotional',
-            'luxury': 'minimal'
-        }
+        content = await get_content_or_404(db, content_id)
         
-        mapped_style = style_map.get(style.lower(), 'minimal')
-        prompt_dict = StylePrompts.get_prompt(mapped_style)
-        prompt = prompt_dict.get('positive', '')
-        
-        logger.info(f"[AI Generate] Style: {style} → {mapped_style}")
-        logger.info(f"[AI Generate] Prompt: {prompt}")
-        
-        # 4. AI 배경 생성
-        generator = get_replicate_generator()
-        
-        # 스타일에 맞는 프롬프트로 생성
-        result_image = generator.generate_background(
-            product_image=original_image,
-            prompt_text=prompt,
-            aspect_ratio='square',
-            style=mapped_style
-        )
-        
-        logger.info(f"[AI Generate] Background generated: {result_image.size}")
-        
-        # 5. GCS에 업로드
-        # 파일명: ai_generated/style_contentid_timestamp.jpg
-        timestamp = int(time.time())
-        filename = f"ai_generated/{style}_{content_id}_{timestamp}.jpg"
-        
-        # 이미지를 바이트로 변환
-        img_byte_arr = io.BytesIO()
-        result_image.save(img_byte_arr, format='JPEG', quality=95)
-        img_byte_arr.seek(0)
-        
-        # GCS 업로드
-        result_url = upload_to_gcs(
-            file_data=img_byte_arr.getvalue(),
-            destination_path=filename,
-            content_type='image/jpeg'
-        )
+        # 2~5. 다운로드 → 프롬프트 → 배경 생성 → 업로드
+        result = await generate_ad(content, style, seed=seed, limit_key=requester)
         
         # 처리 시간
         processing_time = time.time() - start_time
         
         logger.info(f"[AI Generate] Completed in {processing_time:.2f}s")
-        logger.info(f"[AI Generate] Result URL: {result_url}")
         
         return {
             "success": True,
-            "result_url": result_url,
+            "result_url": result["result_url"],
             "processing_time": round(processing_time, 2),
             "style": style,
             "content_id": content_id,
-            "prompt": prompt,
-            "dimensions": {
-                "width": result_image.width,
-                "height": result_image.height
-            }
+            "prompt": result["prompt"],
+            "seed": result["seed"],
+            "dimensions": result["dimensions"],
+            "cached": result["cached"],
+            "input_payload": result["input_payload"],
+            "output": result["output"]
         }
         
     except HTTPException:
         raise
+    except GenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
     except Exception as e:
         logger.error(f"[AI Generate] Error: {e}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"AI 생성 중 오류 발생: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/generate-ad/styles")
+async def generate_ad_all_styles(
+    content_id: str = Form(..., description="업로드된 콘텐츠 ID"),
+    styles: str = Form(default=",".join(STYLE_MAP), description="쉼표로 구분한 스타일 목록 (기본: 전체)"),
+    seed: Optional[int] = Form(default=None, ge=0, le=MAX_SEED, description="생성 시드 (모든 스타일 공통, 없으면 스타일별로 이미지 + 스타일로 결정)"),
+    requester: str = Depends(get_requester_key),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    한 콘텐츠로 여러 스타일을 동시에 생성 (스타일 미리보기용)
+    
+    스타일마다 /generate-ad 를 호출하면 콘텐츠 조회, 다운로드, 디코드,
+    리사이즈, base64 인코딩이 스타일 수만큼 반복됨 → 한 번만 실행하고
+    prediction 은 GENERATION_FANOUT_CONCURRENCY 개까지 동시에 실행
+    
+    Response (application/x-ndjson, 끝나는 순서대로 한 줄씩):
+        {"success": true, "style": ..., "result_url": ..., "cached": ..., "processing_time": ...}
+        {"success": false, "style": ..., "error": ..., "status_code": 503}
+        {"done": true, "total": 5, "succeeded": 5, "processing_time": ...}
+    """
+    start_time = time.time()
+    
+    requested = [s.strip().lower() for s in styles.split(",") if s.strip()]
+    unknown = [s for s in requested if s not in STYLE_MAP]
+    if not requested or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown styles: {unknown}. Available: {list(STYLE_MAP)}"
+        )
+    # 순서 유지 중복 제거
+    requested = list(dict.fromkeys(requested))
+    
+    content = await get_content_or_404(db, content_id)
+    
+    # 스트리밍 시작 전에 다운로드 (실패 시 일반 에러 응답)
+    try:
+        source = await load_source(content)
+    except GenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    
+    logger.info(f"[AI Generate] Fan-out for content_id={content_id}, styles={requested}")
+    
+    async def result_stream():
+        succeeded = 0
+        async for result in generate_ad_styles(content_id, source, requested, seed=seed, limit_key=requester):
+            succeeded += result["success"]
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        
+        processing_time = time.time() - start_time
+        logger.info(f"[AI Generate] Fan-out completed in {processing_time:.2f}s ({succeeded}/{len(requested)})")
+        yield json.dumps({
+            "done": True,
+            "total": len(requested),
+            "succeeded": succeeded,
+            "processing_time": round(processing_time, 2)
+        }) + "\n"
+    
+    return StreamingResponse(
+        result_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/generate-ad/jobs", response_model=JobSubmitResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_generate_ad_job(
+    content_id: str = Form(..., description="업로드된 콘텐츠 ID"),
+    style: str = Form(default="minimal", description="스타일: vintage, modern, minimal, natural, luxury"),
+    seed: Optional[int] = Form(default=None, ge=0, le=MAX_SEED, description="생성 시드 (없으면 이미지 + 스타일로 결정, 같은 시드는 캐시된 결과 재사용 / 다른 결과는 다른 시드로)"),
+    webhook_url: Optional[str] = Form(default=None, description="완료 시 작업 상태를 POST 할 URL (공인 주소만)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    AI 광고 생성을 비동기 작업으로 제출
+    
+    요청을 붙잡지 않고 즉시 job_id 반환 (Cloud Run 요청 타임아웃 회피)
+    - 폴링: GET /api/v1/jobs/{job_id}
+    - 스트림: GET /api/v1/jobs/{job_id}/events (SSE)
+    - 웹훅: webhook_url 지정 시 완료/실패 상태를 POST
+      (JOB_WEBHOOK_ALLOWED_HOSTS 또는 공인 IP 로 해석되는 호스트만, 리다이렉트는 따라가지 않음)
+    
+    로그인 필요, 본인 콘텐츠만 제출 가능 (아니면 404)
+    """
+    try:
+        job = await create_job(content_id, style, user_id, webhook_url, seed=seed)
+    except GenerationError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    
+    return {
+        **job,
+        "status_url": f"/api/v1/jobs/{job['job_id']}",
+        "events_url": f"/api/v1/jobs/{job['job_id']}/events"
+    }
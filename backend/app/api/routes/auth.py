@@ -5,70 +5,151 @@
 /api/auth/me - 현재 사용자 조회
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 import uuid
 
-from app.db.base import get_db
+from app.core.metrics import stage_timer
+from app.core.principal_cache import UserPrincipal, get_principal_cache
+from app.db.base import get_async_db
 from app.models.schemas import User
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    needs_rehash,
     create_access_token,
     decode_access_token
 )
+from config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+# 로그인 선택 엔드포인트용 (토큰이 없어도 401 대신 None)
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/auth/login", auto_error=False)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """JWT 토큰에서 현재 사용자 가져오기"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # 1. 토큰 디코드
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    # 2. 이메일 추출
+
+async def _lookup_principal(payload: dict, db: AsyncSession) -> UserPrincipal:
+    """토큰 subject → 사용자 (principal 캐시 → DB)"""
+    # 1. 이메일 추출
     email: str = payload.get("sub")
     if email is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    # 2. 캐시 조회
+    cache = get_principal_cache()
+    if cache is not None:
+        principal = cache.get(email)
+        if principal is not None:
+            return principal
     
     # 3. 사용자 조회
-    user = db.query(User).filter(User.email == email).first()
+    with stage_timer("auth_user_lookup"):
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
-    return user
+    principal = UserPrincipal.from_user(user)
+    if cache is not None:
+        cache.put(email, principal, token_expires_at=payload.get("exp"))
+    return principal
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """JWT 토큰에서 현재 사용자 가져오기 (principal 캐시 적중 시 DB 조회 생략)"""
+    payload = decode_access_token(token)
+    if payload is None:
+        raise _credentials_exception()
+    
+    return await _lookup_principal(payload, db)
+
+
+async def get_current_user_id(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> str:
+    """
+    JWT 토큰에서 현재 사용자 ID 가져오기
+    uid 클레임이 있으면 DB/캐시 조회 없이 반환 (이전에 발급된 토큰은 get_current_user 와 같은 경로)
+    """
+    payload = decode_access_token(token)
+    if payload is None:
+        raise _credentials_exception()
+    
+    user_id = payload.get("uid")
+    if user_id:
+        return user_id
+    return (await _lookup_principal(payload, db)).user_id
+
+
+def client_ip(request: Request) -> str:
+    """
+    요청 클라이언트 IP
+    TRUSTED_PROXY_HOPS 개의 프록시 뒤라면 X-Forwarded-For 를 뒤에서부터 그만큼 건너뜀
+    (앞쪽 항목은 클라이언트가 임의로 넣을 수 있으므로 신뢰하지 않음)
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [
+            host.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for host in header.split(",")
+            if host.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+async def get_requester_key(
+    request: Request,
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+    db: AsyncSession = Depends(get_async_db)
+) -> str:
+    """
+    요청자 식별 키 (요청자별 동시 생성 수 제한)
+    유효한 토큰이면 user:<user_id>, 토큰이 없거나 유효하지 않으면 ip:<클라이언트 IP>
+    """
+    if token:
+        try:
+            return f"user:{await get_current_user_id(token, db)}"
+        except HTTPException:
+            pass
+    return f"ip:{client_ip(request)}"
 
 
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """회원가입"""
     # 1. 이메일 중복 확인
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
+    # 해싱 동안 커넥션을 붙잡지 않도록 조회 트랜잭션 종료
+    await db.commit()
     
     # 2. 비밀번호 해싱
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     
     # 3. 사용자 생성
     new_user = User(
@@ -81,8 +162,8 @@ async def signup(
     
     # 4. DB 저장
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
@@ -90,27 +171,34 @@ async def signup(
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """로그인"""
     # 1. 사용자 찾기 (username = email)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = (await db.execute(select(User).where(User.email == form_data.username))).scalar_one_or_none()
+    # bcrypt 검증 동안 커넥션을 붙잡지 않도록 조회 트랜잭션 종료 (expire_on_commit=False → user 유지)
+    await db.commit()
     
     # 2. 사용자 없음 또는 비밀번호 틀림
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # 2-1. BCRYPT_ROUNDS 가 바뀌었으면 평문을 아는 지금 새 cost 로 재해싱
+    if needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(form_data.password)
+        await db.commit()
+    
     # 3. JWT 토큰 생성
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data={"sub": user.email, "uid": user.user_id})
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UserPrincipal = Depends(get_current_user)):
     """현재 사용자 조회"""
     return current_user
\ No newline at end of file
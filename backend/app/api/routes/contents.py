@@ -5,21 +5,28 @@
 /api/contents/{id} - 콘텐츠 상세
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Response
+from sqlalchemy import Select, and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Optional, List, Tuple
+from datetime import datetime
+import asyncio
+import base64
+import binascii
+import time
 import uuid
 import os
 from pathlib import Path
 from PIL import Image
 import io
-from google.cloud import storage
-from google.oauth2 import service_account
 
-from app.db.base import get_db
-from app.models.schemas import UserContent, User
+from app.db.base import get_async_db
+from app.models.schemas import UserContent
 from app.schemas.content import ContentResponse
-from app.api.routes.auth import get_current_user
+from app.api.routes.auth import get_current_user_id
+from app.core.metrics import stage_timer
+from app.core.storage import get_storage
+from app.services.ai.derivatives import build_derivatives, pick_derivative
 from config import settings
 
 router = APIRouter(prefix="/api/contents", tags=["Contents"])
@@ -27,49 +34,103 @@ router = APIRouter(prefix="/api/contents", tags=["Contents"])
 # 허용된 이미지 확장자
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+THUMBNAIL_LONG_EDGE = 300  # thumbnail_url 로 사용할 파생 이미지 크기
 
-# ===== GCS 클라이언트 (Lazy Initialization) =====
-_storage_client = None
-_bucket = None
-
-def get_gcs_bucket():
-    """GCS 버킷 가져오기 (Lazy Initialization)"""
-    global _storage_client, _bucket
-    
-    if _storage_client is None:
-        # credentials 로드
-        if settings.GOOGLE_APPLICATION_CREDENTIALS:
-            credentials = service_account.Credentials.from_service_account_file(
-                settings.GOOGLE_APPLICATION_CREDENTIALS
-            )
-            _storage_client = storage.Client(credentials=credentials)
-        else:
-            # 환경 변수 기반 (배포 환경)
-            _storage_client = storage.Client()
-        
-        # 버킷 설정
-        bucket_name = settings.GCS_BUCKET_NAME or "adgen-uploads-2026"
-        _bucket = _storage_client.bucket(bucket_name)
-        
-        print(f"✅ GCS 클라이언트 초기화 완료: {bucket_name}")
-    
-    return _bucket
+# 업로드 단계별 처리 시간 헤더
+TIMING_HEADERS = {
+    'validation': "X-Timing-Validation",
+    'uploads': "X-Timing-Uploads",  # 원본 + 파생 이미지 동시 업로드 전체
+    'upload_original': "X-Timing-Upload-Original",
+    'derivatives': "X-Timing-Derivatives",  # 파생 이미지 생성 + 업로드
+    'db': "X-Timing-Db",
+}
+
+# 목록 응답에 필요한 컬럼만 조회 (caption Text / updated_at 제외)
+LIST_COLUMNS = (
+    UserContent.content_id,
+    UserContent.user_id,
+    UserContent.image_url,
+    UserContent.thumbnail_url,
+    UserContent.derivatives,
+    UserContent.product_name,
+    UserContent.category,
+    UserContent.color,
+    UserContent.price,
+    UserContent.file_size,
+    UserContent.width,
+    UserContent.height,
+    UserContent.created_at,
+)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, content_id: str) -> str:
+    """마지막 행의 (created_at, content_id) → 불투명 커서 (URL-safe base64)"""
+    raw = f"{created_at.isoformat()}|{content_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    커서 → (created_at, content_id)
+    
+    Raises:
+        HTTPException: 400 (형식이 잘못된 커서)
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, content_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), content_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+async def upload_derivatives(storage, contents: bytes, base_path: str) -> List[dict]:
+    """파생 이미지 사다리 생성(스레드) 후 동시 업로드, DB 저장용 dict 목록 반환"""
+    async with stage_timer("derivatives_build"):
+        derivatives = await asyncio.to_thread(
+            build_derivatives,
+            contents,
+            settings.DERIVATIVE_SIZES,
+            settings.DERIVATIVE_FORMATS,
+            {"webp": settings.DERIVATIVE_WEBP_QUALITY, "avif": settings.DERIVATIVE_AVIF_QUALITY}
+        )
+    urls = await asyncio.gather(*[
+        storage.upload(d.data, f"{base_path}_{d.size}.{d.format}", content_type=d.content_type)
+        for d in derivatives
+    ])
+    for derivative, url in zip(derivatives, urls):
+        derivative.url = url
+    return [d.to_dict() for d in derivatives]
+
+
+async def timed(awaitable: Awaitable[Any]) -> Tuple[Any, float]:
+    """awaitable 결과와 소요 시간 (gather 안에서 단계별 시간 측정용)"""
+    start = time.time()
+    result = await awaitable
+    return result, time.time() - start
 
 
 @router.post("/upload", response_model=ContentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_content(
+    response: Response,
     file: UploadFile = File(...),
     product_name: Optional[str] = Form(None),
     category: Optional[str] = Form(None),
     color: Optional[str] = Form(None),
     price: Optional[float] = Form(None),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """이미지 업로드 및 콘텐츠 생성 (GCS 저장)"""
+    start_time = time.time()
+    timing = {}
     
-    # GCS 버킷 가져오기 (실제 사용 시점에 초기화)
-    bucket = get_gcs_bucket()
+    # 스토리지 가져오기 (GCS 또는 로컬, 실제 사용 시점에 초기화)
+    storage = get_storage()
     
     # ===== 1. 파일 검증 =====
     
@@ -101,69 +162,58 @@ async def upload_content(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid image file"
         )
+    timing['validation'] = time.time() - start_time
     
     # ===== 2. GCS에 업로드 =====
     
     # 2-1. 고유한 파일명 생성 (UUID + 원본 확장자)
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    thumbnail_filename = f"thumb_{unique_filename}"
+    file_id = str(uuid.uuid4())
+    unique_filename = f"{file_id}{file_ext}"
     
-    # 2-2. GCS 경로 (user_id/filename)
-    gcs_path = f"{current_user.user_id}/{unique_filename}"
-    gcs_thumb_path = f"{current_user.user_id}/{thumbnail_filename}"
+    # 2-2. GCS 경로 (user_id/filename, 파생 이미지는 user_id/{file_id}_{size}.{format})
+    gcs_path = f"{user_id}/{unique_filename}"
+    gcs_derivative_path = f"{user_id}/{file_id}"
     
-    # 2-3. 원본 이미지 GCS 업로드
-    try:
-        blob = bucket.blob(gcs_path)
-        blob.upload_from_string(
-            contents,
-            content_type=f"image/{file_ext[1:]}"
-        )
-        
-        print(f"✅ Uploaded: {gcs_path}")
-    except Exception as e:
-        print(f"❌ GCS Upload Error: {e}")
+    # 2-3. 원본 업로드와 파생 이미지 생성+업로드를 동시에 실행
+    content_type = f"image/{file_ext[1:]}"
+    step_start = time.time()
+    original_result, derivatives_result = await asyncio.gather(
+        timed(storage.upload(contents, gcs_path, content_type=content_type)),
+        timed(upload_derivatives(storage, contents, gcs_derivative_path)),
+        return_exceptions=True
+    )
+    timing['uploads'] = time.time() - step_start
+    
+    if isinstance(original_result, Exception):
+        print(f"❌ GCS Upload Error: {original_result}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to upload image to storage"
         )
+    image_url, timing['upload_original'] = original_result
+    print(f"✅ Uploaded: {gcs_path}")
     
-    # 2-4. 썸네일 생성 및 GCS 업로드
-    try:
-        # 썸네일 생성 (300x300, 비율 유지)
-        thumb_image = image.copy()
-        thumb_image.thumbnail((300, 300))
-        
-        # BytesIO로 변환
-        thumb_buffer = io.BytesIO()
-        thumb_image.save(thumb_buffer, format=image.format or 'JPEG')
-        thumb_buffer.seek(0)
-        
-        # GCS 업로드
-        thumb_blob = bucket.blob(gcs_thumb_path)
-        thumb_blob.upload_from_string(
-            thumb_buffer.read(),
-            content_type=f"image/{file_ext[1:]}"
-        )
-        
-        print(f"✅ Uploaded thumbnail: {gcs_thumb_path}")
-    except Exception as e:
-        print(f"❌ Thumbnail Upload Error: {e}")
-        # 썸네일 실패해도 원본은 저장되었으므로 계속 진행
+    if isinstance(derivatives_result, Exception):
+        print(f"❌ Derivative Upload Error: {derivatives_result}")
+        # 파생 이미지 실패해도 원본은 저장되었으므로 계속 진행 (원본 URL 로 대체)
+        derivatives = None
+    else:
+        derivatives, timing['derivatives'] = derivatives_result
+        print(f"✅ Uploaded {len(derivatives)} derivatives: {gcs_derivative_path}_*")
     
-    # ===== 3. DB 저장 =====
+    # 썸네일: 300px 이상인 가장 작은 파생 이미지 (원본이 더 작으면 원본)
+    thumbnail = pick_derivative(derivatives, THUMBNAIL_LONG_EDGE)
+    thumbnail_url = thumbnail["url"] if thumbnail else image_url
     
-    # 3-1. GCS 공개 URL
-    bucket_name = settings.GCS_BUCKET_NAME or "adgen-uploads-2026"
-    image_url = f"https://storage.googleapis.com/{bucket_name}/{gcs_path}"
-    thumbnail_url = f"https://storage.googleapis.com/{bucket_name}/{gcs_thumb_path}"
+    # ===== 3. DB 저장 =====
     
-    # 3-2. UserContent 객체 생성
+    # 3-1. UserContent 객체 생성
     new_content = UserContent(
         content_id=str(uuid.uuid4()),
-        user_id=current_user.user_id,
+        user_id=user_id,
         image_url=image_url,
         thumbnail_url=thumbnail_url,
+        derivatives=derivatives,
         product_name=product_name,
         category=category,
         color=color,
@@ -173,48 +223,85 @@ async def upload_content(
         height=height
     )
     
-    # 3-3. DB에 저장
-    db.add(new_content)
-    db.commit()
-    db.refresh(new_content)
+    # 3-2. DB에 저장
+    async with stage_timer("db_commit") as db_timer:
+        db.add(new_content)
+        await db.commit()
+        await db.refresh(new_content)
+    timing['db'] = db_timer.seconds
     
     print(f"✅ Content saved: {new_content.content_id}")
     
+    # 단계별 처리 시간 (remove-background 의 X-Timing-* 헤더와 동일한 형식)
+    timing['total'] = time.time() - start_time
+    response.headers["X-Processing-Time"] = str(timing['total'])
+    for stage, header in TIMING_HEADERS.items():
+        if stage in timing:
+            response.headers[header] = str(timing[stage])
+    
     return new_content
 
 
+def list_contents_statement(user_id: str, limit: int, cursor: Optional[str] = None) -> Select:
+    """
+    목록 조회 쿼리 (LIST_COLUMNS, 최신순, cursor 이후 limit + 1 행)
+    
+    Raises:
+        HTTPException: 400 (형식이 잘못된 커서)
+    """
+    statement = select(*LIST_COLUMNS).where(UserContent.user_id == user_id)
+    
+    if cursor:
+        created_at, content_id = decode_cursor(cursor)
+        statement = statement.where(or_(
+            UserContent.created_at < created_at,
+            and_(UserContent.created_at == created_at, UserContent.content_id < content_id)
+        ))
+    
+    # 한 행 더 조회해서 다음 페이지 존재 여부 확인
+    return statement\
+        .order_by(UserContent.created_at.desc(), UserContent.content_id.desc())\
+        .limit(limit + 1)
+
+
 @router.get("", response_model=List[ContentResponse])
 async def get_my_contents(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    limit: int = Query(settings.CONTENTS_PAGE_SIZE, ge=1, le=settings.CONTENTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="이전 응답의 X-Next-Cursor 헤더 값"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     내 콘텐츠 목록 조회
-    최신순 정렬
+    최신순 정렬, (created_at, content_id) keyset 페이지
+    
+    다음 페이지가 있으면 X-Next-Cursor 헤더로 커서 반환 (마지막 페이지는 헤더 없음)
     """
-    contents = db.query(UserContent)\
-        .filter(UserContent.user_id == current_user.user_id)\
-        .order_by(UserContent.created_at.desc())\
-        .all()
+    rows = (await db.execute(list_contents_statement(user_id, limit, cursor))).all()
     
-    return contents
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].content_id)
+    
+    return rows
 
 
 @router.get("/{content_id}", response_model=ContentResponse)
 async def get_content(
     content_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     콘텐츠 상세 조회
     """
-    content = db.query(UserContent)\
-        .filter(
+    content = (await db.execute(
+        select(UserContent).where(
             UserContent.content_id == content_id,
-            UserContent.user_id == current_user.user_id  # 본인 것만
-        )\
-        .first()
+            UserContent.user_id == user_id  # 본인 것만
+        )
+    )).scalar_one_or_none()
     
     if not content:
         raise HTTPException(
@@ -222,4 +309,4 @@ async def get_content(
             detail="Content not found"
         )
     
-    return content
\ No newline at end of file
+    return content
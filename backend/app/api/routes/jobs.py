@@ -0,0 +1,71 @@
+"""
+작업 API 라우터
+/api/v1/jobs/{job_id} - 생성 작업 상태 조회 (폴링)
+/api/v1/jobs/{job_id}/events - 생성 작업 상태 스트림 (SSE)
+"""
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.api.routes.auth import get_current_user_id
+from app.core.jobs import get_job_queue
+from app.schemas.job import JobResponse
+from app.services.ai.generation_jobs import TERMINAL_STATUSES, get_job
+from config import settings
+
+router = APIRouter()
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """작업 상태, 진행률, 결과 URL 조회 (본인이 제출한 작업만, 아니면 404)"""
+    job = await get_job(job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """
+    작업 상태 변경을 Server-Sent Events 로 전송
+    현재 상태를 먼저 보내고, 완료(succeeded/failed) 이벤트 후 스트림 종료
+    이벤트는 작업을 실행하는 인스턴스에서만 발행되므로 하트비트마다 DB 상태도 다시 읽음
+    (다른 인스턴스가 실행/회수한 작업도 진행률과 완료가 전달됨)
+    본인이 제출한 작업만 (아니면 404)
+    """
+    events = get_job_queue().events
+    # 조회와 구독 사이의 상태 변경을 놓치지 않도록 먼저 구독
+    queue = events.subscribe(job_id)
+    job = await get_job(job_id, user_id)
+    if job is None:
+        events.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        try:
+            state = job
+            yield f"data: {json.dumps(state)}\n\n"
+            while state["status"] not in TERMINAL_STATUSES:
+                try:
+                    state = await asyncio.wait_for(queue.get(), timeout=settings.JOB_SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    latest = await get_job(job_id, user_id)
+                    if latest is None:
+                        return
+                    if latest == state:
+                        # 프록시/로드밸런서 유휴 연결 종료 방지
+                        yield ": keep-alive\n\n"
+                        continue
+                    state = latest
+                yield f"data: {json.dumps(state)}\n\n"
+        finally:
+            events.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,158 @@
+"""
+메트릭 API 라우터
+/metrics - Prometheus text format (단계별 지연 시간 히스토그램, 진행 중 수, 캐시 적중, 전송 바이트)
+/api/v1/metrics/storage - 스토리지 작업별 지연 시간
+/api/v1/metrics/replicate - Replicate 서킷 브레이커 / 동시성 대기열 / 재시도 예산
+/api/v1/metrics/auth - 사용자 principal 캐시
+/api/v1/metrics/db - DB 커넥션 풀 (동기 / 비동기 엔진별 사용률, 체크아웃 대기 시간)
+"""
+from types import ModuleType
+from typing import Any, Callable
+
+from fastapi import APIRouter, Response
+
+from app.core import executor as executor_module
+from app.core import jobs as jobs_module
+from app.core import principal_cache as principal_cache_module
+from app.core.metrics import exposition, register_gauge
+from app.core.principal_cache import get_principal_cache
+from app.core.resilience import CircuitBreaker
+from app.core.security import password_hash_pending
+from app.core.storage import get_storage
+from app.db.base import engine, get_async_pool_snapshot, get_pool_snapshot, InstrumentedQueuePool
+from app.services.ai import generation as generation_module
+from app.services.ai.generation import get_replicate_resilience
+from config import settings
+
+router = APIRouter(prefix="/api/v1/metrics", tags=["Metrics"])
+prometheus_router = APIRouter(tags=["Metrics"])
+
+BREAKER_STATES = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+
+
+def singleton_gauge(module: ModuleType, name: str, read: Callable[[Any], float]) -> Callable[[], float]:
+    """
+    싱글톤 모듈 전역을 스크레이프 시점에 읽는 게이지 함수
+    get_X() 를 부르면 스크레이프가 풀/클라이언트를 생성하므로 전역만 읽고, 아직 없으면 0
+    """
+    def value() -> float:
+        instance = getattr(module, name)
+        return read(instance) if instance is not None else 0
+    return value
+
+
+register_gauge(
+    "adgen_image_executor_pending", "Image jobs submitted to the worker pool and not finished",
+    singleton_gauge(executor_module, "_image_executor", lambda executor: executor.pending)
+)
+register_gauge(
+    "adgen_job_queue_depth", "Generation jobs waiting in the queue",
+    singleton_gauge(jobs_module, "_job_queue", lambda queue: queue.depth)
+)
+register_gauge(
+    "adgen_job_queue_running", "Generation jobs currently running",
+    singleton_gauge(jobs_module, "_job_queue", lambda queue: queue.running)
+)
+register_gauge(
+    "adgen_replicate_active", "Replicate predictions holding a concurrency slot",
+    singleton_gauge(generation_module, "replicate_resilience", lambda resilience: resilience.limiter.active)
+)
+register_gauge(
+    "adgen_replicate_waiting", "Replicate predictions waiting for a concurrency slot",
+    singleton_gauge(generation_module, "replicate_resilience", lambda resilience: resilience.limiter.waiting)
+)
+register_gauge(
+    "adgen_replicate_breaker_state", "Replicate circuit breaker state (0=closed, 1=half_open, 2=open)",
+    singleton_gauge(
+        generation_module, "replicate_resilience", lambda resilience: BREAKER_STATES[resilience.breaker.state]
+    )
+)
+# 계측 풀일 때만 (인메모리 SQLite 는 SingletonThreadPool)
+if isinstance(engine.pool, InstrumentedQueuePool):
+    register_gauge(
+        "adgen_db_pool_size", "DB connection pool size (persistent connections)",
+        lambda: engine.pool.size()
+    )
+    register_gauge(
+        "adgen_db_pool_capacity", "DB connections the pool may open (pool_size + max_overflow)",
+        lambda: engine.pool.capacity
+    )
+    register_gauge(
+        "adgen_db_pool_checked_out", "DB connections currently checked out",
+        lambda: engine.pool.checkedout()
+    )
+    register_gauge(
+        "adgen_db_pool_overflow", "DB overflow connections currently open",
+        lambda: max(engine.pool.overflow(), 0)
+    )
+    register_gauge(
+        "adgen_db_pool_utilization", "Checked-out DB connections / pool capacity",
+        lambda: engine.pool.utilization
+    )
+    register_gauge(
+        "adgen_db_async_pool_checked_out", "Async engine DB connections currently checked out",
+        lambda: (get_async_pool_snapshot() or {}).get("checked_out", 0)
+    )
+    register_gauge(
+        "adgen_db_async_pool_utilization", "Async engine checked-out DB connections / pool capacity",
+        lambda: (get_async_pool_snapshot() or {}).get("utilization", 0.0)
+    )
+register_gauge(
+    "adgen_password_hash_pending", "Password hash/verify calls running or waiting in the hashing pool",
+    password_hash_pending
+)
+register_gauge(
+    "adgen_user_principal_cache_entries", "Cached authenticated user principals",
+    singleton_gauge(principal_cache_module, "_principal_cache", lambda cache: cache.size)
+)
+
+
+@prometheus_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    body, content_type = exposition()
+    return Response(content=body, media_type=content_type)
+
+
+@router.get("/storage")
+async def storage_metrics():
+    """스토리지 작업별 지연 시간 (upload / download / exists)"""
+    storage = get_storage()
+    return {
+        "backend": settings.STORAGE_BACKEND,
+        "max_workers": settings.STORAGE_MAX_WORKERS,
+        "http_pool_size": settings.STORAGE_HTTP_POOL_SIZE,
+        "timeout": {
+            "connect": settings.STORAGE_CONNECT_TIMEOUT,
+            "read": settings.STORAGE_READ_TIMEOUT
+        },
+        "operations": storage.metrics.snapshot()
+    }
+
+
+@router.get("/replicate")
+async def replicate_metrics():
+    """Replicate 호출 보호 상태 (breaker state, limiter active/waiting, retry budget, hedges)"""
+    return get_replicate_resilience().snapshot()
+
+
+@router.get("/auth")
+async def auth_metrics():
+    """사용자 principal 캐시 (entries, hits / misses, invalidations)"""
+    cache = get_principal_cache()
+    return {
+        "principal_cache": cache.stats() if cache is not None else None
+    }
+
+
+@router.get("/db")
+async def db_metrics():
+    """
+    DB 커넥션 풀 (checked_out / capacity, 체크아웃 대기 평균/최대, 타임아웃)
+    async_pool: 요청 경로용 비동기 엔진 (첫 요청 전에는 null)
+    """
+    return {
+        "dialect": engine.dialect.name,
+        "pool": get_pool_snapshot(),
+        "async_pool": get_async_pool_snapshot()
+    }
@@ -5,44 +5,89 @@ Handles background removal and image processing requests
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
 from fastapi.responses import Response
 from PIL import Image
+from pathlib import Path
+import asyncio
 import io
+import json
 import time
 import logging
-from typing import Optional
+import zipfile
+from typing import List, Optional
 
-from app.services.ai.background import BackgroundRemovalService
-from app.services.ai.img_processing import (
-    resize_to_instagram_ratio,
-    add_background_color,
-    get_image_info
-)
-from app.services.ai.styles import StyleProcessor
+from config import settings
+from app.core.executor import ExecutorBusyError, get_image_executor
+from app.core.metrics import record_timings, stage_timer
+from app.services.ai.batching import MicroBatcher
+from app.services.ai.img_processing import get_image_info
+from app.services.ai.pipeline import STYLE_OPERATORS
+from app.services.ai.result_cache import get_result_cache, hash_image_bytes
+from app.services.ai.tasks import process_image, segment_batch
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize services (singleton)
-bg_removal_service = None
-style_processor = None
+# 한 번의 배치 요청에서 처리 가능한 최대 파일 수
+MAX_BATCH_FILES = 50
 
+# Segmentation micro-batcher (싱글톤)
+segmentation_batcher = None
 
-def get_bg_removal_service() -> BackgroundRemovalService:
-    """Get or create background removal service instance"""
-    global bg_removal_service
-    if bg_removal_service is None:
-        logger.info("Initializing BackgroundRemovalService...")
-        bg_removal_service = BackgroundRemovalService()
-    return bg_removal_service
+
+def get_segmentation_batcher() -> Optional[MicroBatcher]:
+    """Get or create segmentation micro-batcher (None if disabled)"""
+    global segmentation_batcher
+    if segmentation_batcher is None and settings.REMBG_BATCH_WAIT_MS > 0:
+        async def run_batch(items: List[bytes]) -> List[Image.Image]:
+            return await get_image_executor().submit(segment_batch, items)
+        
+        logger.info(
+            f"Initializing segmentation micro-batcher "
+            f"(max_batch={settings.REMBG_MAX_BATCH_SIZE}, wait={settings.REMBG_BATCH_WAIT_MS}ms)"
+        )
+        segmentation_batcher = MicroBatcher(
+            run_batch,
+            max_batch_size=settings.REMBG_MAX_BATCH_SIZE,
+            max_wait_ms=settings.REMBG_BATCH_WAIT_MS
+        )
+    return segmentation_batcher
+
+
+def image_response(
+    content: bytes,
+    output_format: str,
+    style: str,
+    filename: str,
+    timing: dict,
+    cache_status: str
+) -> Response:
+    """처리된 이미지 응답 (타이밍/캐시 헤더 포함)"""
+    media_type = f"image/{output_format.lower()}"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={
+            "X-Processing-Time": str(timing.get('total', 0)),
+            "X-Processing-Style": style,
+            "X-Output-Format": output_format,
+            "X-Timing-Background": str(timing.get('background_removal', 0)),
+            "X-Timing-Style": str(timing.get('style_processing', 0)),
+            "X-Timing-Queue": str(timing.get('queue', 0)),
+            "X-Cache": cache_status,
+            "Content-Disposition": f'attachment; filename="processed_{filename}"'
+        }
+    )
 
 
-def get_style_processor() -> StyleProcessor:
-    """Get or create style processor instance"""
-    global style_processor
-    if style_processor is None:
-        logger.info("Initializing StyleProcessor...")
-        style_processor = StyleProcessor()
-    return style_processor
+def busy_exception(error: ExecutorBusyError) -> HTTPException:
+    """503 + Retry-After 응답"""
+    executor = get_image_executor()
+    logger.warning(f"Image executor saturated: {executor.pending}/{executor.capacity}")
+    return HTTPException(
+        status_code=503,
+        detail="Image processing is busy, please retry later",
+        headers={"Retry-After": str(error.retry_after)}
+    )
 
 
 @router.post("/remove-background")
@@ -69,79 +114,216 @@ async def remove_background(
         Processed image with background removed and style applied
     """
     start_time = time.time()
-    timing = {}
     
     try:
         # Read uploaded file
         contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
         
-        logger.info(f"Processing image: {file.filename}, size: {image.size}, mode: {image.mode}")
+        logger.info(f"Processing image: {file.filename}, bytes: {len(contents)}")
         logger.info(f"Options: ratio={ratio}, style={style}, enhance_color={enhance_color}, remove_wrinkles={remove_wrinkles}")
         
-        # Get services
-        bg_service = get_bg_removal_service()
-        
-        # 1. Remove background
-        step_start = time.time()
-        result = await bg_service.remove_background(image)
-        timing['background_removal'] = time.time() - step_start
-        
-        # 2. Apply style processing
-        step_start = time.time()
-        processor = get_style_processor()
-        result = processor.process_with_style(result, style=style)
-        timing['style_processing'] = time.time() - step_start
-        
-        # 3. Resize to Instagram ratio
-        step_start = time.time()
-        result = resize_to_instagram_ratio(result, ratio=ratio)
-        timing['resize'] = time.time() - step_start
-        
-        # 4. Add background color if specified
-        if background_color:
-            step_start = time.time()
-            # Parse hex color
-            bg_color = tuple(int(background_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-            result = add_background_color(result, background_color=bg_color)
-            timing['background_color'] = time.time() - step_start
-            output_format = "JPEG"
-        else:
-            output_format = "PNG"
-        
-        # Convert to bytes
-        step_start = time.time()
-        output_buffer = io.BytesIO()
-        result.save(output_buffer, format=output_format, quality=95)
-        output_buffer.seek(0)
-        timing['encoding'] = time.time() - step_start
+        # 0. 결과 캐시 조회 (이미지 해시 + 옵션)
+        cache = get_result_cache()
+        image_hash = hash_image_bytes(contents)
+        style_key = style.lower() if style.lower() in STYLE_OPERATORS else "minimal"
+        output_format = "JPEG" if background_color else "PNG"
+        styled_key = (image_hash, style_key, enhance_color, remove_wrinkles)
+        encoded_key = styled_key + (ratio, (background_color or "").upper(), output_format)
+        
+        mask = styled = None
+        cache_status = "miss"
+        if cache is not None:
+            cached = await cache.get("encoded", encoded_key)
+            if cached is not None:
+                return image_response(
+                    cached, output_format, style, file.filename,
+                    {'total': time.time() - start_time}, cache_status="hit-encoded"
+                )
+            styled = await cache.get("styled", styled_key)
+            if styled is not None:
+                cache_status = "hit-styled"
+            else:
+                mask = await cache.get("mask", image_hash)
+                if mask is not None:
+                    cache_status = "hit-mask"
+        
+        # 1. 세그멘테이션: 동시 요청과 묶어 ONNX 배치로 실행 (마이크로 배칭)
+        segmentation_time = 0.0
+        batcher = get_segmentation_batcher()
+        if batcher is not None and mask is None and styled is None:
+            async with stage_timer("segmentation") as segmentation:
+                try:
+                    mask = await batcher.submit(contents)
+                except ExecutorBusyError:
+                    raise
+                except Exception as e:
+                    # 배치 실행 실패 또는 이 이미지만 실패 → 워커에서 이미지별로 다시 세그멘테이션
+                    # (정말 잘못된 이미지면 process_image 에서 이 요청만 실패)
+                    logger.warning(f"Batched segmentation failed, falling back to per-image: {e}")
+            segmentation_time = segmentation.seconds
+            if cache is not None:
+                cache.put("mask", image_hash, mask)
+        
+        # 2. 배경 제거 → 스타일 → 리사이즈 → 인코딩은 워커 풀에서 실행 (이벤트 루프 비차단)
+        executor = get_image_executor()
+        result = await executor.submit(
+            process_image, contents, ratio, background_color, style, mask, styled, cache is not None
+        )
+        executor.mark_ready()
+        
+        if cache is not None:
+            cache.put("mask", image_hash, result.mask)
+            cache.put("styled", styled_key, result.styled)
+            cache.put("encoded", encoded_key, result.content)
         
+        # 워커 단계 시간 → 히스토그램 + Server-Timing
+        record_timings(result.timing)
+        timing = result.timing
+        timing['background_removal'] = timing.get('background_removal', 0) + segmentation_time
         processing_time = time.time() - start_time
         timing['total'] = processing_time
+        timing['queue'] = max(processing_time - timing.get('worker_total', 0) - segmentation_time, 0)
         
         logger.info(f"Processing completed in {processing_time:.2f}s")
-        logger.info(f"Timing breakdown: {timing}")
-        
-        # Return image response
-        media_type = f"image/{output_format.lower()}"
-        return Response(
-            content=output_buffer.getvalue(),
-            media_type=media_type,
-            headers={
-                "X-Processing-Time": str(processing_time),
-                "X-Processing-Style": style,
-                "X-Output-Format": output_format,
-                "X-Timing-Background": str(timing.get('background_removal', 0)),
-                "X-Timing-Style": str(timing.get('style_processing', 0)),
-                "Content-Disposition": f'attachment; filename="processed_{file.filename}"'
-            }
-        )
+        logger.info(f"Timing breakdown: {timing}, cache: {cache_status}")
+        
+        return image_response(result.content, output_format, style, file.filename, timing, cache_status)
         
+    except ExecutorBusyError as e:
+        raise busy_exception(e)
     except Exception as e:
         logger.error(f"Error processing image: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Error processing image: {str(e)}")
 
 
+@router.post("/remove-background/batch")
+async def remove_background_batch(
+    files: List[UploadFile] = File(...),
+    ratio: str = Form(default="4:5"),
+    background_color: Optional[str] = Form(default=None),
+    style: str = Form(default="minimal"),
+    enhance_color: bool = Form(default=True),
+    remove_wrinkles: bool = Form(default=False)
+):
+    """
+    Remove background from many product images in one request
+    
+    Segmentation runs in ONNX batches of REMBG_MAX_BATCH_SIZE, then style
+    and encoding run in parallel across the image workers.
+    
+    Args:
+        files: Image files to process (max MAX_BATCH_FILES)
+        ratio, background_color, style, enhance_color, remove_wrinkles:
+            Same as /remove-background, applied to every image
+    
+    Returns:
+        ZIP archive of processed images (errors.json lists failed files)
+    """
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many files. Max: {MAX_BATCH_FILES}"
+        )
+    
+    start_time = time.time()
+    executor = get_image_executor()
+    errors = {}
+    
+    # 1. 파일 읽기 + 헤더 검증 (디코딩 불가 파일은 배치에서 제외)
+    items = []
+    for idx, file in enumerate(files):
+        contents = await file.read()
+        try:
+            Image.open(io.BytesIO(contents))
+            items.append((idx, file.filename, contents))
+        except Exception:
+            errors[file.filename] = "Invalid image file"
+    
+    logger.info(f"Batch processing {len(items)} images (invalid: {len(errors)}), style={style}, ratio={ratio}")
+    
+    # 한 요청이 대기열을 독점하지 않도록 동시 작업 수를 워커 수로 제한
+    limit = asyncio.Semaphore(executor.max_workers)
+    
+    async def submit(func, *args):
+        async with limit:
+            return await executor.submit(func, *args)
+    
+    try:
+        # 2. 세그멘테이션 (ONNX 배치)
+        batch_size = settings.REMBG_MAX_BATCH_SIZE
+        chunks = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        mask_chunks = await asyncio.gather(
+            *[submit(segment_batch, [contents for _, _, contents in chunk]) for chunk in chunks],
+            return_exceptions=True
+        )
+        masks = []
+        for chunk, chunk_masks in zip(chunks, mask_chunks):
+            if isinstance(chunk_masks, ExecutorBusyError):
+                raise chunk_masks
+            if isinstance(chunk_masks, Exception):
+                # 한 이미지 때문에 배치 전체가 실패할 수 있음 → 이 청크는 이미지별로 세그멘테이션
+                # (mask=None 이면 process_image 가 직접 실행, 실패한 이미지만 errors 에 기록)
+                logger.warning(f"Segmentation batch failed, falling back to per-image: {chunk_masks}")
+                masks.extend([None] * len(chunk))
+            else:
+                # 디코드 실패한 이미지 (예외) 도 process_image 에서 다시 시도 → 오류가 errors 에 기록됨
+                masks.extend(None if isinstance(mask, Exception) else mask for mask in chunk_masks)
+        segmentation_time = time.time() - start_time
+        
+        # 3. 스타일 → 리사이즈 → 인코딩 (워커 병렬)
+        results = await asyncio.gather(
+            *[
+                submit(process_image, contents, ratio, background_color, style, mask)
+                for (_, _, contents), mask in zip(items, masks)
+            ],
+            return_exceptions=True
+        )
+        executor.mark_ready()
+    except ExecutorBusyError as e:
+        raise busy_exception(e)
+    except Exception as e:
+        logger.error(f"Error processing batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
+    
+    # 4. ZIP 패키징 (이미 압축된 이미지이므로 ZIP_STORED)
+    zip_buffer = io.BytesIO()
+    succeeded = 0
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_STORED) as archive:
+        for (idx, filename, _), result in zip(items, results):
+            if isinstance(result, ExecutorBusyError):
+                raise busy_exception(result)
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {filename}: {result}")
+                errors[filename] = str(result)
+                continue
+            record_timings(result.timing)
+            ext = "jpg" if result.output_format == "JPEG" else "png"
+            archive.writestr(f"{idx + 1:03d}_processed_{Path(filename).stem}.{ext}", result.content)
+            succeeded += 1
+        
+        if errors:
+            archive.writestr("errors.json", json.dumps(errors, ensure_ascii=False, indent=2))
+    
+    processing_time = time.time() - start_time
+    logger.info(
+        f"Batch completed in {processing_time:.2f}s: {succeeded}/{len(files)} images "
+        f"({succeeded / processing_time:.2f} img/s)"
+    )
+    
+    return Response(
+        content=zip_buffer.getvalue(),
+        media_type="application/zip",
+        headers={
+            "X-Processing-Time": str(processing_time),
+            "X-Processing-Style": style,
+            "X-Timing-Segmentation": str(segmentation_time),
+            "X-Batch-Succeeded": str(succeeded),
+            "X-Batch-Failed": str(len(errors)),
+            "Content-Disposition": 'attachment; filename="processed_batch.zip"'
+        }
+    )
+
+
 @router.post("/image-info")
 async def get_image_metadata(file: UploadFile = File(...)):
     """
@@ -172,11 +354,20 @@ async def get_image_metadata(file: UploadFile = File(...)):
 async def health_check():
     """Health check endpoint for image processing service"""
     try:
-        service = get_bg_removal_service()
+        executor = get_image_executor()
+        cache = get_result_cache()
         return {
-            "status": "healthy",
-            "model_loaded": True,
-            "styles_available": ["minimal", "mood", "street"]
+            "status": "healthy" if executor.ready else "warming_up",
+            "model_loaded": executor.ready,
+            "model": settings.REMBG_MODEL,
+            "executor": {
+                "kind": executor.kind,
+                "workers": executor.max_workers,
+                "pending": executor.pending,
+                "capacity": executor.capacity
+            },
+            "styles_available": list(STYLE_OPERATORS.keys()),
+            "result_cache": cache.stats() if cache is not None else None
         }
     except Exception as e:
         return {
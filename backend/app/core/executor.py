@@ -0,0 +1,180 @@
+"""
+CPU 작업용 Executor
+이미지 처리(배경 제거, 스타일, 인코딩)를 이벤트 루프 밖의 프로세스/스레드 풀에서 실행
+- 워커 수와 대기열 크기 제한
+- 대기열이 가득 차면 ExecutorBusyError (라우트에서 503 + Retry-After)
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorBusyError(Exception):
+    """워커와 대기열이 모두 가득 찬 경우"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Image executor is saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ImageExecutor:
+    """Bounded process/thread pool for CPU-bound image work"""
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: int = 2,
+        queue_size: int = 8,
+        retry_after: int = 5,
+        initializer: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            kind: "process" 또는 "thread"
+            max_workers: 동시에 실행되는 작업 수
+            queue_size: 워커가 모두 바쁠 때 대기 가능한 작업 수
+            retry_after: 포화 시 클라이언트에 안내할 재시도 대기 시간 (초)
+            initializer: 워커 시작 시 실행 (모델 사전 로드)
+        """
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Invalid executor kind '{kind}'. Choose from: process, thread")
+
+        self.kind = kind
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.initializer = initializer
+        self._pending = 0
+        self.ready = False  # 워밍업 또는 첫 작업 성공 후 True (모델 로드 확인)
+        self._pool = self._create_pool()
+
+    def _create_pool(self) -> Executor:
+        if self.kind == "process":
+            # fork 는 onnxruntime/OpenCV 스레드 상태를 복제하므로 spawn 사용
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="image-worker",
+            initializer=self.initializer,
+        )
+
+    @property
+    def capacity(self) -> int:
+        """실행 중 + 대기 중 작업의 최대 개수"""
+        return self.max_workers + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        """실행 중 + 대기 중 작업 수"""
+        return self._pending
+
+    async def submit(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        작업을 풀에 제출하고 결과를 기다림
+
+        Args:
+            func: 실행할 함수 (process 모드에서는 pickle 가능한 모듈 레벨 함수)
+            *args: 함수 인자
+
+        Returns:
+            함수 실행 결과
+
+        Raises:
+            ExecutorBusyError: 대기열이 가득 찬 경우
+        """
+        if self._pending >= self.capacity:
+            raise ExecutorBusyError(self.retry_after)
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, func, *args)
+        except BrokenProcessPool:
+            # 워커 프로세스가 비정상 종료되면 풀을 다시 만들고 이번 요청은 실패 처리
+            self._reset_pool()
+            raise
+        finally:
+            self._pending -= 1
+
+    def _reset_pool(self) -> None:
+        logger.error("Image worker pool is broken, recreating")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._create_pool()
+
+    def mark_ready(self) -> None:
+        """워커에서 모델이 실제로 동작함을 확인"""
+        self.ready = True
+
+    async def warmup(self, func: Callable[[], Any]) -> bool:
+        """
+        워커 수만큼 워밍업 작업 실행 (대기열 제한 없이, 시작 시 1회)
+        풀은 워커를 필요할 때 생성하므로, 동시에 max_workers 개를 제출해 모든 워커를 지금 띄움
+        (각 워커는 initializer 에서 모델을 준비, 작업이 어느 워커에 배정되는지는 보장되지 않음)
+
+        Args:
+            func: 워커에서 실행할 확인 함수
+
+        Returns:
+            모든 워밍업 성공 여부
+        """
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *[loop.run_in_executor(self._pool, func) for _ in range(self.max_workers)],
+            return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, BaseException)]
+        for error in errors:
+            logger.error(f"Image worker warmup failed: {error}")
+        if any(isinstance(e, BrokenProcessPool) for e in errors):
+            self._reset_pool()
+
+        if not errors:
+            self.mark_ready()
+        return not errors
+
+    def shutdown(self, wait: bool = True) -> None:
+        """풀 종료"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Image Executor (싱글톤)
+_image_executor: Optional[ImageExecutor] = None
+
+
+def get_image_executor() -> ImageExecutor:
+    """Get or create image executor instance"""
+    global _image_executor
+    if _image_executor is None:
+        from app.services.ai.tasks import init_worker
+
+        logger.info(
+            f"Initializing ImageExecutor ({settings.IMAGE_EXECUTOR}, "
+            f"workers={settings.IMAGE_WORKERS}, queue={settings.IMAGE_QUEUE_SIZE})"
+        )
+        _image_executor = ImageExecutor(
+            kind=settings.IMAGE_EXECUTOR,
+            max_workers=settings.IMAGE_WORKERS,
+            queue_size=settings.IMAGE_QUEUE_SIZE,
+            retry_after=settings.IMAGE_RETRY_AFTER_SECONDS,
+            initializer=init_worker,
+        )
+    return _image_executor
+
+
+def shutdown_image_executor() -> None:
+    """Shut down image executor if it was created"""
+    global _image_executor
+    if _image_executor is not None:
+        _image_executor.shutdown()
+        _image_executor = None
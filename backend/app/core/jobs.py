@@ -0,0 +1,149 @@
+"""
+In-process Job Queue
+asyncio 큐 + 고정 수의 워커 태스크로 오래 걸리는 작업을 요청 밖에서 실행
+- 작업 상태는 핸들러가 DB 에 저장 (재시작 시 recover 로 다시 큐잉)
+- JobEvents: 작업별 상태 변경 이벤트 구독 (SSE)
+- maintenance: 주기 작업 (작업 리스 연장 / 만료된 작업 회수)
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class JobEvents:
+    """Per-job event fan-out (이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+
+    def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+
+class JobQueue:
+    """Bounded-concurrency in-process job runner"""
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[None]],
+        workers: int = 2,
+        maintenance: Optional[Callable[[], Awaitable[Any]]] = None,
+        maintenance_interval: float = 20.0
+    ):
+        """
+        Args:
+            handler: job_id 를 받아 작업을 실행하는 코루틴 함수 (상태 저장 포함)
+            workers: 동시에 실행되는 작업 수
+            maintenance: maintenance_interval 초마다 실행하는 코루틴 함수 (실패해도 계속)
+            maintenance_interval: maintenance 실행 간격 (초)
+        """
+        self.handler = handler
+        self.workers = workers
+        self.maintenance = maintenance
+        self.maintenance_interval = maintenance_interval
+        self.events = JobEvents()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+
+    @property
+    def depth(self) -> int:
+        """대기 중 작업 수"""
+        return self._queue.qsize()
+
+    @property
+    def running(self) -> int:
+        """실행 중 작업 수"""
+        return self._running
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        if self.maintenance is not None:
+            self._tasks.append(asyncio.create_task(self._maintain(), name="job-maintenance"))
+        logger.info(f"Job queue started ({self.workers} workers)")
+
+    def submit(self, job_id: str) -> None:
+        """작업 큐잉 (DB 에 queued 상태로 저장된 이후 호출)"""
+        self._queue.put_nowait(job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._running += 1
+            try:
+                await self.handler(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 핸들러가 실패 상태 저장까지 책임지므로 여기서는 로그만 남김
+                logger.error(f"Job {job_id} crashed in worker {index}: {e}", exc_info=True)
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def _maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+            try:
+                await self.maintenance()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job queue maintenance failed: {e}", exc_info=True)
+
+    async def stop(self) -> None:
+        """워커 종료 (실행 중 작업은 취소되고 다음 시작 시 recover 로 재실행)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+# Job Queue (싱글톤)
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get or create generation job queue instance"""
+    global _job_queue
+    if _job_queue is None:
+        from config import settings
+        from app.services.ai.generation_jobs import maintain_leases, run_generation_job
+
+        logger.info(f"Initializing JobQueue (workers={settings.JOB_WORKERS})")
+        _job_queue = JobQueue(
+            handler=run_generation_job,
+            workers=settings.JOB_WORKERS,
+            maintenance=maintain_leases,
+            maintenance_interval=settings.JOB_LEASE_RENEW_SECONDS
+        )
+    return _job_queue
+
+
+async def shutdown_job_queue() -> None:
+    """Stop job queue if it was created"""
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.stop()
+        _job_queue = None
@@ -0,0 +1,230 @@
+"""
+Instrumentation
+단계별 지연 시간 / 진행 중 수 / 전송 바이트 / 캐시 적중 → Prometheus (/metrics) + Server-Timing 헤더
+- stage_timer: with / async with / 데코레이터 (동기·비동기 함수) 공용
+- 요청마다 contextvar 에 단계 시간을 모으고 MetricsMiddleware 가 Server-Timing 으로 전송
+- 워커 프로세스 안의 단계는 collect_timings 로 모아 결과와 함께 반환 → record_timings 로 기록
+"""
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# 이미지 처리(수 ms) ~ Replicate prediction(수십 초) 범위
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_SECONDS = Histogram(
+    "adgen_stage_duration_seconds", "Duration of a processing stage", ["stage"], buckets=LATENCY_BUCKETS
+)
+STAGE_IN_FLIGHT = Gauge(
+    "adgen_stage_in_flight", "Stages currently running in this process", ["stage"]
+)
+STAGE_BYTES = Counter(
+    "adgen_stage_bytes_total", "Bytes transferred by a stage", ["stage", "direction"]
+)
+CACHE_REQUESTS = Counter(
+    "adgen_cache_requests_total", "Cache lookups by result", ["cache", "result"]
+)
+HTTP_SECONDS = Histogram(
+    "adgen_http_request_duration_seconds", "HTTP request duration until the response starts",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "adgen_http_requests_in_flight", "HTTP requests currently being handled", ["method"]
+)
+# 커넥션 풀 체크아웃 대기 (풀에 여유가 있으면 수십 µs, 포화 시 DB_POOL_TIMEOUT 까지)
+DB_CHECKOUT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "adgen_db_pool_checkout_seconds", "Time spent waiting to check out a DB connection from the pool",
+    ["pool"], buckets=DB_CHECKOUT_BUCKETS
+)
+DB_POOL_TIMEOUTS = Counter(
+    "adgen_db_pool_timeouts_total", "DB connection checkouts that gave up after DB_POOL_TIMEOUT", ["pool"]
+)
+
+# 현재 요청(또는 collect_timings 범위)의 단계별 누적 시간 (초)
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+# collect_timings 범위 안에서는 히스토그램 대신 수집만 (부모 프로세스가 record_timings 로 기록)
+_deferred: ContextVar[bool] = ContextVar("stage_timings_deferred", default=False)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    """단계 시간 기록 (히스토그램 + 현재 요청의 Server-Timing)"""
+    timings = _timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    if not _deferred.get():
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def record_timings(timings: Dict[str, float]) -> None:
+    """워커에서 collect_timings 로 모은 단계 시간 기록"""
+    for stage, seconds in timings.items():
+        record_stage(stage, seconds)
+
+
+def record_bytes(stage: str, size: int, direction: str = "out") -> None:
+    """단계별 전송 바이트 (direction: in = 받은 바이트, out = 보낸 바이트)"""
+    if size:
+        STAGE_BYTES.labels(stage, direction).inc(size)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """캐시 조회 결과 (적중률 = hit / (hit + miss))"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_db_checkout(seconds: float, pool: str = "sync", timed_out: bool = False) -> None:
+    """커넥션 풀 체크아웃 대기 시간 (pool: sync | async, timed_out: 풀 포화로 실패)"""
+    DB_POOL_CHECKOUT_SECONDS.labels(pool).observe(seconds)
+    if timed_out:
+        DB_POOL_TIMEOUTS.labels(pool).inc()
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """
+    범위 안의 stage_timer 결과를 dict 로 수집 (히스토그램에는 기록하지 않음)
+    ProcessPoolExecutor 워커처럼 부모 프로세스의 레지스트리에 직접 기록할 수 없는 곳에서 사용
+    """
+    timings: Dict[str, float] = {}
+    timings_token = _timings.set(timings)
+    deferred_token = _deferred.set(True)
+    try:
+        yield timings
+    finally:
+        _deferred.reset(deferred_token)
+        _timings.reset(timings_token)
+
+
+class stage_timer:
+    """
+    단계 시간 측정
+
+    Usage:
+        with stage_timer("resize"): ...
+        async with stage_timer("storage_upload"): ...
+
+        @stage_timer("style")
+        def process_with_style(...): ...
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.seconds = 0.0
+        self._start = 0.0
+
+    def __enter__(self) -> "stage_timer":
+        self._start = time.perf_counter()
+        if not _deferred.get():
+            STAGE_IN_FLIGHT.labels(self.stage).inc()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.seconds = time.perf_counter() - self._start
+        if not _deferred.get():
+            STAGE_IN_FLIGHT.labels(self.stage).dec()
+        record_stage(self.stage, self.seconds)
+
+    async def __aenter__(self) -> "stage_timer":
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.__exit__(*exc_info)
+
+    def __call__(self, func: Callable) -> Callable:
+        stage = self.stage
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with stage_timer(stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def server_timing_header(timings: Dict[str, float], total: float) -> str:
+    """Server-Timing 헤더 값 (단위 ms)"""
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class MetricsMiddleware:
+    """
+    요청 지연 시간 / 진행 중 요청 수 기록 + Server-Timing 헤더 (ASGI 미들웨어)
+    route 라벨은 경로 템플릿 (/api/v1/jobs/{job_id}) 으로 카디널리티 제한
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        method = scope["method"]
+        observed = False
+        HTTP_IN_FLIGHT.labels(method).inc()
+
+        def observe(status_code: int) -> None:
+            nonlocal observed
+            observed = True
+            HTTP_SECONDS.labels(method, _route_label(scope), str(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(timings, time.perf_counter() - start).encode()))
+                headers.append((b"timing-allow-origin", b"*"))
+                message = {**message, "headers": headers}
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if not observed:
+                # 처리되지 않은 예외 (바깥 ServerErrorMiddleware 가 500 응답)
+                observe(500)
+            HTTP_IN_FLIGHT.labels(method).dec()
+            _timings.reset(token)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    if scope["path"].startswith(("/uploads/", "/static/")):
+        return scope["path"].split("/", 2)[1]
+    return "unmatched"
+
+
+def register_gauge(name: str, documentation: str, func: Callable[[], float]) -> Gauge:
+    """스크레이프 시점에 func() 값을 읽는 게이지 (큐 깊이, 서킷 상태 등)"""
+    gauge = Gauge(name, documentation)
+    gauge.set_function(func)
+    return gauge
+
+
+def exposition() -> tuple:
+    """(본문, content_type) - Prometheus text format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
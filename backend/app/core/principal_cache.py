@@ -0,0 +1,184 @@
+"""
+User Principal Cache
+get_current_user 의 사용자 조회 결과를 토큰 subject(email) 기준으로 캐시
+- 만료: min(USER_CACHE_TTL_SECONDS, 토큰 exp)
+- 무효화: users 행이 수정/삭제된 세션이 커밋되면 해당 user_id 항목 제거 (SQLAlchemy 세션 이벤트)
+- 프로세스별 캐시이므로 다른 워커의 변경은 TTL 이내에 반영됨
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.core.metrics import record_cache
+from app.models.schemas import User
+
+logger = logging.getLogger(__name__)
+
+# session.info 키: 커밋 시 무효화할 user_id
+_PENDING_KEY = "principal_cache_invalidate"
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """인증된 사용자 (세션에 묶이지 않는 읽기 전용 스냅샷, UserResponse 필드)"""
+    user_id: str
+    email: str
+    name: str
+    phone: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            user_id=user.user_id,
+            email=user.email,
+            name=user.name,
+            phone=user.phone,
+            created_at=user.created_at,
+        )
+
+
+class PrincipalCache:
+    """Subject → UserPrincipal TTL + LRU cache"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Args:
+            ttl_seconds: 항목 최대 수명 (토큰 exp 가 더 이르면 exp 까지)
+            max_entries: 최대 항목 수 (초과 시 가장 오래 안 쓴 항목 제거)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # subject → (principal, 만료 시각 epoch)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        # user_id → subjects (이메일 변경 시에도 이전 subject 항목 제거)
+        self._subjects: Dict[str, Set[str]] = {}
+        # 세션 이벤트는 스레드풀(동기 라우트, to_thread)에서도 발생
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[UserPrincipal]:
+        """만료되지 않은 항목 반환 (없으면 None)"""
+        with self._lock:
+            entry = self._data.get(subject)
+            if entry is not None and entry[1] <= time.time():
+                self._remove(subject)
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(subject)
+                self.hits += 1
+        record_cache("user_principal", entry is not None)
+        return entry[0] if entry is not None else None
+
+    def put(self, subject: str, principal: UserPrincipal, token_expires_at: Optional[float] = None) -> None:
+        """
+        Args:
+            subject: 토큰 sub 클레임
+            principal: DB 에서 조회한 사용자
+            token_expires_at: 토큰 exp (epoch 초)
+        """
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            if subject in self._data:
+                self._remove(subject)
+            self._data[subject] = (principal, expires_at)
+            self._subjects.setdefault(principal.user_id, set()).add(subject)
+            while len(self._data) > self.max_entries:
+                self._remove(next(iter(self._data)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """user_id 의 모든 항목 제거"""
+        with self._lock:
+            for subject in list(self._subjects.get(user_id, ())):
+                self._remove(subject)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._subjects.clear()
+
+    def _remove(self, subject: str) -> None:
+        """락을 잡은 상태에서 호출"""
+        principal, _ = self._data.pop(subject)
+        subjects = self._subjects.get(principal.user_id)
+        if subjects is not None:
+            subjects.discard(subject)
+            if not subjects:
+                del self._subjects[principal.user_id]
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# ===== users 변경 감지 → 커밋 후 무효화 =====
+# flush 시점에 지우면 커밋 전 다른 요청이 이전 값을 다시 캐시할 수 있으므로 커밋 후 제거
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    changed = {
+        obj.user_id for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, User) and obj.user_id
+    }
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    cache = _principal_cache
+    if user_ids and cache is not None:
+        for user_id in user_ids:
+            cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Principal Cache (싱글톤)
+_principal_cache: Optional[PrincipalCache] = None
+
+
+def get_principal_cache() -> Optional[PrincipalCache]:
+    """Get or create principal cache instance (None if disabled)"""
+    global _principal_cache
+    if _principal_cache is None and settings.USER_CACHE_ENABLED:
+        logger.info(
+            f"Initializing PrincipalCache (ttl={settings.USER_CACHE_TTL_SECONDS}s, "
+            f"max_entries={settings.USER_CACHE_MAX_ENTRIES})"
+        )
+        _principal_cache = PrincipalCache(
+            ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+            max_entries=settings.USER_CACHE_MAX_ENTRIES,
+        )
+    return _principal_cache
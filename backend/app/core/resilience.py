@@ -0,0 +1,420 @@
+"""
+Resilience Primitives
+외부 API(Replicate) 호출 보호: 동시성 제한 → 서킷 브레이커 → 재시도(예산 내) / 헤징
+- 느려지거나 rate limit 에 걸려도 요청이 무한정 쌓이지 않고 빠르게 실패 (라우트에서 503/429)
+- 재시도는 최근 요청 수에 비례한 예산 안에서만 (장애 시 재시도가 부하를 키우지 않도록)
+- 상태는 snapshot() 으로 노출 (/api/v1/metrics/replicate)
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출하지 않음"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open (retry after {retry_after:.0f}s)")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimitError(Exception):
+    """queue_timeout 안에 실행 슬롯을 얻지 못함"""
+
+    def __init__(self, scope: str, timeout: float):
+        super().__init__(f"No {scope} concurrency slot within {timeout}s")
+        self.scope = scope  # "global" | "key"
+        self.retry_after = timeout
+
+
+class CircuitBreaker:
+    """
+    연속 실패 기반 서킷 브레이커
+    closed → (연속 failure_threshold 회 실패) → open → (recovery_timeout 경과) → half_open
+    half_open 에서 시험 호출이 성공하면 closed, 실패하면 다시 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.opened_count = 0
+        self.rejected_count = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        호출 허용 여부 확인 (허용 시 on_success / on_failure / on_neutral 중 하나를 반드시 호출)
+
+        Raises:
+            CircuitOpenError: open 상태 또는 half_open 시험 호출 수 초과
+        """
+        state = self.state
+        if state == self.OPEN:
+            self.rejected_count += 1
+            raise CircuitOpenError(self.name, self._opened_at + self.recovery_timeout - time.monotonic())
+        if state == self.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected_count += 1
+                raise CircuitOpenError(self.name, self.recovery_timeout)
+            self._half_open_calls += 1
+
+    def on_success(self) -> None:
+        if self._state == self.HALF_OPEN:
+            logger.info(f"[Circuit:{self.name}] Closed")
+        self._state = self.CLOSED
+        self._failures = 0
+
+    def on_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(f"[Circuit:{self.name}] Opened after {self._failures} consecutive failures")
+                self.opened_count += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def on_neutral(self) -> None:
+        """서비스 장애가 아닌 결과 (잘못된 입력 등): 상태 변경 없이 시험 슬롯만 반환"""
+        if self._state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "failure_threshold": self.failure_threshold,
+            "recovery_timeout": self.recovery_timeout,
+            "retry_after": round(max(0.0, self._opened_at + self.recovery_timeout - time.monotonic()), 1)
+                if state == self.OPEN else 0.0,
+            "opened_count": self.opened_count,
+            "rejected_count": self.rejected_count
+        }
+
+
+class RetryBudget:
+    """
+    재시도 예산: 최근 window 초 동안 (요청 수 × ratio + min_retries) 회까지만 재시도/헤징 허용
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 3, window: float = 10.0):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted_count = 0
+
+    def _trim(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        now = time.monotonic()
+        self._trim(now)
+        self._requests.append(now)
+
+    def try_spend(self) -> bool:
+        """재시도 1회 사용 (예산 초과 시 False)"""
+        now = time.monotonic()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + len(self._requests) * self.ratio:
+            self.exhausted_count += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._trim(time.monotonic())
+        return {
+            "window": self.window,
+            "ratio": self.ratio,
+            "min_retries": self.min_retries,
+            "requests": len(self._requests),
+            "retries": len(self._retries),
+            "available": max(0, int(self.min_retries + len(self._requests) * self.ratio) - len(self._retries)),
+            "exhausted_count": self.exhausted_count
+        }
+
+
+class ConcurrencyLimiter:
+    """전역 + 키(사용자)별 동시 실행 수 제한, 대기 시간 초과 시 ConcurrencyLimitError"""
+
+    def __init__(self, max_concurrency: int = 10, max_per_key: int = 2, queue_timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_per_key = max_per_key
+        self.queue_timeout = queue_timeout
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._keys: Dict[str, asyncio.Semaphore] = {}
+        self._key_users: Dict[str, int] = {}
+        self.active = 0
+        self.waiting = 0
+        self.rejected_count = 0
+
+    @asynccontextmanager
+    async def acquire(self, key: Optional[str] = None):
+        key_semaphore = None
+        if key is not None:
+            key_semaphore = self._keys.setdefault(key, asyncio.Semaphore(self.max_per_key))
+            self._key_users[key] = self._key_users.get(key, 0) + 1
+
+        self.waiting += 1
+        scope = "key"
+        acquired_key = acquired_global = False
+        try:
+            # 키 슬롯 먼저: 한 사용자의 대기 요청이 전역 슬롯을 잡고 있지 않도록
+            async with asyncio.timeout(self.queue_timeout):
+                if key_semaphore is not None:
+                    await key_semaphore.acquire()
+                    acquired_key = True
+                scope = "global"
+                await self._global.acquire()
+                acquired_global = True
+        except TimeoutError:
+            self.rejected_count += 1
+            if acquired_key:
+                key_semaphore.release()
+            self._release_key(key)
+            raise ConcurrencyLimitError(scope, self.queue_timeout)
+        except BaseException:
+            if acquired_key:
+                key_semaphore.release()
+            self._release_key(key)
+            raise
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._global.release()
+            if key_semaphore is not None:
+                key_semaphore.release()
+            self._release_key(key)
+
+    def _release_key(self, key: Optional[str]) -> None:
+        if key is None:
+            return
+        self._key_users[key] -= 1
+        if self._key_users[key] == 0:
+            del self._key_users[key]
+            del self._keys[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_per_key": self.max_per_key,
+            "queue_timeout": self.queue_timeout,
+            "active": self.active,
+            "waiting": self.waiting,
+            "keys": len(self._keys),
+            "rejected_count": self.rejected_count
+        }
+
+
+class Resilience:
+    """
+    ConcurrencyLimiter + CircuitBreaker + RetryBudget 조합 호출기
+
+    Args:
+        classify: 예외 → "retry" (일시 장애, 재시도), "fail" (장애, 재시도 안 함),
+                  "neutral" (서비스 장애 아님, 브레이커 미집계)
+        hedge_delay: 설정 시 첫 시도가 이 시간 안에 끝나지 않으면 두 번째 시도를 병행 (예산 사용)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limiter: ConcurrencyLimiter,
+        breaker: CircuitBreaker,
+        budget: RetryBudget,
+        classify: Callable[[BaseException], str],
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        hedge_delay: Optional[float] = None
+    ):
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self.budget = budget
+        self.classify = classify
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_delay = hedge_delay
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @asynccontextmanager
+    async def slot(self, key: Optional[str] = None):
+        """
+        동시성 슬롯 (protect / hedge 로 나눠 감쌀 때 호출 전체를 묶음)
+
+        Raises:
+            ConcurrencyLimitError: 실행 슬롯 대기 시간 초과
+        """
+        async with self.limiter.acquire(key):
+            yield
+
+    async def call(self, func: Callable[[], Awaitable[T]], key: Optional[str] = None) -> T:
+        """
+        슬롯 안에서 func 실행 (시도마다 새로 호출, 시도마다 헤징)
+
+        func 전체가 재시도되므로 부작용 없이 다시 실행해도 되는 호출에만 사용
+        (Replicate prediction 은 생성만 protect, 완료 대기는 같은 prediction 으로 observe - generation.run_prediction)
+
+        Raises:
+            ConcurrencyLimitError: 실행 슬롯 대기 시간 초과
+            CircuitOpenError: 서킷 open
+            func 의 마지막 예외: 재시도 불가/횟수 초과/예산 소진
+        """
+        async with self.slot(key):
+            return await self.protect(lambda: self.hedge(func))
+
+    async def protect(self, func: Callable[[], Awaitable[T]], record_success: bool = True) -> T:
+        """
+        서킷 브레이커 + 재시도(예산 내)로 func 실행 (동시성 슬롯은 잡지 않음)
+
+        Args:
+            record_success: False 면 성공을 브레이커에 기록하지 않음
+                (호출의 첫 단계일 때, 나머지 단계의 결과를 observe 로 기록)
+
+        Raises:
+            CircuitOpenError: 서킷 open
+            func 의 마지막 예외: 재시도 불가/횟수 초과/예산 소진
+        """
+        self.calls += 1
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.breaker.before_call()
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                self.breaker.on_neutral()
+                raise
+            except Exception as e:
+                kind = self.classify(e)
+                if kind == "neutral":
+                    self.breaker.on_neutral()
+                    raise
+                self.breaker.on_failure()
+                self.failures += 1
+                if kind != "retry" or attempt >= self.max_attempts or not self.budget.try_spend():
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+                delay *= random.uniform(0.5, 1.0)  # jitter
+                self.retries += 1
+                logger.warning(f"[{self.name}] Attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            if record_success:
+                self.breaker.on_success()
+            return result
+
+    async def observe(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        재시도 없이 func 실행 후 결과만 브레이커에 기록 (protect(record_success=False) 로 시작한 호출의 나머지 단계)
+        다시 실행하면 안 되는 단계(이미 만든 prediction 의 완료 대기)의 장애도 서킷에 반영
+
+        Raises:
+            func 의 예외
+        """
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            self.breaker.on_neutral()
+            raise
+        except Exception as e:
+            if self.classify(e) == "neutral":
+                self.breaker.on_neutral()
+            else:
+                self.breaker.on_failure()
+                self.failures += 1
+            raise
+        self.breaker.on_success()
+        return result
+
+    async def hedge(self, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        hedge_delay 안에 끝나지 않으면 func 를 하나 더 실행해 먼저 성공한 결과 사용 (예산 사용)
+        hedge_delay 미설정 시 func 그대로 실행
+        """
+        if self.hedge_delay is None:
+            return await func()
+
+        primary = asyncio.ensure_future(func())
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay)
+        if done or not self.budget.try_spend():
+            return await primary
+
+        self.hedges += 1
+        hedge = asyncio.ensure_future(func())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 남은 시도 취소 (지는 쪽 prediction 은 생성기가 취소 요청)
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "max_attempts": self.max_attempts,
+            "hedge_delay": self.hedge_delay,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "breaker": self.breaker.snapshot(),
+            "limiter": self.limiter.snapshot(),
+            "retry_budget": self.budget.snapshot()
+        }
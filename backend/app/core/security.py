@@ -1,22 +1,31 @@
 """
 보안 관련 함수
-- 비밀번호 해싱/검증
+- 비밀번호 해싱/검증 (bcrypt, 전용 스레드 풀에서 실행)
 - JWT 토큰 생성/검증
 """
+import asyncio
 import bcrypt
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from typing import Optional
+from typing import Any, Callable, Optional
 from config import settings
+from app.core.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
 
 # 비밀번호 해싱
+@stage_timer("password_hash")
 def hash_password(password: str) -> str:
-    """비밀번호 해싱"""
-    salt = bcrypt.gensalt()
+    """비밀번호 해싱 (cost: settings.BCRYPT_ROUNDS)"""
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 # 비밀번호 검증
+@stage_timer("password_verify")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """비밀번호 검증"""
     return bcrypt.checkpw(
@@ -24,6 +33,70 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         hashed_password.encode('utf-8')
     )
 
+def needs_rehash(hashed_password: str) -> bool:
+    """저장된 해시의 cost ($2b$<cost>$...) 가 설정값과 다르면 True"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+# ===== 비밀번호 해싱 스레드 풀 =====
+# bcrypt 는 해싱 중 GIL 을 놓으므로 스레드로 충분 (로그인 폭주 시 이벤트 루프 대신 풀에서 대기)
+_password_executor: Optional[ThreadPoolExecutor] = None
+_password_pending = 0
+
+
+def get_password_executor() -> Optional[ThreadPoolExecutor]:
+    """Get or create password hashing pool (None if PASSWORD_HASH_WORKERS=0 → 이벤트 루프에서 직접 실행)"""
+    global _password_executor
+    if _password_executor is None and settings.PASSWORD_HASH_WORKERS > 0:
+        logger.info(f"Initializing password hash pool (workers={settings.PASSWORD_HASH_WORKERS})")
+        _password_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash",
+        )
+    return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Shut down password hashing pool if it was created"""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True, cancel_futures=True)
+        _password_executor = None
+
+
+def password_hash_pending() -> int:
+    """풀에서 실행 중 + 대기 중인 해싱/검증 수"""
+    return _password_pending
+
+
+async def _run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    global _password_pending
+    executor = get_password_executor()
+    if executor is None:
+        return func(*args)
+    _password_pending += 1
+    try:
+        # run_in_executor 는 contextvars 를 복사하지 않음 → 요청 컨텍스트에서 실행해야
+        # password_hash / password_verify 단계 시간이 Server-Timing 에 기록됨
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(executor, context.run, func, *args)
+    finally:
+        _password_pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password 를 해싱 풀에서 실행"""
+    return await _run_password_task(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password 를 해싱 풀에서 실행"""
+    return await _run_password_task(verify_password, plain_password, hashed_password)
+
+
 # JWT 토큰 생성
 def create_access_token(data: dict) -> str:
     """JWT 액세스 토큰 생성"""
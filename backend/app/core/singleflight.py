@@ -0,0 +1,44 @@
+"""
+Single-flight
+같은 키로 동시에 들어온 비동기 호출을 하나로 합침 (첫 호출만 실행, 나머지는 결과 공유)
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls per key (이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0  # 진행 중인 호출에 합류한 횟수
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        키가 같은 호출이 진행 중이면 그 결과를 기다리고, 아니면 func 실행
+
+        Args:
+            key: 중복 판단 키
+            func: 실제 작업 코루틴 함수 (인자 없음)
+
+        Returns:
+            func 결과 (예외도 모든 대기자에게 전달)
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            logger.info(f"Joining in-flight call: {key}")
+            # 대기자 한 명이 취소돼도 공유 작업은 계속 진행
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
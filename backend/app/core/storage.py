@@ -1,99 +1,552 @@
 """
 GCS Storage Helper Functions
-업데이트: download_from_gcs, upload_to_gcs 추가
+업데이트: 비동기 Storage 추상화 (GCS / 로컬 파일시스템)
+- 블로킹 GCS 호출은 제한된 스레드 풀에서 실행 (이벤트 루프 비차단)
+- STORAGE_BACKEND=local 이면 LOCAL_STORAGE_DIR 에 저장 (/uploads 로 제공)
+업데이트: 단일 스토리지 서비스로 통합
+- 클라이언트 1개 + HTTP 커넥션 풀 공유, 버킷 핸들 캐시
+- 요청 타임아웃 설정, 작업별 지연 시간 메트릭 (/api/v1/metrics/storage)
+- signed_url: 외부 서비스(Replicate)가 비공개 객체를 직접 읽을 수 있는 임시 URL
+- upload_stream: 크기를 모르는 스트림을 청크 단위로 업로드 (GCS resumable upload)
+- STORAGE_EMULATOR_HOST: GCS JSON API 에뮬레이터 사용 (fakes/gcs_server.py, 부하 테스트)
 """
 
 from google.cloud import storage
 from google.oauth2 import service_account
 from config import settings
+from app.core.metrics import record_bytes, stage_timer
+import abc
+import asyncio
 import logging
-from typing import Optional
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Deque, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
 _storage_client = None
+# 클라이언트 생성에 쓴 자격 증명 (서명 URL 용) / 인증 HTTP 세션 (resumable upload 용)
+# 클라이언트 내부 속성 (_credentials, _http) 대신 사용
+_storage_credentials = None
+_storage_session = None
 
 def get_storage_client():
-    """GCS 클라이언트 가져오기 (싱글톤)"""
-    global _storage_client
+    """
+    GCS 클라이언트 가져오기 (싱글톤)
+    모든 스토리지 호출이 공유하는 단일 HTTP 세션 (커넥션 풀 크기 = STORAGE_HTTP_POOL_SIZE)
+    """
+    global _storage_client, _storage_credentials, _storage_session
     
     if _storage_client is None:
-        if settings.GOOGLE_APPLICATION_CREDENTIALS:
+        import google.auth
+        from google.auth.transport.requests import AuthorizedSession
+        from requests.adapters import HTTPAdapter
+        
+        scopes = ["https://www.googleapis.com/auth/devstorage.read_write"]
+        client_options = None
+        if settings.STORAGE_EMULATOR_HOST:
+            # 에뮬레이터: 인증 없음
+            from google.auth.credentials import AnonymousCredentials
+            credentials, project = AnonymousCredentials(), "emulator"
+            client_options = {"api_endpoint": settings.STORAGE_EMULATOR_HOST}
+        elif settings.GOOGLE_APPLICATION_CREDENTIALS:
             credentials = service_account.Credentials.from_service_account_file(
-                settings.GOOGLE_APPLICATION_CREDENTIALS
+                settings.GOOGLE_APPLICATION_CREDENTIALS,
+                scopes=scopes
             )
-            _storage_client = storage.Client(credentials=credentials)
+            project = credentials.project_id
         else:
-            _storage_client = storage.Client()
+            # 환경 변수 / 메타데이터 서버 기반 (배포 환경)
+            credentials, project = google.auth.default(scopes=scopes)
+        
+        # 기본 requests 풀(10개)은 스토리지 스레드 수보다 작을 수 있으므로 명시적으로 설정
+        session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(
+            pool_connections=settings.STORAGE_HTTP_POOL_SIZE,
+            pool_maxsize=settings.STORAGE_HTTP_POOL_SIZE
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
         
-        logger.info("GCS Storage 클라이언트 초기화 완료")
+        _storage_credentials = credentials
+        _storage_session = session
+        _storage_client = storage.Client(
+            project=project,
+            credentials=credentials,
+            _http=session,
+            client_options=client_options
+        )
+        
+        logger.info(f"GCS Storage 클라이언트 초기화 완료 (pool={settings.STORAGE_HTTP_POOL_SIZE})")
     
     return _storage_client
 
 
-def download_from_gcs(gcs_path: str, bucket_name: Optional[str] = None) -> bytes:
-    """
-    GCS에서 파일 다운로드
+def get_storage_credentials():
+    """get_storage_client 가 사용하는 자격 증명 (필요 시 클라이언트 생성)"""
+    get_storage_client()
+    return _storage_credentials
+
+
+def get_storage_session():
+    """get_storage_client 가 사용하는 AuthorizedSession (커넥션 풀 공유, 필요 시 클라이언트 생성)"""
+    get_storage_client()
+    return _storage_session
+
+
+class StorageMetrics:
+    """Per-operation latency metrics (최근 window 개 샘플 기준 백분위)"""
     
-    Args:
-        gcs_path: GCS 경로 (예: uploads/xxx.jpg)
-        bucket_name: 버킷명 (기본값: settings.GCS_BUCKET_NAME)
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._bytes: Dict[str, int] = {}
     
-    Returns:
-        파일 바이트 데이터
+    def record(self, op: str, duration: float, error: bool = False, size: int = 0) -> None:
+        with self._lock:
+            self._samples.setdefault(op, deque(maxlen=self.window)).append(duration)
+            self._counts[op] = self._counts.get(op, 0) + 1
+            self._bytes[op] = self._bytes.get(op, 0) + size
+            if error:
+                self._errors[op] = self._errors.get(op, 0) + 1
+    
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for op, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[op] = {
+                    "count": self._counts[op],
+                    "errors": self._errors.get(op, 0),
+                    "bytes": self._bytes[op],
+                    "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+                    "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+                    "max_ms": round(ordered[-1] * 1000, 2),
+                }
+            return result
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    index = min(int(q * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+# ===== 비동기 Storage 추상화 =====
+
+class SignedUrlUnavailable(Exception):
+    """백엔드가 외부에서 읽을 수 있는 URL 을 만들 수 없음 (호출자는 다른 전송 방식으로 대체)"""
+
+
+class Storage(abc.ABC):
     """
-    try:
-        bucket_name = bucket_name or settings.GCS_BUCKET_NAME
-        client = get_storage_client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(gcs_path)
-        
-        logger.info(f"Downloading from GCS: gs://{bucket_name}/{gcs_path}")
-        
-        data = blob.download_as_bytes()
-        
-        logger.info(f"Downloaded {len(data)} bytes")
-        return data
-        
-    except Exception as e:
-        logger.error(f"Error downloading from GCS: {e}", exc_info=True)
-        raise
+    Async storage base class
+    하위 클래스는 블로킹 _upload / _download / _exists / _start_upload 와 URL 변환만 구현하고,
+    공개 메서드는 전용 스레드 풀에서 실행되는 awaitable
+    _signed_url 은 선택 (기본: SignedUrlUnavailable)
+    """
+
+    def __init__(self, max_workers: int = 8, upload_chunk_size: int = 1024 * 1024):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="storage"
+        )
+        self.upload_chunk_size = upload_chunk_size
+        self.metrics = StorageMetrics()
+
+    async def _run(self, op: str, func, *args):
+        # 요청 관점 시간 (스레드 풀 대기 포함) → Prometheus / Server-Timing
+        async with stage_timer(f"storage_{op}"):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, op, func, *args)
 
+    def _timed(self, op: str, func, *args):
+        # 스레드 안에서 측정 (큐 대기 시간 제외, 순수 스토리지 지연 시간)
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except FileNotFoundError:
+            self.metrics.record(op, time.perf_counter() - start)
+            raise
+        except Exception:
+            self.metrics.record(op, time.perf_counter() - start, error=True)
+            raise
+        duration = time.perf_counter() - start
+        if op in ("upload", "upload_chunk"):
+            size = len(args[0])
+            record_bytes(f"storage_{op}", size, "out")
+        elif isinstance(result, bytes):
+            size = len(result)
+            record_bytes(f"storage_{op}", size, "in")
+        else:
+            size = 0
+        self.metrics.record(op, duration, size=size)
+        return result
+
+    async def upload(self, data: bytes, path: str, content_type: str = "image/jpeg") -> str:
+        """
+        파일 업로드
+
+        Args:
+            data: 업로드할 바이트
+            path: 저장 경로 (예: user_id/xxx.jpg)
+            content_type: 파일 타입
+
+        Returns:
+            공개 URL
+        """
+        logger.info(f"Uploading to storage: {path} ({len(data)} bytes)")
+        await self._run("upload", self._upload, data, path, content_type)
+        return self.public_url(path)
+
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        path: str,
+        content_type: str = "image/jpeg"
+    ) -> str:
+        """
+        스트림 업로드 (전체를 메모리에 모으지 않고 upload_chunk_size 단위로 전송)
+        실패/취소 시 부분 업로드는 버림
+
+        Args:
+            chunks: 업로드할 바이트 청크 (async iterator)
+            path: 저장 경로
+            content_type: 파일 타입
+
+        Returns:
+            공개 URL
+        """
+        logger.info(f"Streaming upload to storage: {path}")
+        writer = await self._run("upload_start", self._start_upload, path, content_type)
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                buffer.extend(chunk)
+                if len(buffer) >= self.upload_chunk_size:
+                    # 마지막 청크 외에는 upload_chunk_size 의 배수로 전송 (GCS 256KiB 정렬)
+                    size = len(buffer) - len(buffer) % self.upload_chunk_size
+                    await self._run("upload_chunk", writer.write, bytes(buffer[:size]), False)
+                    del buffer[:size]
+            await self._run("upload_chunk", writer.write, bytes(buffer), True)
+        except BaseException:
+            await asyncio.shield(self._run("upload_abort", writer.abort))
+            raise
+        return self.public_url(path)
+
+    async def download(self, path: str) -> bytes:
+        """파일 다운로드 (없으면 FileNotFoundError)"""
+        logger.info(f"Downloading from storage: {path}")
+        return await self._run("download", self._download, path)
+
+    async def exists(self, path: str) -> bool:
+        """파일 존재 여부"""
+        return await self._run("exists", self._exists, path)
+
+    async def signed_url(self, path: str, expires_in: int = 3600) -> str:
+        """
+        외부에서 읽을 수 있는 임시 URL
+
+        Args:
+            path: 저장 경로
+            expires_in: 유효 시간 (초)
+
+        Raises:
+            SignedUrlUnavailable: 백엔드가 외부 접근 URL 을 만들 수 없는 경우
+        """
+        return await self._run("sign", self._signed_url, path, expires_in)
+
+    @abc.abstractmethod
+    def public_url(self, path: str) -> str:
+        ...
 
-def upload_to_gcs(
-    file_data: bytes,
-    destination_path: str,
-    content_type: str = "image/jpeg",
-    bucket_name: Optional[str] = None
-) -> str:
+    @abc.abstractmethod
+    def path_from_url(self, url: str) -> str:
+        """public_url 의 역변환 (DB 에 저장된 URL → 저장 경로)"""
+
+    @abc.abstractmethod
+    def _upload(self, data: bytes, path: str, content_type: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def _download(self, path: str) -> bytes:
+        ...
+
+    @abc.abstractmethod
+    def _exists(self, path: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def _start_upload(self, path: str, content_type: str):
+        """write(data, final) / abort() 를 가진 스트림 업로드 핸들"""
+
+    def _signed_url(self, path: str, expires_in: int) -> str:
+        raise SignedUrlUnavailable(f"{type(self).__name__} does not support signed URLs")
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+RESUMABLE_CHUNK_ALIGNMENT = 256 * 1024
+
+
+class _GCSResumableWriter:
     """
-    GCS에 파일 업로드
-    
-    Args:
-        file_data: 업로드할 파일 데이터
-        destination_path: GCS 경로 (예: ai_generated/xxx.jpg)
-        content_type: 파일 타입
-        bucket_name: 버킷명 (기본값: settings.GCS_BUCKET_NAME)
-    
-    Returns:
-        공개 URL (https://storage.googleapis.com/...)
+    GCS resumable upload 세션 (전체 크기를 모르는 스트림용)
+    https://cloud.google.com/storage/docs/performing-resumable-uploads#chunked-upload
     """
-    try:
-        bucket_name = bucket_name or settings.GCS_BUCKET_NAME
-        client = get_storage_client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(destination_path)
-        
-        logger.info(f"Uploading to GCS: gs://{bucket_name}/{destination_path}")
-        
-        blob.upload_from_string(file_data, content_type=content_type)
-        
-        # 공개 URL 생성
-        public_url = f"https://storage.googleapis.com/{bucket_name}/{destination_path}"
-        
-        logger.info(f"Upload complete: {public_url}")
-        return public_url
-        
-    except Exception as e:
-        logger.error(f"Error uploading to GCS: {e}", exc_info=True)
-        raise
\ No newline at end of file
+
+    def __init__(self, session, upload_url: str, timeout):
+        self.session = session
+        self.upload_url = upload_url
+        self.timeout = timeout
+        self.offset = 0
+
+    def write(self, data: bytes, final: bool) -> None:
+        total = str(self.offset + len(data)) if final else "*"
+        if data:
+            content_range = f"bytes {self.offset}-{self.offset + len(data) - 1}/{total}"
+        else:
+            content_range = f"bytes */{total}"
+        response = self.session.put(
+            self.upload_url,
+            data=data,
+            headers={"Content-Range": content_range},
+            timeout=self.timeout
+        )
+        # 308: 청크 수신 (계속), 200/201: 업로드 완료
+        expected = (200, 201) if final else (308,)
+        if response.status_code not in expected:
+            raise IOError(f"Resumable upload failed ({response.status_code}): {response.text[:200]}")
+        self.offset += len(data)
+
+    def abort(self) -> None:
+        try:
+            self.session.delete(self.upload_url, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Failed to cancel resumable upload: {e}")
+
+
+class GCSStorage(Storage):
+    """Google Cloud Storage backend"""
+
+    def __init__(
+        self,
+        bucket_name: str,
+        max_workers: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        upload_chunk_size: int = 1024 * 1024,
+        endpoint: Optional[str] = None
+    ):
+        """
+        Args:
+            endpoint: 에뮬레이터 주소 (None 이면 storage.googleapis.com, 공개 URL / 서명 URL 에도 사용)
+        """
+        # resumable upload 청크는 256KiB 의 배수여야 함
+        upload_chunk_size = max(RESUMABLE_CHUNK_ALIGNMENT, upload_chunk_size - upload_chunk_size % RESUMABLE_CHUNK_ALIGNMENT)
+        super().__init__(max_workers=max_workers, upload_chunk_size=upload_chunk_size)
+        self.bucket_name = bucket_name
+        self.endpoint = endpoint.rstrip("/") if endpoint else None
+        self.base_url = f"{self.endpoint or 'https://storage.googleapis.com'}/{bucket_name}/"
+        self.timeout = (connect_timeout, read_timeout)
+        self._buckets = {}
+
+    def get_bucket(self, bucket_name: Optional[str] = None):
+        """버킷 핸들 (이름별 캐시, 매 호출마다 client.bucket() 재생성하지 않음)"""
+        bucket_name = bucket_name or self.bucket_name
+        bucket = self._buckets.get(bucket_name)
+        if bucket is None:
+            bucket = self._buckets.setdefault(bucket_name, get_storage_client().bucket(bucket_name))
+        return bucket
+
+    @property
+    def bucket(self):
+        return self.get_bucket()
+
+    def public_url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def path_from_url(self, url: str) -> str:
+        if url.startswith(self.base_url):
+            return url[len(self.base_url):]
+        if url.startswith('http'):
+            # 다른 버킷 URL: https://storage.googleapis.com/bucket-name/user_id/xxx.jpg
+            return url.split('/', 4)[-1]
+        return url.lstrip('/')
+
+    def _upload(self, data: bytes, path: str, content_type: str) -> None:
+        self.bucket.blob(path).upload_from_string(data, content_type=content_type, timeout=self.timeout)
+
+    def _download(self, path: str) -> bytes:
+        from google.api_core.exceptions import NotFound
+        try:
+            return self.bucket.blob(path).download_as_bytes(timeout=self.timeout)
+        except NotFound:
+            raise FileNotFoundError(path)
+
+    def _exists(self, path: str) -> bool:
+        return self.bucket.blob(path).exists(timeout=self.timeout)
+
+    def _start_upload(self, path: str, content_type: str) -> _GCSResumableWriter:
+        upload_url = self.bucket.blob(path).create_resumable_upload_session(
+            content_type=content_type,
+            timeout=self.timeout
+        )
+        return _GCSResumableWriter(get_storage_session(), upload_url, self.timeout)
+
+    def _signed_url(self, path: str, expires_in: int) -> str:
+        if self.endpoint:
+            # 에뮬레이터는 인증이 없으므로 공개 URL 로 충분
+            return self.public_url(path)
+
+        from datetime import timedelta
+        from google.auth.credentials import Signing
+        from google.auth.transport.requests import Request
+
+        credentials = get_storage_credentials()
+        kwargs = {}
+        if not isinstance(credentials, Signing):
+            # 메타데이터 서버 자격 증명 (Cloud Run): 개인 키가 없으므로 IAM signBlob 으로 서명
+            # (서비스 계정에 roles/iam.serviceAccountTokenCreator 필요)
+            if not credentials.valid:
+                credentials.refresh(Request())
+            kwargs = {
+                "service_account_email": credentials.service_account_email,
+                "access_token": credentials.token
+            }
+        return self.bucket.blob(path).generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expires_in),
+            method="GET",
+            **kwargs
+        )
+
+
+class _LocalStreamWriter:
+    """임시 파일에 이어 쓰고 완료 시 원자적으로 교체"""
+
+    def __init__(self, full_path: str):
+        self.full_path = full_path
+        self.tmp_path = f"{full_path}.{os.getpid()}.{threading.get_ident()}.part"
+        self.file = open(self.tmp_path, "wb")
+
+    def write(self, data: bytes, final: bool) -> None:
+        self.file.write(data)
+        if final:
+            self.file.close()
+            os.replace(self.tmp_path, self.full_path)
+
+    def abort(self) -> None:
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class LocalStorage(Storage):
+    """Local filesystem backend (로컬 개발/테스트용, main.py 가 /uploads 로 제공)"""
+
+    URL_PREFIX = "/uploads/"
+
+    def __init__(
+        self,
+        directory: str,
+        max_workers: int = 8,
+        upload_chunk_size: int = 1024 * 1024,
+        public_base_url: Optional[str] = None
+    ):
+        """
+        Args:
+            directory: 저장 디렉토리
+            public_base_url: 외부에서 접근 가능한 서버 주소 (예: http://127.0.0.1:8000, signed_url 용)
+        """
+        super().__init__(max_workers=max_workers, upload_chunk_size=upload_chunk_size)
+        self.directory = os.path.abspath(directory)
+        self.public_base_url = public_base_url.rstrip('/') if public_base_url else None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _full_path(self, path: str) -> str:
+        full_path = os.path.abspath(os.path.join(self.directory, path))
+        if not full_path.startswith(self.directory + os.sep):
+            raise ValueError(f"Invalid storage path: {path}")
+        return full_path
+
+    def public_url(self, path: str) -> str:
+        return f"{self.URL_PREFIX}{path}"
+
+    def path_from_url(self, url: str) -> str:
+        if url.startswith(self.URL_PREFIX):
+            return url[len(self.URL_PREFIX):]
+        return url.lstrip('/')
+
+    def _upload(self, data: bytes, path: str, content_type: str) -> None:
+        full_path = self._full_path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        tmp_path = f"{full_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, full_path)
+
+    def _download(self, path: str) -> bytes:
+        with open(self._full_path(path), "rb") as f:
+            return f.read()
+
+    def _exists(self, path: str) -> bool:
+        return os.path.isfile(self._full_path(path))
+
+    def _start_upload(self, path: str, content_type: str) -> _LocalStreamWriter:
+        full_path = self._full_path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        return _LocalStreamWriter(full_path)
+
+    def _signed_url(self, path: str, expires_in: int) -> str:
+        # /uploads 는 공개 정적 경로 → 서명 없이 절대 URL
+        if not self.public_base_url:
+            raise SignedUrlUnavailable("LOCAL_STORAGE_PUBLIC_BASE_URL is not set")
+        self._full_path(path)
+        return f"{self.public_base_url}{self.public_url(path)}"
+
+
+# Storage (싱글톤)
+_storage: Optional[Storage] = None
+
+
+def get_storage() -> Storage:
+    """Get or create storage instance (STORAGE_BACKEND: gcs | local)"""
+    global _storage
+    if _storage is None:
+        backend = settings.STORAGE_BACKEND
+        logger.info(f"Initializing Storage ({backend})")
+        if backend == "gcs":
+            _storage = GCSStorage(
+                bucket_name=settings.GCS_BUCKET_NAME or "adgen-uploads-2026",
+                max_workers=settings.STORAGE_MAX_WORKERS,
+                connect_timeout=settings.STORAGE_CONNECT_TIMEOUT,
+                read_timeout=settings.STORAGE_READ_TIMEOUT,
+                upload_chunk_size=settings.STORAGE_UPLOAD_CHUNK_KB * 1024,
+                endpoint=settings.STORAGE_EMULATOR_HOST
+            )
+        elif backend == "local":
+            _storage = LocalStorage(
+                directory=settings.LOCAL_STORAGE_DIR,
+                max_workers=settings.STORAGE_MAX_WORKERS,
+                upload_chunk_size=settings.STORAGE_UPLOAD_CHUNK_KB * 1024,
+                public_base_url=settings.LOCAL_STORAGE_PUBLIC_BASE_URL
+            )
+        else:
+            raise ValueError(f"Invalid STORAGE_BACKEND '{backend}'. Choose from: gcs, local")
+    return _storage
+
+
+def shutdown_storage() -> None:
+    """Shut down storage thread pool if it was created"""
+    global _storage
+    if _storage is not None:
+        _storage.shutdown()
+        _storage = None
@@ -1,49 +1,176 @@
 """
 Database configuration
 Supports both SQLite and Cloud SQL based on DATABASE_URL
+- 엔진은 create_db_engine 한 곳에서 생성 (풀 크기 / pre-ping / recycle 은 settings)
+- 비동기 엔진 (get_async_engine / get_async_db): 요청 경로용, 같은 DB 를 asyncpg / aiosqlite 로 연결
+- 커넥션 풀 체크아웃 대기 시간 / 사용률 계측 (InstrumentedQueuePool → /metrics, /api/v1/metrics/db)
+- 종료 시 dispose_engine / dispose_async_engine (풀 정리 + Cloud SQL Connector 종료)
+- Cloud SQL: 동기 엔진의 Connector 는 처음 연결할 때 생성 (서버는 비동기 엔진만 연결 → 인스턴스당 Connector 1개)
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+import asyncio
+import threading
+import time
 import logging
 
+from config import settings
+from app.core.metrics import record_db_checkout
+
 logger = logging.getLogger(__name__)
 
-# DATABASE_URL 읽기
-DATABASE_URL = os.getenv("DATABASE_URL")
+# 환경별 기본 (pool_size, max_overflow) - DB_POOL_SIZE / DB_MAX_OVERFLOW 로 덮어씀
+# production: Cloud Run 인스턴스 수 × (pool_size + max_overflow) 가 Cloud SQL max_connections 를
+#             넘지 않도록 작게 (서버는 비동기 엔진만 연결, 동기 엔진은 스크립트 / 벤치마크용)
+POOL_DEFAULTS: Dict[str, Tuple[int, int]] = {
+    "production": (5, 2),
+    "loadtest": (10, 10),
+}
+DEFAULT_POOL = (5, 10)
 
-logger.info(f"🔧 DATABASE_URL: {DATABASE_URL[:50] if DATABASE_URL else 'Not set'}...")
 
-# SQLite vs PostgreSQL 판단
-if DATABASE_URL and DATABASE_URL.startswith("sqlite"):
-    # ===== SQLite 설정 =====
-    logger.info("📁 Using SQLite database")
-    
-    engine = create_engine(
-        DATABASE_URL,
-        connect_args={"check_same_thread": False},
-        echo=False
-    )
-    
-elif DATABASE_URL and DATABASE_URL.startswith("postgresql"):
-    # ===== PostgreSQL 직접 연결 =====
-    logger.info("🐘 Using PostgreSQL (direct connection)")
-    
-    engine = create_engine(
-        DATABASE_URL,
-        echo=False
-    )
-    
-else:
+class InstrumentedQueuePool(QueuePool):
+    """체크아웃 대기 시간 / 타임아웃 / 사용률을 기록하는 QueuePool"""
+
+    label = "sync"  # 메트릭 pool 라벨
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.max_overflow_limit = kwargs.get("max_overflow", 10)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.timeouts += 1
+            record_db_checkout(waited, self.label, timed_out=True)
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        record_db_checkout(waited, self.label)
+        return connection
+
+    @property
+    def capacity(self) -> int:
+        """동시에 열 수 있는 최대 연결 수 (pool_size + max_overflow)"""
+        return self.size() + max(self.max_overflow_limit, 0)
+
+    @property
+    def utilization(self) -> float:
+        """체크아웃된 연결 / capacity"""
+        return self.checkedout() / self.capacity if self.capacity else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self.max_overflow_limit,
+            "timeout": self._timeout,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "utilization": round(self.utilization, 4),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+        }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool 계측 버전 (비동기 엔진)"""
+
+    label = "async"
+
+
+def pool_options(poolclass: type = InstrumentedQueuePool) -> Dict[str, Any]:
+    """settings 기반 풀 설정 (create_engine / create_async_engine 인자)"""
+    pool_size, max_overflow = POOL_DEFAULTS.get(settings.ENVIRONMENT, DEFAULT_POOL)
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE if settings.DB_POOL_SIZE is not None else pool_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW if settings.DB_MAX_OVERFLOW is not None else max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+class LazyConnector:
+    """
+    처음 연결할 때 Cloud SQL Connector 생성
+    (쓰이지 않는 동기 엔진이 백그라운드 루프 스레드 / 인증서 갱신을 따로 돌리지 않도록)
+    """
+
+    def __init__(self):
+        self._connector: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def connect(self, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self._connector is None:
+                from google.cloud.sql.connector import Connector
+
+                self._connector = Connector()
+                logger.info("☁️ Cloud SQL Connector created (sync engine)")
+        return self._connector.connect(*args, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connector is not None:
+                self._connector.close()
+                self._connector = None
+
+
+def create_db_engine(database_url: Optional[str] = None) -> Tuple[Engine, Optional[Any]]:
+    """
+    DATABASE_URL 에 맞는 엔진 생성
+
+    Args:
+        database_url: 기본값 settings.DATABASE_URL (없으면 Cloud SQL Connector)
+
+    Returns:
+        (engine, LazyConnector 또는 None)
+    """
+    database_url = database_url or settings.DATABASE_URL
+    logger.info(f"🔧 DATABASE_URL: {database_url[:50] if database_url else 'Not set'}...")
+
+    # SQLite vs PostgreSQL 판단
+    if database_url and database_url.startswith("sqlite"):
+        # ===== SQLite 설정 =====
+        logger.info("📁 Using SQLite database")
+        options = {"connect_args": {"check_same_thread": False}}
+        # 인메모리 DB 는 연결마다 별도 DB 이므로 SQLAlchemy 기본 풀(SingletonThreadPool) 유지
+        if ":memory:" not in database_url and "mode=memory" not in database_url:
+            options.update(pool_options())
+        return create_engine(database_url, echo=False, **options), None
+
+    if database_url and database_url.startswith("postgresql"):
+        # ===== PostgreSQL 직접 연결 =====
+        logger.info("🐘 Using PostgreSQL (direct connection)")
+        return create_engine(database_url, echo=False, **pool_options()), None
+
     # ===== Cloud SQL Connector 사용 (환경 변수 기반) =====
     logger.info("☁️ Using Cloud SQL Connector")
-    
-    from google.cloud.sql.connector import Connector
-    from config import settings
-    
-    connector = Connector()
-    
+
+    connector = LazyConnector()
+
     def getconn():
         """Cloud SQL 연결 생성"""
         conn = connector.connect(
@@ -54,11 +181,21 @@ else:
             db=settings.DB_NAME
         )
         return conn
-    
+
     engine = create_engine(
         "postgresql+pg8000://",
         creator=getconn,
-        echo=False
+        echo=False,
+        **pool_options()
+    )
+    return engine, connector
+
+
+engine, _connector = create_db_engine()
+if isinstance(engine.pool, InstrumentedQueuePool):
+    logger.info(
+        f"🔌 DB pool: size={engine.pool.size()}, max_overflow={engine.pool.max_overflow_limit}, "
+        f"recycle={settings.DB_POOL_RECYCLE_SECONDS}s, pre_ping={settings.DB_POOL_PRE_PING}"
     )
 
 # Base 클래스 생성
@@ -76,4 +213,128 @@ def get_db():
     finally:
         db.close()
 
-logger.info("✅ Database configuration loaded")
\ No newline at end of file
+
+def get_pool_snapshot(target: Optional[Engine] = None) -> Optional[Dict[str, Any]]:
+    """커넥션 풀 상태 (계측 풀이 아니면 None, 예: 인메모리 SQLite)"""
+    pool = (target or engine).pool
+    return pool.snapshot() if isinstance(pool, InstrumentedQueuePool) else None
+
+
+def dispose_engine() -> None:
+    """풀의 연결을 닫고 Cloud SQL Connector 종료 (lifespan 종료 시)"""
+    global _connector
+    engine.dispose()
+    if _connector is not None:
+        _connector.close()
+        _connector = None
+    logger.info("🔌 Database engine disposed")
+
+# ===== 비동기 엔진 (요청 경로) =====
+# 동기 엔진과 같은 DB, 드라이버만 async (연결은 이벤트 루프에 묶이므로 루프 안에서 처음 사용할 때 생성)
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_sessionmaker: Optional[async_sessionmaker] = None
+_async_connector: Optional[Any] = None
+
+
+def async_database_url(database_url: str) -> str:
+    """sqlite:// → sqlite+aiosqlite://, postgresql(+psycopg2|pg8000):// → postgresql+asyncpg://"""
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+
+def create_async_db_engine(database_url: Optional[str] = None) -> Tuple[AsyncEngine, Optional[Any]]:
+    """
+    DATABASE_URL 에 맞는 비동기 엔진 생성 (실행 중인 이벤트 루프 안에서 호출)
+
+    Args:
+        database_url: 기본값 settings.DATABASE_URL (없으면 Cloud SQL Connector + asyncpg)
+
+    Returns:
+        (async engine, Cloud SQL Connector 또는 None)
+    """
+    database_url = database_url or settings.DATABASE_URL
+
+    if database_url and database_url.startswith("sqlite"):
+        options: Dict[str, Any] = {}
+        if ":memory:" not in database_url and "mode=memory" not in database_url:
+            options.update(pool_options(InstrumentedAsyncQueuePool))
+        return create_async_engine(async_database_url(database_url), echo=False, **options), None
+
+    if database_url and database_url.startswith("postgresql"):
+        return create_async_engine(
+            async_database_url(database_url), echo=False, **pool_options(InstrumentedAsyncQueuePool)
+        ), None
+
+    # ===== Cloud SQL Connector (asyncpg) =====
+    from google.cloud.sql.connector import Connector
+
+    connector = Connector(loop=asyncio.get_running_loop())
+
+    async def getconn():
+        """Cloud SQL 비동기 연결 생성"""
+        return await connector.connect_async(
+            settings.CLOUD_SQL_CONNECTION_NAME,
+            "asyncpg",
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME
+        )
+
+    async_engine = create_async_engine(
+        "postgresql+asyncpg://",
+        async_creator=getconn,
+        echo=False,
+        **pool_options(InstrumentedAsyncQueuePool)
+    )
+    return async_engine, connector
+
+
+def get_async_engine() -> AsyncEngine:
+    """Get or create async engine instance"""
+    global _async_engine, _async_sessionmaker, _async_connector
+    if _async_engine is None:
+        _async_engine, _async_connector = create_async_db_engine()
+        _async_sessionmaker = async_sessionmaker(
+            _async_engine,
+            autoflush=False,
+            # 커밋 후 응답 직렬화에서 속성 재조회(암묵적 IO)가 일어나지 않도록
+            expire_on_commit=False
+        )
+        logger.info(f"⚡ Async database engine: {_async_engine.dialect.name}+{_async_engine.dialect.driver}")
+    return _async_engine
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get async session factory (엔진이 없으면 생성)"""
+    get_async_engine()
+    return _async_sessionmaker
+
+
+# Dependency
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """비동기 데이터베이스 세션 의존성"""
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+def get_async_pool_snapshot() -> Optional[Dict[str, Any]]:
+    """비동기 엔진 커넥션 풀 상태 (엔진이 아직 없으면 None)"""
+    if _async_engine is None:
+        return None
+    return get_pool_snapshot(_async_engine.sync_engine)
+
+
+async def dispose_async_engine() -> None:
+    """비동기 엔진 풀 정리 + Cloud SQL Connector 종료 (lifespan 종료 시)"""
+    global _async_engine, _async_sessionmaker, _async_connector
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_sessionmaker = None
+    if _async_connector is not None:
+        await _async_connector.close_async()
+        _async_connector = None
+
+logger.info("✅ Database configuration loaded")
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, Numeric, ForeignKey
+from sqlalchemy import Column, String, Text, Integer, DateTime, Numeric, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
 import uuid
 
 from app.db.base import Base
@@ -60,6 +61,8 @@ class UserContent(Base):
     # 이미지
     image_url = Column(String(1000), nullable=False)
     thumbnail_url = Column(String(1000), nullable=True)
+    # 파생 이미지 사다리 [{size, width, height, format, url}, ...] (크기 오름차순)
+    derivatives = Column(JSON, nullable=True)
     
     # 사용자 입력
     product_name = Column(String(300), nullable=True)
@@ -75,8 +78,86 @@ class UserContent(Base):
     width = Column(Integer, nullable=True)
     height = Column(Integer, nullable=True)
     
+    # 목록 커서(created_at, content_id)용으로 앱에서 마이크로초까지 채움
+    # (SQLite 의 CURRENT_TIMESTAMP 는 초 단위 문자열이라 커서 비교가 어긋남)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # 관계
+    owner = relationship("User", backref="contents")  # images → contents
+    
+    __table_args__ = (
+        # GET /api/contents: user_id 필터 + (created_at, content_id) 내림차순 keyset 페이지
+        Index("ix_user_contents_user_created", "user_id", created_at.desc(), content_id.desc()),
+    )
+
+
+class GenerationJob(Base):
+    """AI 광고 생성 작업 (비동기 작업 큐, 재시작 후 복구)"""
+    __tablename__ = 'generation_jobs'
+    
+    job_id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    content_id = Column(String(36), ForeignKey("user_contents.content_id", ondelete="CASCADE"), nullable=False)
+    # 제출한 사용자 (작업 조회 / 이벤트 스트림은 본인만)
+    user_id = Column(String(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=True, index=True)
+    style = Column(String(50), nullable=False)
+    seed = Column(Integer, nullable=True)
+    
+    # 상태: queued → running → succeeded | failed
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    stage = Column(String(50), nullable=True)  # downloading / generating / uploading
+    progress = Column(Integer, nullable=False, default=0)  # 0 ~ 100
+    
+    # 결과
+    result_url = Column(String(1000), nullable=True)
+    result = Column(JSON, nullable=True)  # prompt, dimensions 등
+    error = Column(Text, nullable=True)
+    
+    # 완료 시 POST 할 URL (선택)
+    webhook_url = Column(String(1000), nullable=True)
+    
+    # 실행 인스턴스 리스 (owner 가 주기적으로 연장, 만료된 작업만 다른 인스턴스가 회수)
+    owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # 관계
-    owner = relationship("User", backref="contents")  # images → contents
\ No newline at end of file
+    content = relationship("UserContent", backref="generation_jobs")
+    
+    __table_args__ = (
+        # 회수 대상 조회 (status IN (queued, running) AND lease_expires_at < now)
+        Index("ix_generation_jobs_status_lease", "status", "lease_expires_at"),
+    )
+
+
+class GenerationCache(Base):
+    """AI 광고 생성 결과 캐시 (같은 입력 이미지 + 생성 파라미터면 Replicate 호출 생략)"""
+    __tablename__ = 'generation_cache'
+    
+    # sha256(source_hash, mapped_style, prompt, steps, aspect_ratio, seed)
+    cache_key = Column(String(64), primary_key=True)
+    
+    # 키 구성 요소 (디버깅/통계용)
+    source_hash = Column(String(64), nullable=False, index=True)
+    style = Column(String(50), nullable=False)
+    prompt = Column(Text, nullable=False)
+    num_inference_steps = Column(Integer, nullable=False)
+    aspect_ratio = Column(String(20), nullable=False)
+    seed = Column(Integer, nullable=True)
+    
+    # 결과
+    result_url = Column(String(1000), nullable=False)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    hit_count = Column(Integer, nullable=False, default=0)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=True)
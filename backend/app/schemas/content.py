@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from decimal import Decimal
 
 class ContentCreate(BaseModel):
@@ -10,12 +10,21 @@ class ContentCreate(BaseModel):
     color: Optional[str] = None
     price: Optional[Decimal] = None
 
+class DerivativeResponse(BaseModel):
+    """파생 이미지 (긴 변 기준 해상도별 WebP/AVIF)"""
+    size: int
+    width: int
+    height: int
+    format: str
+    url: str
+
 class ContentResponse(BaseModel):
     """콘텐츠 응답"""
     content_id: str
     user_id: str
     image_url: str
     thumbnail_url: str
+    derivatives: Optional[List[DerivativeResponse]] = None
     product_name: Optional[str] = None
     category: Optional[str] = None
     color: Optional[str] = None
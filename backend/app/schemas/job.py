@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+class JobResponse(BaseModel):
+    """생성 작업 상태"""
+    job_id: str
+    status: str  # queued | running | succeeded | failed
+    stage: Optional[str] = None
+    progress: int = 0
+    content_id: str
+    style: str
+    seed: Optional[int] = None
+    result_url: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class JobSubmitResponse(JobResponse):
+    """생성 작업 제출 응답 (조회/이벤트 URL 포함)"""
+    status_url: str
+    events_url: str
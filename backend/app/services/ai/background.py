@@ -4,23 +4,150 @@ Fallback implementation that doesn't require Hugging Face authentication
 """
 from typing import List
 from PIL import Image
+import numpy as np
 import logging
-from rembg import remove
+import threading
+import time
+from rembg import new_session
+from rembg.bg import fix_image_orientation, naive_cutout
+
+from app.core.metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 
+# 품질 ↔ 속도 트레이드오프 (u2netp 가 가장 빠르고, isnet-general-use 가 가장 정밀)
+SUPPORTED_MODELS = ("u2net", "u2netp", "isnet-general-use", "silueta")
+
+# 모델별 전처리 파라미터 (mean, std, input size) - rembg sessions/*.py 와 동일
+MODEL_INPUTS = {
+    "u2net": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "u2netp": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "silueta": ((0.485, 0.456, 0.406), (0.229, 0.224, 0.225), (320, 320)),
+    "isnet-general-use": ((0.485, 0.456, 0.406), (1.0, 1.0, 1.0), (1024, 1024)),
+}
+
 
 class BackgroundRemovalService:
     """Service for AI-powered background removal using rembg"""
     
-    def __init__(self):
-        """Initialize the background removal service"""
-        logger.info("Initializing rembg background removal service")
-        self.model_name = "rembg (u2net)"
+    def __init__(self, model: str = "u2net"):
+        """
+        Initialize the background removal service
+        
+        Args:
+            model: rembg model name (see SUPPORTED_MODELS)
+        """
+        if model not in SUPPORTED_MODELS:
+            raise ValueError(f"Unsupported rembg model '{model}'. Choose from: {list(SUPPORTED_MODELS)}")
+        
+        logger.info(f"Initializing rembg background removal service ({model})")
+        self.model = model
+        self.model_name = f"rembg ({model})"
+        self.session = None
+        self._session_lock = threading.Lock()
     
-    async def remove_background(self, image: Image.Image) -> Image.Image:
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the ONNX session has been created"""
+        return self.session is not None
+    
+    def load(self):
         """
-        Remove background from image using rembg
+        Create the reusable rembg session (once per process)
+        
+        Returns:
+            rembg session
+        """
+        if self.session is None:
+            with self._session_lock:
+                if self.session is None:
+                    start = time.time()
+                    self.session = new_session(self.model)
+                    logger.info(f"Loaded rembg model '{self.model}' in {time.time() - start:.2f}s")
+        return self.session
+    
+    def warmup(self) -> None:
+        """Load the model and run a dummy inference"""
+        start = time.time()
+        self.predict_masks([Image.new('RGB', (64, 64), (255, 255, 255))])
+        logger.info(f"rembg warmup completed in {time.time() - start:.2f}s")
+    
+    @property
+    def supports_batching(self) -> bool:
+        """Whether the ONNX model has a dynamic batch dimension"""
+        batch_dim = self.load().inner_session.get_inputs()[0].shape[0]
+        return not isinstance(batch_dim, int) or batch_dim > 1
+    
+    @stage_timer("rembg_inference")
+    def predict_masks(self, images: List[Image.Image]) -> List[Image.Image]:
+        """
+        Predict foreground masks, running the whole list as one ONNX batch
+        
+        Args:
+            images: Input PIL Images (RGB, orientation already fixed)
+            
+        Returns:
+            Masks ('L' mode, same size as each input)
+        """
+        session = self.load()
+        mean, std, size = MODEL_INPUTS[self.model]
+        input_name = session.inner_session.get_inputs()[0].name
+        
+        inputs = [session.normalize(image, mean, std, size)[input_name] for image in images]
+        if self.supports_batching:
+            preds = session.inner_session.run(None, {input_name: np.concatenate(inputs)})[0]
+        else:
+            # 배치 차원이 고정된 모델은 한 장씩 실행
+            preds = np.concatenate([session.inner_session.run(None, {input_name: x})[0] for x in inputs])
+        
+        masks = []
+        for image, pred in zip(images, preds[:, 0, :, :]):
+            ma, mi = np.max(pred), np.min(pred)
+            pred = (pred - mi) / (ma - mi) if ma > mi else np.zeros_like(pred)
+            mask = Image.fromarray((pred * 255).astype("uint8"), mode="L")
+            masks.append(mask.resize(image.size, Image.Resampling.LANCZOS))
+        return masks
+    
+    @staticmethod
+    def prepare(image: Image.Image) -> Image.Image:
+        """Convert to RGB and apply EXIF orientation (rembg.remove 와 동일)"""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return fix_image_orientation(image)
+    
+    @staticmethod
+    @stage_timer("cutout")
+    def cutout(image: Image.Image, mask: Image.Image) -> Image.Image:
+        """
+        Apply predicted mask to prepared image
+        
+        Args:
+            image: Prepared PIL Image (see prepare)
+            mask: Foreground mask
+            
+        Returns:
+            RGBA image with transparent background
+        """
+        return naive_cutout(image, mask)
+    
+    def remove_background_batch_sync(self, images: List[Image.Image]) -> List[Image.Image]:
+        """
+        Remove background from multiple images in one ONNX batch (blocking)
+        
+        Args:
+            images: Input PIL Images
+            
+        Returns:
+            Images with background removed (RGBA)
+        """
+        prepared = [self.prepare(image) for image in images]
+        masks = self.predict_masks(prepared)
+        logger.info(f"Background removed for batch of {len(images)} images")
+        return [self.cutout(image, mask) for image, mask in zip(prepared, masks)]
+    
+    def remove_background_sync(self, image: Image.Image) -> Image.Image:
+        """
+        Remove background from image using rembg (blocking)
         
         Args:
             image: Input PIL Image (RGB)
@@ -29,14 +156,10 @@ class BackgroundRemovalService:
             Image with background removed (RGBA with transparent background)
         """
         try:
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
             original_size = image.size
             
-            # Run rembg
-            result = remove(image)
+            prepared = self.prepare(image)
+            result = self.cutout(prepared, self.predict_masks([prepared])[0])
             
             logger.info(f"Background removed successfully for image size: {original_size}")
             return result
@@ -45,6 +168,18 @@ class BackgroundRemovalService:
             logger.error(f"Error removing background: {e}")
             raise
     
+    async def remove_background(self, image: Image.Image) -> Image.Image:
+        """
+        Remove background from image using rembg
+        
+        Args:
+            image: Input PIL Image (RGB)
+            
+        Returns:
+            Image with background removed (RGBA with transparent background)
+        """
+        return self.remove_background_sync(image)
+    
     async def batch_remove_background(self, images: List[Image.Image]) -> List[Image.Image]:
         """
         Remove background from multiple images
@@ -55,6 +190,11 @@ class BackgroundRemovalService:
         Returns:
             List of images with backgrounds removed
         """
+        try:
+            return self.remove_background_batch_sync(images)
+        except Exception as e:
+            logger.error(f"Batch background removal failed, falling back to per-image: {e}")
+        
         results = []
         for idx, image in enumerate(images):
             try:
@@ -0,0 +1,83 @@
+"""
+Dynamic Micro-Batching
+동시에 들어온 단건 요청을 몇 ms 동안 모아 한 번의 배치 호출로 실행
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Gathers concurrent single-item calls into one batch call"""
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+    ):
+        """
+        Args:
+            run_batch: 아이템 목록을 받아 같은 순서의 결과 목록을 돌려주는 코루틴 함수
+                (결과 자리에 예외 인스턴스를 넣으면 그 아이템의 submit 만 실패)
+            max_batch_size: 배치 최대 크기 (도달 시 즉시 실행)
+            max_wait_ms: 첫 아이템 이후 배치를 모으는 최대 대기 시간
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._items: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        아이템을 배치에 추가하고 해당 결과를 기다림
+
+        Args:
+            item: 배치 함수에 전달할 아이템
+
+        Returns:
+            이 아이템에 대한 결과
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._items.append((item, future))
+
+        if len(self._items) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._items = self._items, []
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        logger.info(f"Running micro-batch of {len(batch)}")
+        try:
+            results = await self.run_batch([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
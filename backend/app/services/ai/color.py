@@ -7,6 +7,8 @@ import numpy as np
 from PIL import Image
 import logging
 
+from app.core.metrics import stage_timer
+
 logger = logging.getLogger(__name__)
 
 
@@ -172,28 +174,18 @@ class ColorCorrection:
         
         return sharpened
     
-    def auto_enhance(self, image: Image.Image, style: str = "balanced") -> Image.Image:
+    @stage_timer("color_correction")
+    def enhance_array(self, cv_image: np.ndarray, style: str = "balanced") -> np.ndarray:
         """
-        Automatic color enhancement pipeline
+        Color enhancement steps on a BGR array
         
         Args:
-            image: PIL Image (RGB or RGBA)
+            cv_image: BGR image (numpy array)
             style: Enhancement style ("balanced", "vivid", "soft")
             
         Returns:
-            Enhanced PIL Image
+            Enhanced BGR image
         """
-        # Convert PIL to OpenCV format
-        has_alpha = image.mode == 'RGBA'
-        if has_alpha:
-            alpha_channel = np.array(image)[:, :, 3]
-            rgb_image = image.convert('RGB')
-        else:
-            rgb_image = image.convert('RGB')
-        
-        cv_image = cv2.cvtColor(np.array(rgb_image), cv2.COLOR_RGB2BGR)
-        
-        # Apply enhancements based on style
         if style == "balanced":
             # Balanced: subtle enhancements
             cv_image = self.auto_white_balance(cv_image)
@@ -220,6 +212,32 @@ class ColorCorrection:
             cv_image = self.auto_white_balance(cv_image)
             cv_image = self.clahe_enhancement(cv_image)
         
+        return cv_image
+    
+    def auto_enhance(self, image: Image.Image, style: str = "balanced") -> Image.Image:
+        """
+        Automatic color enhancement pipeline
+        
+        Args:
+            image: PIL Image (RGB or RGBA)
+            style: Enhancement style ("balanced", "vivid", "soft")
+            
+        Returns:
+            Enhanced PIL Image
+        """
+        # Convert PIL to OpenCV format
+        has_alpha = image.mode == 'RGBA'
+        if has_alpha:
+            alpha_channel = np.array(image)[:, :, 3]
+            rgb_image = image.convert('RGB')
+        else:
+            rgb_image = image.convert('RGB')
+        
+        cv_image = cv2.cvtColor(np.array(rgb_image), cv2.COLOR_RGB2BGR)
+        
+        # Apply enhancements based on style
+        cv_image = self.enhance_array(cv_image, style=style)
+        
         # Convert back to PIL
         rgb_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
         result = Image.fromarray(rgb_image)
@@ -0,0 +1,641 @@
+"""
+Ad Generation Service
+업로드된 콘텐츠 → 스타일 프롬프트 → Replicate 배경 생성 → 스토리지 업로드
+/generate-ad (동기 응답), /generate-ad/styles (여러 스타일 동시 생성), 생성 작업 큐 워커가 공유
+결과는 generation_cache 에 저장 (시드 미지정 시 입력 이미지 + 스타일로 시드 결정), 같은 요청의 동시 실행은 하나로 합침
+입력 이미지는 스토리지 서명 URL 로 전달 (불가 시 base64 data URI), 인코딩 시간/크기 기록
+출력 이미지는 디코드/재인코딩 없이 스토리지로 스트리밍 (헤더만 파싱, 허용되지 않은 포맷만 JPEG 변환)
+prediction 호출은 Resilience 로 보호 (동시성 제한은 완료까지, 서킷 브레이커 + 재시도 예산은 생성 요청만)
+"""
+import asyncio
+import io
+import logging
+import time
+from contextlib import aclosing
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from config import settings
+from app.core.metrics import record_bytes, stage_timer
+from app.core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ConcurrencyLimiter,
+    ConcurrencyLimitError,
+    Resilience,
+    RetryBudget
+)
+from app.core.storage import SignedUrlUnavailable, get_storage
+from app.models.schemas import UserContent
+from app.services.ai.derivatives import pick_derivative
+from app.services.ai.generation_cache import (
+    GenerationKey,
+    default_seed,
+    generation_flights,
+    get_cached_generation,
+    store_generation
+)
+from app.services.ai.replicate_generator import (
+    PredictionTimeoutError,
+    ReplicateBackgroundGenerator,
+    classify_error
+)
+from app.services.ai.result_cache import hash_image_bytes
+from app.services.ai.style_prompts import StylePrompts
+
+logger = logging.getLogger(__name__)
+
+# 스타일 매핑 (프론트엔드 → 백엔드)
+STYLE_MAP = {
+    'minimal': 'minimal',
+    'vintage': 'emotional',
+    'modern': 'street',
+    'natural': 'emotional',
+    'luxury': 'minimal'
+}
+
+# Replicate 입력 캔버스의 긴 변 (replicate_generator dimensions 참고)
+GENERATION_INPUT_LONG_EDGE = 1080
+
+# 생성 파라미터 (캐시 키 구성 요소)
+GENERATION_STEPS = 30
+GENERATION_ASPECT_RATIO = "square"
+
+# 그대로 저장하는 출력 포맷 → (확장자, content_type), 그 외 포맷은 JPEG 로 변환
+OUTPUT_FORMATS = {
+    "jpeg": ("jpg", "image/jpeg"),
+    "png": ("png", "image/png"),
+    "webp": ("webp", "image/webp")
+}
+
+# 출력 헤더 파싱에 읽는 최대 바이트 (JPEG 는 EXIF 뒤에 SOF 가 있음)
+OUTPUT_HEADER_PROBE_LIMIT = 256 * 1024
+
+# 진행률 콜백: (stage, progress 0~100)
+ProgressCallback = Callable[[str, int], Awaitable[None]]
+
+
+class GenerationError(Exception):
+    """생성 요청 자체가 잘못된 경우 (라우트에서 4xx 로 변환)"""
+
+    def __init__(self, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.headers = headers
+
+
+# Replicate Generator (싱글톤)
+replicate_generator = None
+
+def get_replicate_generator() -> ReplicateBackgroundGenerator:
+    """Get or create Replicate generator instance"""
+    global replicate_generator
+    if replicate_generator is None:
+        logger.info("Initializing ReplicateBackgroundGenerator...")
+        api_token = settings.REPLICATE_API_TOKEN
+        replicate_generator = ReplicateBackgroundGenerator(
+            api_token=api_token,
+            base_url=settings.REPLICATE_BASE_URL,
+            pool_size=settings.REPLICATE_HTTP_POOL_SIZE,
+            connect_timeout=settings.REPLICATE_CONNECT_TIMEOUT,
+            read_timeout=settings.REPLICATE_READ_TIMEOUT,
+            poll_interval=settings.REPLICATE_POLL_INTERVAL,
+            max_poll_interval=settings.REPLICATE_MAX_POLL_INTERVAL,
+            prediction_timeout=settings.REPLICATE_PREDICTION_TIMEOUT_SECONDS,
+            max_output_bytes=settings.REPLICATE_MAX_OUTPUT_MB * 1024 * 1024,
+            input_format=settings.REPLICATE_INPUT_FORMAT,
+            png_compress_level=settings.REPLICATE_INPUT_PNG_COMPRESS_LEVEL
+        )
+    return replicate_generator
+
+
+# Replicate 호출 보호 (싱글톤)
+replicate_resilience = None
+
+def get_replicate_resilience() -> Resilience:
+    """Get or create resilience layer around Replicate predictions"""
+    global replicate_resilience
+    if replicate_resilience is None:
+        replicate_resilience = Resilience(
+            name="replicate",
+            limiter=ConcurrencyLimiter(
+                max_concurrency=settings.REPLICATE_MAX_CONCURRENCY,
+                max_per_key=settings.REPLICATE_MAX_CONCURRENCY_PER_USER,
+                queue_timeout=settings.REPLICATE_QUEUE_TIMEOUT_SECONDS
+            ),
+            breaker=CircuitBreaker(
+                name="replicate",
+                failure_threshold=settings.REPLICATE_BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=settings.REPLICATE_BREAKER_RECOVERY_SECONDS
+            ),
+            budget=RetryBudget(
+                ratio=settings.REPLICATE_RETRY_BUDGET_RATIO,
+                min_retries=settings.REPLICATE_RETRY_BUDGET_MIN,
+                window=settings.REPLICATE_RETRY_BUDGET_WINDOW_SECONDS
+            ),
+            classify=classify_error,
+            max_attempts=settings.REPLICATE_MAX_ATTEMPTS,
+            base_delay=settings.REPLICATE_RETRY_BASE_DELAY,
+            max_delay=settings.REPLICATE_RETRY_MAX_DELAY,
+            hedge_delay=settings.REPLICATE_HEDGE_DELAY_SECONDS
+        )
+    return replicate_resilience
+
+
+async def shutdown_replicate_generator() -> None:
+    """Close Replicate HTTP pools if the generator was created"""
+    global replicate_generator
+    if replicate_generator is not None:
+        await replicate_generator.aclose()
+        replicate_generator = None
+
+
+def map_style(style: str) -> str:
+    """프론트엔드 스타일 → 프롬프트 스타일"""
+    return STYLE_MAP.get(style.lower(), 'minimal')
+
+
+async def load_source_bytes(content: UserContent) -> bytes:
+    """
+    생성 입력 이미지 다운로드 (1080px 파생 이미지가 있으면 원본 대신 사용)
+
+    Raises:
+        GenerationError: 이미지 URL 이 없거나 스토리지에 파일이 없는 경우
+    """
+    image_url = content.image_url
+    if not image_url:
+        raise GenerationError(400, "No image URL in content")
+
+    derivative = pick_derivative(content.derivatives, GENERATION_INPUT_LONG_EDGE)
+    if derivative:
+        image_url = derivative["url"]
+
+    # https://storage.googleapis.com/bucket-name/user_id/xxx.jpg → user_id/xxx.jpg
+    # /uploads/user_id/xxx.jpg (로컬) → user_id/xxx.jpg
+    storage = get_storage()
+    path = storage.path_from_url(image_url)
+    logger.info(f"[AI Generate] Downloading from storage: {path}")
+
+    try:
+        return await storage.download(path)
+    except FileNotFoundError:
+        raise GenerationError(404, "Content image not found in storage")
+
+
+@dataclass
+class InputPayload:
+    """Replicate 에 보내는 입력 이미지 (전송 방식 + 준비 비용)"""
+    value: str  # data URI 또는 URL
+    transport: str  # data_uri | url
+    format: str  # png | webp
+    encoded_bytes: int  # 인코딩된 이미지 크기
+    payload_bytes: int  # prediction 요청 본문에 들어가는 크기
+    encode_ms: float
+    upload_ms: float = 0.0
+    reused: bool = False  # 같은 입력 객체가 이미 스토리지에 있어 업로드 생략
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["value"]
+        return data
+
+
+def input_transport() -> str:
+    """REPLICATE_INPUT_TRANSPORT 해석 (auto: 외부 접근 URL 을 만들 수 있으면 url)"""
+    transport = settings.REPLICATE_INPUT_TRANSPORT
+    if transport == "auto":
+        if settings.STORAGE_BACKEND == "gcs" or settings.LOCAL_STORAGE_PUBLIC_BASE_URL:
+            return "url"
+        return "data_uri"
+    return transport
+
+
+class SourceImage:
+    """
+    한 번 다운로드한 입력 이미지
+    해시와 입력 페이로드(리사이즈 + 인코딩 + 전송 준비)를 여러 스타일 생성이 공유
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.hash = hash_image_bytes(data)
+        self._prepared: Dict[str, asyncio.Task] = {}
+
+    def _encode(self, aspect_ratio: str):
+        generator = get_replicate_generator()
+        image = Image.open(io.BytesIO(self.data))
+        logger.info(f"[AI Generate] Image loaded: {image.size}")
+        with stage_timer("replicate_input_render"):
+            canvas = generator.render_input(image, aspect_ratio)
+
+        with stage_timer("replicate_input_encode") as timer:
+            encoded = generator.encode_input(canvas)
+        return encoded, timer.seconds * 1000
+
+    async def _prepare(self, aspect_ratio: str) -> InputPayload:
+        generator = get_replicate_generator()
+        encoded, encode_ms = await asyncio.to_thread(self._encode, aspect_ratio)
+        image_format = generator.input_format
+
+        if input_transport() == "url":
+            # 캔버스를 스토리지에 올리고 서명 URL 전달 (요청 본문 수 KB 이하, base64 팽창 없음)
+            # 입력 해시 기반 경로 → 같은 이미지 + 비율은 이미 올린 객체를 재사용 (존재 확인 후 없을 때만 업로드)
+            storage = get_storage()
+            path = f"replicate_inputs/{self.hash}_{aspect_ratio}.{image_format}"
+            start = time.perf_counter()
+            try:
+                reused = await storage.exists(path)
+                if not reused:
+                    await storage.upload(encoded, path, content_type=generator.input_mime_type)
+                url = await storage.signed_url(path, settings.REPLICATE_INPUT_URL_TTL_SECONDS)
+            except SignedUrlUnavailable as e:
+                logger.info(f"[AI Generate] Storage cannot sign input URLs, using data URI: {e}")
+            except Exception as e:
+                logger.warning(f"[AI Generate] Input URL unavailable, falling back to data URI: {e}")
+            else:
+                payload = InputPayload(
+                    value=url,
+                    transport="url",
+                    format=image_format,
+                    encoded_bytes=len(encoded),
+                    payload_bytes=len(url),
+                    encode_ms=round(encode_ms, 1),
+                    upload_ms=round((time.perf_counter() - start) * 1000, 1),
+                    reused=reused
+                )
+                logger.info(f"[AI Generate] Input payload: {payload.to_dict()}")
+                record_bytes("replicate_input", payload.payload_bytes, "out")
+                return payload
+
+        data_uri = generator.to_data_uri(encoded)
+        payload = InputPayload(
+            value=data_uri,
+            transport="data_uri",
+            format=image_format,
+            encoded_bytes=len(encoded),
+            payload_bytes=len(data_uri),
+            encode_ms=round(encode_ms, 1)
+        )
+        logger.info(f"[AI Generate] Input payload: {payload.to_dict()}")
+        record_bytes("replicate_input", payload.payload_bytes, "out")
+        return payload
+
+    async def prepared(self, aspect_ratio: str) -> InputPayload:
+        """비율별 입력 페이로드 (첫 호출에서만 디코드/리사이즈/인코딩/업로드)"""
+        task = self._prepared.get(aspect_ratio)
+        if task is None:
+            task = asyncio.ensure_future(self._prepare(aspect_ratio))
+            self._prepared[aspect_ratio] = task
+        # 기다리던 요청 하나가 취소돼도 다른 스타일이 쓰는 전처리는 계속
+        return await asyncio.shield(task)
+
+
+async def load_source(content: UserContent) -> SourceImage:
+    """입력 이미지 다운로드 (load_source_bytes 참고)"""
+    return SourceImage(await load_source_bytes(content))
+
+
+def encode_result(image: Image.Image) -> bytes:
+    """생성 결과 JPEG 인코딩 (블로킹)"""
+    buffer = io.BytesIO()
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def probe_image_header(data: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    헤더만으로 포맷/크기 확인 (픽셀 디코드 없음)
+
+    Returns:
+        (format 소문자, width, height), 데이터가 부족하거나 이미지가 아니면 None
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return image.format.lower(), image.width, image.height
+    except Exception:
+        return None
+
+
+def transcode_result(data: bytes) -> Tuple[bytes, int, int]:
+    """허용되지 않은 출력 포맷 → JPEG (블로킹)"""
+    image = Image.open(io.BytesIO(data))
+    return encode_result(image), image.width, image.height
+
+
+async def store_output(output_url: str, filename: str) -> Dict[str, Any]:
+    """
+    Replicate 출력 → 스토리지
+
+    받는 대로 스토리지 스트림 업로드로 넘기고 (디코드/재인코딩/전체 버퍼링 없음),
+    헤더를 읽을 수 없거나 GENERATION_OUTPUT_FORMATS 에 없는 포맷만 JPEG 로 변환
+
+    Args:
+        output_url: prediction 출력 URL
+        filename: 확장자 없는 저장 경로
+
+    Returns:
+        result_url, dimensions, output (format, bytes, transcoded, store_ms)
+    """
+    storage = get_storage()
+    start = time.perf_counter()
+    head = bytearray()
+    header = None
+
+    async with aclosing(get_replicate_generator().stream_output(output_url)) as chunks:
+        async for chunk in chunks:
+            head.extend(chunk)
+            header = probe_image_header(bytes(head))
+            if header is not None or len(head) >= OUTPUT_HEADER_PROBE_LIMIT:
+                break
+
+        if header is not None and header[0] in settings.GENERATION_OUTPUT_FORMATS:
+            image_format, width, height = header
+            extension, content_type = OUTPUT_FORMATS[image_format]
+            size = len(head)
+
+            async def body():
+                nonlocal size
+                yield bytes(head)
+                async for chunk in chunks:
+                    size += len(chunk)
+                    yield chunk
+
+            result_url = await storage.upload_stream(body(), f"{filename}.{extension}", content_type)
+            transcoded = False
+        else:
+            async for chunk in chunks:
+                head.extend(chunk)
+            logger.info(f"[AI Generate] Transcoding output ({header[0] if header else 'unknown'} → jpeg)")
+            image_bytes, width, height = await asyncio.to_thread(transcode_result, bytes(head))
+            result_url = await storage.upload(image_bytes, f"{filename}.jpg", content_type='image/jpeg')
+            image_format, size, transcoded = "jpeg", len(image_bytes), True
+
+    return {
+        "result_url": result_url,
+        "dimensions": {"width": width, "height": height},
+        "output": {
+            "format": image_format,
+            "bytes": size,
+            "transcoded": transcoded,
+            "store_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+    }
+
+
+async def run_prediction(model_input: Dict[str, Any], limit_key: Optional[str] = None) -> str:
+    """
+    Replicate prediction 실행 → 출력 URL (동시성 슬롯 + 서킷 브레이커 + 재시도 / 헤징)
+    생성 요청만 재시도하고, 완료 대기 결과 (제한 시간 초과, failed 상태, 폴링 오류) 는 재생성 없이 브레이커에 기록
+    → Replicate 가 느려져 prediction 이 계속 제한 시간을 넘기면 서킷이 열리고 이후 요청은 즉시 503
+
+    Args:
+        model_input: build_input 결과
+        limit_key: 요청자 키 (요청자별 동시 생성 수 제한, None 이면 전역 한도만)
+
+    Raises:
+        GenerationError: 동시 실행 한도 초과 (429/503), 서킷 open (503),
+            재시도 후에도 실패한 Replicate 장애 (503, 제한 시간 초과는 504)
+    """
+    generator = get_replicate_generator()
+    resilience = get_replicate_resilience()
+
+    async def predict() -> str:
+        async with stage_timer("replicate_prediction"):
+            prediction = await resilience.protect(
+                lambda: generator.create_prediction(model_input), record_success=False
+            )
+            return await resilience.observe(lambda: generator.complete_prediction(prediction))
+
+    try:
+        # 동시성 슬롯은 prediction 완료까지 유지 (헤징 시 지는 쪽 prediction 은 취소 요청)
+        async with stage_timer("replicate_call"):
+            async with resilience.slot(limit_key):
+                return await resilience.hedge(predict)
+    except CircuitOpenError as e:
+        raise GenerationError(
+            503, "AI generation is temporarily unavailable",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
+    except ConcurrencyLimitError as e:
+        # 요청자별 한도 → 429, 전역 한도 → 503
+        raise GenerationError(
+            429 if e.scope == "key" else 503, "Too many concurrent generations",
+            headers={"Retry-After": str(max(1, int(e.retry_after)))}
+        )
+    except Exception as e:
+        if classify_error(e) == "neutral":
+            raise
+        # 재시도 후에도 남은 Replicate 장애 → 500 대신 503 (제한 시간 초과는 504)
+        status_code = 504 if isinstance(e, PredictionTimeoutError) else 503
+        raise GenerationError(status_code, f"AI generation backend unavailable: {e}")
+
+
+async def run_generation(
+    source: SourceImage,
+    key: GenerationKey,
+    filename: str,
+    report: ProgressCallback,
+    limit_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Replicate 배경 생성 → 업로드 → 캐시 저장 (SingleFlight 로 키당 1회 실행)
+
+    Raises:
+        GenerationError: 동시 실행 한도 초과 (429/503), 서킷 open (503),
+            재시도 후에도 실패한 Replicate 장애 (503/504)
+    """
+    payload = await source.prepared(key.aspect_ratio)
+
+    # AI 배경 생성 (비동기 prediction, 대기 중 이벤트 루프 비차단)
+    generator = get_replicate_generator()
+    model_input = generator.build_input(
+        payload.value,
+        prompt_text=key.prompt,
+        aspect_ratio=key.aspect_ratio,
+        style=key.style,
+        num_inference_steps=key.num_inference_steps,
+        seed=key.seed
+    )
+    output_url = await run_prediction(model_input, limit_key)
+
+    # 스토리지 업로드 (출력 스트림 그대로)
+    await report("uploading", 90)
+    async with stage_timer("output_store"):
+        result = await store_output(output_url, filename)
+
+    logger.info(f"[AI Generate] Background stored: {result['dimensions']} {result['output']}")
+
+    if settings.GENERATION_CACHE_ENABLED and key.cacheable:
+        await store_generation(
+            key,
+            result["result_url"],
+            result["dimensions"]["width"],
+            result["dimensions"]["height"]
+        )
+
+    return {**result, "input_payload": payload.to_dict()}
+
+
+async def generate_style(
+    content_id: str,
+    source: SourceImage,
+    style: str,
+    seed: Optional[int] = None,
+    report: Optional[ProgressCallback] = None,
+    limit_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    다운로드된 입력 이미지로 한 스타일 생성 (캐시 조회 → SingleFlight 생성)
+
+    Args:
+        limit_key: 요청자 키 (요청자별 동시 생성 수 제한, get_requester_key)
+
+    Returns:
+        result_url, style, content_id, prompt, seed, dimensions, cached,
+        input_payload, output (새로 생성한 경우 입력 전송/출력 저장 측정값)
+    """
+    async def noop(stage: str, percent: int) -> None:
+        pass
+
+    report = report or noop
+
+    # 스타일 프롬프트 생성
+    mapped_style = map_style(style)
+    prompt = StylePrompts.get_prompt(mapped_style).get('positive', '')
+
+    logger.info(f"[AI Generate] Style: {style} → {mapped_style}")
+    logger.info(f"[AI Generate] Prompt: {prompt}")
+
+    # 시드 미지정 → 입력 이미지 + 스타일로 결정 (같은 요청은 캐시 재사용, 다른 결과는 시드를 바꿔 요청)
+    if seed is None and settings.GENERATION_DETERMINISTIC_SEED:
+        seed = default_seed(source.hash, mapped_style)
+
+    key = GenerationKey(
+        source_hash=source.hash,
+        style=mapped_style,
+        prompt=prompt,
+        num_inference_steps=GENERATION_STEPS,
+        aspect_ratio=GENERATION_ASPECT_RATIO,
+        seed=seed
+    )
+
+    # 생성 결과 캐시 조회 (시드가 정해진 경우에만)
+    cached = None
+    if settings.GENERATION_CACHE_ENABLED and key.cacheable:
+        cached = await get_cached_generation(key)
+    if cached is not None:
+        logger.info(f"[AI Generate] Cache hit: {cached['result_url']}")
+        result = cached
+    else:
+        # AI 배경 생성 + 업로드 (같은 키가 진행 중이면 합류 - 랜덤 시드여도 더블클릭 중복은 합침)
+        # 파일명: ai_generated/style_contentid_timestamp.{jpg,png,webp} (출력 포맷)
+        await report("generating", 20)
+        filename = f"ai_generated/{style}_{content_id}_{int(time.time())}"
+        result = await generation_flights.do(
+            key.digest,
+            lambda: run_generation(source, key, filename, report, limit_key=limit_key)
+        )
+
+    logger.info(f"[AI Generate] Result URL: {result['result_url']}")
+
+    return {
+        "result_url": result["result_url"],
+        "style": style,
+        "content_id": content_id,
+        "prompt": prompt,
+        "seed": key.seed,
+        "dimensions": result["dimensions"],
+        "cached": cached is not None,
+        "input_payload": result.get("input_payload"),
+        "output": result.get("output")
+    }
+
+
+async def generate_ad(
+    content: UserContent,
+    style: str,
+    progress: Optional[ProgressCallback] = None,
+    seed: Optional[int] = None,
+    limit_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    콘텐츠 이미지로 AI 광고 생성
+
+    같은 입력 이미지 + 생성 파라미터 + 시드는 캐시된 결과를 반환하고,
+    동시에 들어온 같은 요청은 하나의 prediction 을 공유
+
+    Args:
+        content: 업로드된 콘텐츠
+        style: 프론트엔드 스타일 (vintage/modern/minimal/natural/luxury)
+        progress: 단계별 진행률 콜백 (작업 큐에서 사용)
+        seed: 생성 시드 (None 이면 입력 이미지 + 스타일로 결정, GENERATION_DETERMINISTIC_SEED=False 면 랜덤)
+        limit_key: 요청자 키 (콘텐츠 소유자가 아니라 요청한 사용자 / 클라이언트 IP)
+
+    Returns:
+        result_url, style, content_id, prompt, seed, dimensions, cached
+    """
+    logger.info(f"[AI Generate] Starting for content_id={content.content_id}, style={style}")
+
+    # 입력 이미지 다운로드
+    if progress is not None:
+        await progress("downloading", 5)
+    source = await load_source(content)
+
+    return await generate_style(
+        content.content_id, source, style,
+        seed=seed, report=progress, limit_key=limit_key
+    )
+
+
+async def generate_ad_styles(
+    content_id: str,
+    source: SourceImage,
+    styles: List[str],
+    seed: Optional[int] = None,
+    limit_key: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    한 입력 이미지로 여러 스타일을 동시에 생성, 끝나는 순서대로 결과 반환
+
+    다운로드/디코드/리사이즈/base64 는 한 번만 실행하고,
+    prediction 은 GENERATION_FANOUT_CONCURRENCY 개까지 동시에 실행
+    (업로드도 스타일별로 병렬). 한 스타일의 실패는 다른 스타일에 영향 없음
+
+    Args:
+        content_id: 콘텐츠 ID (결과 파일명)
+        source: load_source 결과
+        styles: 프론트엔드 스타일 목록 (중복 제거된 상태)
+        seed: 생성 시드 (모든 스타일 공통, None 이면 스타일별로 결정)
+        limit_key: 요청자 키 (요청자별 동시 생성 수 제한)
+
+    Yields:
+        스타일별 generate_style 결과 + success, processing_time (실패 시 error)
+    """
+    semaphore = asyncio.Semaphore(settings.GENERATION_FANOUT_CONCURRENCY)
+
+    async def run_style(style: str) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        try:
+            async with semaphore:
+                result = await generate_style(content_id, source, style, seed=seed, limit_key=limit_key)
+            return {"success": True, **result,
+                    "processing_time": round(time.perf_counter() - start_time, 2)}
+        except Exception as e:
+            logger.error(f"[AI Generate] Style {style} failed: {e}", exc_info=True)
+            return {"success": False, "style": style, "content_id": content_id, "error": str(e),
+                    "status_code": getattr(e, "status_code", 500),
+                    "processing_time": round(time.perf_counter() - start_time, 2)}
+
+    tasks = [asyncio.create_task(run_style(style)) for style in styles]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # 클라이언트 연결 종료 시 남은 스타일 취소 (진행 중 prediction 은 SingleFlight 가 마무리)
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,92 @@
+"""
+Generation Result Cache
+(입력 이미지 해시, 매핑된 스타일, 프롬프트, 스텝 수, 비율, 시드) → 생성 결과 URL
+- generation_cache 테이블에 저장 (인스턴스 재시작/다중 인스턴스 간 공유)
+- 같은 키의 동시 요청은 SingleFlight 로 하나의 prediction 만 실행
+- 시드를 지정하지 않은 요청은 default_seed (입력 이미지 + 스타일) 로 시드를 정해 캐시 대상이 됨
+  (GENERATION_DETERMINISTIC_SEED=False 면 랜덤 시드 → 저장/조회하지 않고 진행 중 중복만 합침)
+"""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.metrics import record_cache
+from app.core.singleflight import SingleFlight
+from app.db.base import get_async_sessionmaker
+from app.models.schemas import GenerationCache
+
+logger = logging.getLogger(__name__)
+
+MAX_SEED = 2**31 - 1  # seed 컬럼 (Integer) 범위
+
+
+@dataclass(frozen=True)
+class GenerationKey:
+    """생성 결과를 결정하는 입력"""
+    source_hash: str
+    style: str  # 매핑된 스타일 (minimal / emotional / street)
+    prompt: str
+    num_inference_steps: int
+    aspect_ratio: str
+    seed: Optional[int] = None
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps(
+            [self.source_hash, self.style, self.prompt, self.num_inference_steps, self.aspect_ratio, self.seed],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @property
+    def cacheable(self) -> bool:
+        """시드 고정 시에만 결과가 결정적 (랜덤 시드 생성은 매번 새 이미지여야 함)"""
+        return self.seed is not None
+
+
+def default_seed(source_hash: str, style: str) -> int:
+    """시드 미지정 요청의 결정적 시드 (같은 입력 이미지 + 스타일 → 같은 시드 → 캐시 적중)"""
+    digest = hashlib.sha256(f"{source_hash}:{style}".encode()).digest()
+    return int.from_bytes(digest[:4], "big") & MAX_SEED
+
+
+async def get_cached_generation(key: GenerationKey) -> Optional[Dict[str, Any]]:
+    """캐시 조회 (적중 시 hit_count 증가)"""
+    async with get_async_sessionmaker()() as db:
+        entry = await db.get(GenerationCache, key.digest)
+        record_cache("generation", entry is not None)
+        if entry is None:
+            return None
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_hit_at = datetime.now(timezone.utc)
+        await db.commit()
+        return {
+            "result_url": entry.result_url,
+            "dimensions": {"width": entry.width, "height": entry.height}
+        }
+
+
+async def store_generation(key: GenerationKey, result_url: str, width: int, height: int) -> None:
+    """생성 결과 저장 (다른 인스턴스가 먼저 저장했으면 덮어씀)"""
+    async with get_async_sessionmaker()() as db:
+        await db.merge(GenerationCache(
+            cache_key=key.digest,
+            source_hash=key.source_hash,
+            style=key.style,
+            prompt=key.prompt,
+            num_inference_steps=key.num_inference_steps,
+            aspect_ratio=key.aspect_ratio,
+            seed=key.seed,
+            result_url=result_url,
+            width=width,
+            height=height,
+            hit_count=0
+        ))
+        await db.commit()
+
+
+# 진행 중인 생성 (프로세스 단위)
+generation_flights = SingleFlight()
@@ -0,0 +1,323 @@
+"""
+Generation Jobs
+/generate-ad 를 비동기 작업으로 실행 (제출 즉시 job_id 반환)
+- 상태/진행률/결과는 generation_jobs 테이블에 저장 → 재시작 후 recover_jobs 로 재실행
+- 상태 변경마다 JobEvents 로 발행 (SSE), 완료 시 webhook_url 로 POST
+  (SSRF 방지: 허용 호스트 또는 공인 IP 로 해석되는 호스트만, 리다이렉트 따라가지 않음)
+- 워커는 이벤트 루프의 태스크이므로 DB 접근은 AsyncSession (진행률 저장마다 루프를 막지 않도록)
+- 인스턴스 리스: 작업을 맡은 인스턴스(owner)가 JOB_LEASE_RENEW_SECONDS 마다 연장하고,
+  다른 인스턴스는 리스가 만료된 작업만 조건부 UPDATE 로 회수 (다중 인스턴스 / 롤링 배포 시 중복 실행 방지)
+"""
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlalchemy import or_, select, update
+
+from config import settings
+from app.core.jobs import get_job_queue
+from app.db.base import get_async_sessionmaker
+from app.models.schemas import GenerationJob, UserContent
+from app.services.ai.generation import GenerationError, generate_ad
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+ACTIVE_STATUSES = ("queued", "running")
+
+# 이 프로세스의 리스 owner 값
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobLeaseLost(Exception):
+    """리스가 만료돼 다른 인스턴스가 작업을 가져감 (이 인스턴스는 실행 중단)"""
+
+
+def lease_deadline() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+async def validate_webhook_url(url: str) -> None:
+    """
+    웹훅 URL 검사 (서버가 대신 요청을 보내므로 내부망 접근 차단)
+    JOB_WEBHOOK_ALLOWED_HOSTS 가 있으면 그 호스트만, 없으면 모든 해석 결과가 공인 IP 인 호스트만 허용
+
+    Raises:
+        GenerationError: 허용되지 않는 URL (400)
+    """
+    parts = urlsplit(url)
+    host = parts.hostname
+    if parts.scheme not in ("http", "https") or not host:
+        raise GenerationError(400, "webhook_url must be an http(s) URL")
+
+    if settings.JOB_WEBHOOK_ALLOWED_HOSTS:
+        if host.lower() not in {h.lower() for h in settings.JOB_WEBHOOK_ALLOWED_HOSTS}:
+            raise GenerationError(400, "webhook_url host is not allowed")
+        return
+
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, parts.port or 443, type=socket.SOCK_STREAM)
+    except (socket.gaierror, ValueError):
+        raise GenerationError(400, "webhook_url host could not be resolved")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise GenerationError(400, "webhook_url must resolve to a public address")
+
+
+def job_to_dict(job: GenerationJob) -> Dict[str, Any]:
+    """작업 상태 (API 응답 / SSE 이벤트 / 웹훅 본문 공용)"""
+    return {
+        "job_id": job.job_id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": job.progress,
+        "content_id": job.content_id,
+        "style": job.style,
+        "seed": job.seed,
+        "result_url": job.result_url,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+async def update_job(job_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+    """
+    작업 상태 저장 (리스 연장 포함) 후 구독자에게 발행
+
+    Returns:
+        저장된 상태, 이 인스턴스가 owner 가 아니면 (리스를 잃음) None
+    """
+    async with get_async_sessionmaker()() as db:
+        result = await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.job_id == job_id, GenerationJob.owner == INSTANCE_ID)
+            .values(**fields, lease_expires_at=lease_deadline())
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await db.rollback()
+            return None
+        await db.commit()
+        state = job_to_dict(await db.get(GenerationJob, job_id))
+
+    get_job_queue().events.publish(job_id, state)
+    return state
+
+
+async def create_job(
+    content_id: str,
+    style: str,
+    user_id: str,
+    webhook_url: Optional[str] = None,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    생성 작업 저장 + 큐잉 (이 인스턴스가 리스를 잡은 상태로 저장)
+
+    Args:
+        user_id: 요청 사용자 (본인 콘텐츠만 작업으로 제출 가능)
+
+    Raises:
+        GenerationError: 콘텐츠가 없거나 다른 사용자의 콘텐츠인 경우, 웹훅 URL 이 허용되지 않는 경우
+    """
+    if webhook_url:
+        await validate_webhook_url(webhook_url)
+
+    async with get_async_sessionmaker()() as db:
+        content = await db.get(UserContent, content_id)
+        if content is None or content.user_id != user_id:
+            raise GenerationError(404, "Content not found")
+
+        job = GenerationJob(
+            content_id=content_id,
+            style=style,
+            seed=seed,
+            status="queued",
+            progress=0,
+            webhook_url=webhook_url,
+            user_id=user_id,
+            owner=INSTANCE_ID,
+            lease_expires_at=lease_deadline()
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        state = job_to_dict(job)
+
+    get_job_queue().submit(state["job_id"])
+    logger.info(f"[Jobs] Queued {state['job_id']} (content_id={content_id}, style={style})")
+    return state
+
+
+async def get_job(job_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    작업 상태 조회
+
+    Args:
+        user_id: 지정 시 이 사용자가 제출한 작업만 (아니면 None)
+    """
+    async with get_async_sessionmaker()() as db:
+        job = await db.get(GenerationJob, job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job_to_dict(job)
+
+
+async def run_generation_job(job_id: str) -> None:
+    """작업 큐 핸들러: 생성 실행 후 결과/오류 저장 (리스를 잃으면 중단)"""
+    async with get_async_sessionmaker()() as db:
+        job = await db.get(GenerationJob, job_id)
+        if job is None or job.status in TERMINAL_STATUSES:
+            return
+        # expire_on_commit=False 세션이므로 세션 종료 후에도 속성 유지
+        content = await db.get(UserContent, job.content_id)
+        style = job.style
+        seed = job.seed
+        webhook_url = job.webhook_url
+        # 제출한 사용자 기준으로 동시 생성 수 제한 (get_requester_key 와 같은 키 형식)
+        limit_key = f"user:{job.user_id}" if job.user_id else None
+
+    # 큐에서 기다리는 동안 리스가 만료돼 회수됐으면 실행하지 않음
+    if await update_job(job_id, status="running", stage="starting", progress=0,
+                        started_at=datetime.now(timezone.utc)) is None:
+        logger.warning(f"[Jobs] {job_id} is owned by another instance, skipping")
+        return
+
+    async def progress(stage: str, percent: int) -> None:
+        if await update_job(job_id, stage=stage, progress=percent) is None:
+            raise JobLeaseLost(job_id)
+
+    try:
+        if content is None:
+            raise GenerationError(404, "Content not found")
+        result = await generate_ad(content, style, progress=progress, seed=seed, limit_key=limit_key)
+        state = await update_job(
+            job_id,
+            status="succeeded",
+            stage="done",
+            progress=100,
+            result_url=result["result_url"],
+            result={
+                "prompt": result["prompt"],
+                "seed": result["seed"],
+                "dimensions": result["dimensions"],
+                "cached": result["cached"]
+            },
+            finished_at=datetime.now(timezone.utc)
+        )
+        logger.info(f"[Jobs] {job_id} succeeded: {result['result_url']}")
+    except JobLeaseLost:
+        logger.warning(f"[Jobs] {job_id} lease lost to another instance, stopping")
+        return
+    except Exception as e:
+        logger.error(f"[Jobs] {job_id} failed: {e}", exc_info=True)
+        state = await update_job(
+            job_id,
+            status="failed",
+            error=str(e),
+            finished_at=datetime.now(timezone.utc)
+        )
+
+    if webhook_url and state is not None:
+        await send_webhook(webhook_url, state)
+
+
+async def send_webhook(url: str, payload: Dict[str, Any]) -> None:
+    """완료 웹훅 전송 (실패해도 작업 결과에는 영향 없음, 제출 후 DNS 가 바뀌었을 수 있어 다시 검사)"""
+    try:
+        await validate_webhook_url(url)
+        async with httpx.AsyncClient(
+            timeout=settings.JOB_WEBHOOK_TIMEOUT_SECONDS,
+            follow_redirects=False
+        ) as client:
+            response = await client.post(url, json=payload)
+            response.raise_for_status()
+        logger.info(f"[Jobs] Webhook delivered for {payload['job_id']}")
+    except Exception as e:
+        logger.warning(f"[Jobs] Webhook failed for {payload['job_id']}: {e}")
+
+
+async def recover_jobs() -> int:
+    """
+    리스가 만료된 미완료 작업(queued/running)을 회수해 이 인스턴스에서 다시 큐잉
+    (owner 가 죽었거나 재시작됨, 다른 인스턴스가 실행 중인 작업은 건드리지 않음)
+
+    Returns:
+        회수한 작업 수
+    """
+    now = datetime.now(timezone.utc)
+    expired = or_(GenerationJob.lease_expires_at.is_(None), GenerationJob.lease_expires_at < now)
+    claimed = []
+    async with get_async_sessionmaker()() as db:
+        job_ids = (await db.execute(
+            select(GenerationJob.job_id)
+            .where(GenerationJob.status.in_(ACTIVE_STATUSES), expired)
+            .order_by(GenerationJob.created_at)
+        )).scalars().all()
+        for job_id in job_ids:
+            # 조건부 UPDATE: 조회 후 다른 인스턴스가 먼저 회수했으면 0 행
+            result = await db.execute(
+                update(GenerationJob)
+                .where(GenerationJob.job_id == job_id, GenerationJob.status.in_(ACTIVE_STATUSES), expired)
+                .values(owner=INSTANCE_ID, lease_expires_at=lease_deadline(),
+                        status="queued", stage=None, progress=0)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if result.rowcount == 1:
+                claimed.append(job_id)
+
+    queue = get_job_queue()
+    for job_id in claimed:
+        queue.submit(job_id)
+    return len(claimed)
+
+
+async def renew_leases() -> int:
+    """이 인스턴스가 맡은 미완료 작업(큐 대기 포함)의 리스 연장"""
+    async with get_async_sessionmaker()() as db:
+        result = await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.owner == INSTANCE_ID, GenerationJob.status.in_(ACTIVE_STATUSES))
+            .values(lease_expires_at=lease_deadline())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def maintain_leases() -> None:
+    """작업 큐 주기 작업: 리스 연장 → 만료된 작업 회수"""
+    await renew_leases()
+    recovered = await recover_jobs()
+    if recovered:
+        logger.info(f"[Jobs] Recovered {recovered} jobs with expired leases")
+
+
+async def release_leases() -> int:
+    """
+    종료 시 이 인스턴스의 미완료 작업 리스 해제 (다른 인스턴스가 만료를 기다리지 않고 바로 회수)
+
+    Returns:
+        해제한 작업 수
+    """
+    async with get_async_sessionmaker()() as db:
+        result = await db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.owner == INSTANCE_ID, GenerationJob.status.in_(ACTIVE_STATUSES))
+            .values(lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return result.rowcount
@@ -0,0 +1,184 @@
+"""
+Fused Style Pipeline
+Runs every style step on one BGR + alpha NumPy working buffer
+(PIL → ndarray 변환은 시작과 끝에 한 번씩만 수행)
+"""
+import cv2
+import numpy as np
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from app.services.ai.color import ColorCorrection
+from app.services.ai.wrinkle import WrinkleRemoval
+from app.services.ai.vignette import build_vignette_mask
+
+logger = logging.getLogger(__name__)
+
+# PIL ImageFilter.SMOOTH 커널 (ImageEnhance.Sharpness 의 degenerate 이미지)
+SMOOTH_KERNEL = np.array([[1, 1, 1],
+                          [1, 5, 1],
+                          [1, 1, 1]], dtype=np.float32) / 13
+
+SEPIA_KERNEL = np.array([[0.272, 0.534, 0.131],
+                         [0.349, 0.686, 0.168],
+                         [0.393, 0.769, 0.189]], dtype=np.float32)
+
+# 스타일 = 순서가 있는 연산자 목록 (연산자 이름, 파라미터)
+STYLE_OPERATORS: Dict[str, List[Tuple[str, dict]]] = {
+    "minimal": [
+        ("color", {"style": "vivid"}),
+        ("wrinkle", {"strength": "light"}),
+        ("contrast", {"factor": 1.2}),
+        ("sharpness", {"factor": 1.5}),
+        ("drop_shadow", {"offset": (8, 8), "blur_radius": 15, "shadow_alpha": 60}),
+    ],
+    "mood": [
+        ("color", {"style": "soft"}),
+        ("wrinkle", {"strength": "medium"}),
+        ("temperature", {"temperature": 30}),
+        ("sepia", {"amount": 0.3}),
+        ("vignette", {"strength": 0.2}),
+        ("saturation", {"factor": 0.9}),
+    ],
+    "street": [
+        ("color", {"style": "vivid"}),
+        ("wrinkle", {"strength": "light"}),
+        ("saturation", {"factor": 1.4}),
+        ("contrast", {"factor": 1.3}),
+        ("sharpness", {"factor": 2.0}),
+        ("temperature", {"temperature": -10}),
+    ],
+}
+
+
+class Frame:
+    """Working buffer shared by pipeline operators"""
+
+    __slots__ = ("bgr", "alpha")
+
+    def __init__(self, bgr: np.ndarray, alpha: Optional[np.ndarray] = None):
+        self.bgr = bgr
+        self.alpha = alpha
+
+    @classmethod
+    def from_pil(cls, image: Image.Image) -> "Frame":
+        """Convert PIL image into BGR uint8 + alpha buffers (single conversion)"""
+        if 'A' in image.getbands():
+            rgba = np.asarray(image.convert('RGBA'))
+            return cls(cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR), rgba[:, :, 3].copy())
+
+        rgb = np.asarray(image.convert('RGB'))
+        return cls(cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+
+    def to_pil(self) -> Image.Image:
+        """Convert working buffer back to PIL (RGBA if alpha is present)"""
+        if self.alpha is None:
+            return Image.fromarray(cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB))
+
+        rgba = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGBA)
+        rgba[:, :, 3] = self.alpha
+        return Image.fromarray(rgba, 'RGBA')
+
+
+class StylePipeline:
+    """Fused style pipeline over a single NumPy working buffer"""
+
+    def __init__(self, color_corrector: Optional[ColorCorrection] = None,
+                 wrinkle_remover: Optional[WrinkleRemoval] = None):
+        """
+        Args:
+            color_corrector: Shared ColorCorrection instance
+            wrinkle_remover: Shared WrinkleRemoval instance
+        """
+        self.color_corrector = color_corrector or ColorCorrection()
+        self.wrinkle_remover = wrinkle_remover or WrinkleRemoval()
+
+    def run(self, image: Image.Image, style: str = "minimal") -> Image.Image:
+        """
+        Run style operators on image
+
+        Args:
+            image: Input image (RGBA, background already removed)
+            style: Style name (key of STYLE_OPERATORS)
+
+        Returns:
+            Styled image
+        """
+        operators = STYLE_OPERATORS.get(style)
+        if operators is None:
+            raise ValueError(f"Unknown style '{style}'. Choose from: {list(STYLE_OPERATORS.keys())}")
+
+        frame = Frame.from_pil(image)
+        for name, params in operators:
+            getattr(self, f"_op_{name}")(frame, **params)
+
+        return frame.to_pil()
+
+    # ===== Operators (frame 을 제자리에서 갱신) =====
+
+    def _op_color(self, frame: Frame, style: str) -> None:
+        """ColorCorrection.auto_enhance 단계"""
+        frame.bgr = self.color_corrector.enhance_array(frame.bgr, style=style)
+
+    def _op_wrinkle(self, frame: Frame, strength: str) -> None:
+        """WrinkleRemoval.remove_wrinkles 단계"""
+        frame.bgr = self.wrinkle_remover.smooth_array(frame.bgr, strength=strength)
+
+    def _op_temperature(self, frame: Frame, temperature: int) -> None:
+        """Color temperature adjustment"""
+        frame.bgr = self.color_corrector.adjust_color_temperature(frame.bgr, temperature=temperature)
+
+    def _op_contrast(self, frame: Frame, factor: float) -> None:
+        """ImageEnhance.Contrast 등가 연산 (전체 평균 휘도 기준 블렌드)"""
+        gray = cv2.cvtColor(frame.bgr, cv2.COLOR_BGR2GRAY)
+        mean = int(gray.mean() + 0.5)
+        cv2.addWeighted(frame.bgr, factor, frame.bgr, 0, mean * (1 - factor), dst=frame.bgr)
+
+    def _op_saturation(self, frame: Frame, factor: float) -> None:
+        """ImageEnhance.Color 등가 연산 (픽셀별 휘도 기준 블렌드)"""
+        gray = cv2.cvtColor(cv2.cvtColor(frame.bgr, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+        cv2.addWeighted(frame.bgr, factor, gray, 1 - factor, 0, dst=frame.bgr)
+
+    def _op_sharpness(self, frame: Frame, factor: float) -> None:
+        """ImageEnhance.Sharpness 등가 연산 (SMOOTH 필터 기준 블렌드, 테두리는 원본 유지)"""
+        smooth = cv2.filter2D(frame.bgr, -1, SMOOTH_KERNEL, borderType=cv2.BORDER_REPLICATE)
+        smooth[0, :] = frame.bgr[0, :]
+        smooth[-1, :] = frame.bgr[-1, :]
+        smooth[:, 0] = frame.bgr[:, 0]
+        smooth[:, -1] = frame.bgr[:, -1]
+        cv2.addWeighted(frame.bgr, factor, smooth, 1 - factor, 0, dst=frame.bgr)
+
+    def _op_sepia(self, frame: Frame, amount: float) -> None:
+        """Sepia blend, folded into a single color matrix"""
+        matrix = (1 - amount) * np.eye(3, dtype=np.float32) + amount * SEPIA_KERNEL
+        frame.bgr = cv2.transform(frame.bgr, matrix)
+
+    def _op_vignette(self, frame: Frame, strength: float) -> None:
+        """Multiply by cached vignette mask"""
+        height, width = frame.bgr.shape[:2]
+        mask = cv2.cvtColor(build_vignette_mask(width, height, float(strength)), cv2.COLOR_GRAY2BGR)
+        cv2.multiply(frame.bgr, mask, dst=frame.bgr, scale=1 / 255)
+
+    def _op_drop_shadow(self, frame: Frame, offset: Tuple[int, int],
+                        blur_radius: int, shadow_alpha: int) -> None:
+        """StyleProcessor.add_drop_shadow 등가 연산 (알파 채널만 블러)"""
+        if frame.alpha is None or not frame.alpha.any():
+            return
+
+        alpha = frame.alpha.astype(np.float32) / 255
+        height, width = alpha.shape
+        dx, dy = offset
+
+        # 제품 영역을 제외한 그림자 레이어를 offset 만큼 이동 후 블러
+        base = shadow_alpha * (1 - alpha)
+        shadow = np.zeros_like(base)
+        shadow[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] = \
+            base[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)]
+        shadow = cv2.GaussianBlur(shadow, (0, 0), blur_radius) / 255
+
+        # alpha_composite(shadow, image): 검은 그림자 위에 이미지 합성
+        out_alpha = alpha + shadow * (1 - alpha)
+        ratio = np.divide(alpha, out_alpha, out=np.zeros_like(alpha), where=out_alpha > 0)
+        cv2.multiply(frame.bgr, cv2.merge([ratio, ratio, ratio]), dst=frame.bgr, dtype=cv2.CV_8U)
+        frame.alpha = np.clip(out_alpha * 255 + 0.5, 0, 255).astype(np.uint8)
@@ -1,35 +1,180 @@
 """
 Replicate API를 사용한 배경 생성
 GPU 인프라 관리 불필요, 종량제 과금
+업데이트: 비동기 prediction API (생성 → 제한된 폴링 → 출력 스트리밍 다운로드)
+- 이벤트 루프를 막지 않음, httpx 커넥션 풀 + 타임아웃
+- base_url 로 로컬 가짜 서버(fakes/replicate_server.py) 사용 가능
+업데이트: 입력 이미지 인코딩 설정 (빠른 PNG 압축 레벨 / 무손실 WebP)
+- run_prediction_output + stream_output: 출력 이미지를 디코드 없이 청크 단위로 전달
+- create_prediction / complete_prediction: 재시도는 생성 단계만 (폴링 오류는 같은 prediction 으로 재조회)
+- 오류 분류 (classify_error): 재시도/서킷 브레이커 판단용 (app/core/resilience.py)
+- prediction 시간 / 출력 수신 바이트는 app/core/metrics.py 로 기록
 """
 import replicate
+import asyncio
+import httpx
 import logging
 import base64
 import io
+import time
 from PIL import Image
-from typing import Optional
+from replicate.exceptions import ReplicateError
+from typing import Any, AsyncIterator, Dict, Optional
+from app.core.metrics import record_bytes, stage_timer
 from .style_prompts import StylePrompts
 
+SDXL_VERSION = "39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b"
+
+# 인스타그램 비율 설정
+DIMENSIONS = {
+    "square": (1080, 1080),    # 1:1
+    "portrait": (1080, 1352),  # 4:5
+    "landscape": (1080, 608)   # 16:9
+}
+
+
+# 입력 이미지 포맷 → MIME
+INPUT_FORMATS = {
+    "png": "image/png",
+    "webp": "image/webp"
+}
+
+
+class PredictionTimeoutError(Exception):
+    """prediction 이 제한 시간 안에 끝나지 않음 (취소 요청 후 발생)"""
+
+
+class PredictionFailedError(Exception):
+    """prediction 이 failed / canceled 로 끝남 (모델 오류, 입력 문제 등)"""
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Replicate 호출 오류 분류 (Resilience.classify)
+    
+    Returns:
+        "retry": 일시 장애 (연결/타임아웃, 429, 5xx)
+        "fail": 서비스 장애지만 재시도 비용이 큼 (prediction 제한 시간 초과, failed 상태)
+        "neutral": 서비스 장애 아님 (4xx)
+    """
+    if isinstance(error, httpx.TransportError):
+        return "retry"
+    if isinstance(error, ReplicateError):
+        if error.status is None or error.status == 429 or error.status >= 500:
+            return "retry"
+        return "neutral"
+    if isinstance(error, (PredictionTimeoutError, PredictionFailedError)):
+        return "fail"
+    return "neutral"
+
+
+class BufferedTransport(httpx.AsyncBaseTransport):
+    """
+    API 응답 본문을 끝까지 읽어 반환하는 전송 계층 (prediction JSON 이라 작음)
+
+    replicate SDK 의 RetryTransport 는 GET 429/503/504 를 재시도하기 전에 응답에 동기 close() 를
+    호출하는데, 스트림 응답이면 RuntimeError 가 나므로 이미 읽은 응답을 넘김
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        try:
+            # 압축 해제는 클라이언트가 하므로 원본 바이트 그대로
+            content = b"".join([chunk async for chunk in response.aiter_raw()])
+        finally:
+            await response.aclose()
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            content=content,
+            extensions=response.extensions,
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
 
 class ReplicateBackgroundGenerator:
     """Replicate API를 사용한 SDXL 배경 생성"""
     
-    def __init__(self, api_token: Optional[str] = None):
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        base_url: Optional[str] = None,
+        pool_size: int = 20,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 3.0,
+        prediction_timeout: float = 180.0,
+        max_output_bytes: int = 30 * 1024 * 1024,
+        input_format: str = "png",
+        png_compress_level: int = 1
+    ):
         """
         Args:
             api_token: Replicate API 토큰 (없으면 환경 변수에서 자동 로드)
+            base_url: API 주소 (기본값: https://api.replicate.com)
+            pool_size: HTTP 커넥션 풀 크기 (API / 출력 다운로드 각각)
+            connect_timeout: 연결 타임아웃 (초)
+            read_timeout: 응답 읽기 타임아웃 (초)
+            poll_interval: 첫 폴링 간격 (초, 이후 1.5배씩 증가)
+            max_poll_interval: 최대 폴링 간격 (초)
+            prediction_timeout: prediction 최대 대기 시간 (초, 초과 시 취소)
+            max_output_bytes: 출력 이미지 최대 크기
+            input_format: 입력 이미지 인코딩 ("png" | "webp", 둘 다 무손실/투명도 유지)
+            png_compress_level: PNG zlib 레벨 (0~9, 기본값 6 대비 1 은 인코딩 약 2배 빠름)
         """
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Invalid input_format '{input_format}'. Choose from: {list(INPUT_FORMATS)}")
         self.logger = logging.getLogger(__name__)
-        self.client = replicate.Client(api_token=api_token)
+        self.api_token = api_token
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout, pool=connect_timeout)
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        # API 커넥션 풀은 직접 만들어 넘기고 aclose 에서 직접 닫음 (SDK 내부 클라이언트에 의존하지 않음)
+        self.transport = BufferedTransport(httpx.AsyncHTTPTransport(limits=limits))
+        self.client = replicate.Client(
+            api_token=api_token,
+            base_url=base_url,
+            timeout=self.timeout,
+            transport=self.transport
+        )
+        # 출력 이미지 다운로드용 (replicate.delivery 등 API 와 다른 호스트)
+        self.http = httpx.AsyncClient(timeout=self.timeout, limits=limits, follow_redirects=True)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.prediction_timeout = prediction_timeout
+        self.max_output_bytes = max_output_bytes
+        self.input_format = input_format
+        self.png_compress_level = png_compress_level
         
-    @staticmethod
-    def _image_to_base64(image: Image.Image) -> str:
-        """PIL Image를 base64 문자열로 변환"""
+    @property
+    def input_mime_type(self) -> str:
+        return INPUT_FORMATS[self.input_format]
+    
+    def encode_input(self, image: Image.Image) -> bytes:
+        """입력 캔버스 인코딩 (투명도 유지)"""
         buffered = io.BytesIO()
-        # PNG로 저장 (투명도 유지)
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
-        return f"data:image/png;base64,{img_str}"
+        if self.input_format == "webp":
+            # 무손실 WebP: quality/method 0 = 가장 빠른 압축
+            image.save(buffered, format="WEBP", lossless=True, quality=0, method=0)
+        else:
+            image.save(buffered, format="PNG", compress_level=self.png_compress_level)
+        return buffered.getvalue()
+    
+    def to_data_uri(self, data: bytes) -> str:
+        """encode_input 결과 → base64 data URI (약 33% 증가)"""
+        img_str = base64.b64encode(data).decode()
+        return f"data:{self.input_mime_type};base64,{img_str}"
+    
+    def _image_to_base64(self, image: Image.Image) -> str:
+        """PIL Image를 base64 data URI 로 변환"""
+        return self.to_data_uri(self.encode_input(image))
     
     @staticmethod
     def _resize_and_center(
@@ -61,6 +206,94 @@ class ReplicateBackgroundGenerator:
         canvas.paste(resized_img, (x_offset, y_offset))
         return canvas
     
+    def render_input(self, product_image: Image.Image, aspect_ratio: str = "square") -> Image.Image:
+        """입력 캔버스 생성 (비율별 크기로 리사이즈 + 중앙 정렬)"""
+        target_width, target_height = DIMENSIONS.get(aspect_ratio, DIMENSIONS["square"])
+        
+        return self._resize_and_center(
+            product_image,
+            target_width,
+            target_height,
+            padding_percent=0.7
+        )
+    
+    def prepare_image(self, product_image: Image.Image, aspect_ratio: str = "square") -> str:
+        """
+        입력 이미지 전처리 (리사이즈 + 중앙 정렬 + base64 인코딩, CPU 작업)
+        
+        스타일과 무관하므로 여러 스타일을 생성할 때 한 번만 실행
+        
+        Returns:
+            data URI (input_format)
+        """
+        return self._image_to_base64(self.render_input(product_image, aspect_ratio))
+    
+    def build_input(
+        self,
+        input_image: str,
+        prompt_text: str,
+        aspect_ratio: str = "square",
+        style: str = "minimal",
+        negative_prompt: str = "",
+        num_inference_steps: int = 30,
+        controlnet_conditioning_scale: float = 0.5,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        전처리된 이미지 + 스타일 프롬프트 → Replicate SDXL 입력 dict
+        
+        Args:
+            input_image: prepare_image 결과 (data URI) 또는 같은 캔버스의 URL (같은 aspect_ratio)
+        """
+        target_width, target_height = DIMENSIONS.get(aspect_ratio, DIMENSIONS["square"])
+        
+        # 스타일 프롬프트 가져오기
+        style_config = StylePrompts.get_prompt(style)
+        full_positive_prompt = f"{prompt_text}, {style_config['positive']}"
+        full_negative_prompt = f"{negative_prompt}, {style_config['negative']}"
+        
+        self.logger.info(
+            f"Generating with Replicate: style={style}, "
+            f"ratio={aspect_ratio} ({target_width}x{target_height})"
+        )
+        
+        model_input = {
+            "image": input_image,
+            "prompt": full_positive_prompt,
+            "negative_prompt": full_negative_prompt,
+            "num_inference_steps": num_inference_steps,
+            "controlnet_conditioning_scale": controlnet_conditioning_scale,
+            "width": target_width,
+            "height": target_height,
+        }
+        if seed is not None:
+            # 시드 고정 시 같은 입력 → 같은 결과 (생성 캐시 키에 포함)
+            model_input["seed"] = seed
+        return model_input
+    
+    def prepare_input(
+        self,
+        product_image: Image.Image,
+        prompt_text: str,
+        aspect_ratio: str = "square",
+        style: str = "minimal",
+        negative_prompt: str = "",
+        num_inference_steps: int = 30,
+        controlnet_conditioning_scale: float = 0.5,
+        seed: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        prediction 입력 생성 (prepare_image + build_input, CPU 작업)
+        
+        Returns:
+            Replicate SDXL 입력 dict
+        """
+        image_data_uri = self.prepare_image(product_image, aspect_ratio)
+        return self.build_input(
+            image_data_uri, prompt_text, aspect_ratio, style,
+            negative_prompt, num_inference_steps, controlnet_conditioning_scale, seed
+        )
+    
     def generate_background(
         self,
         product_image: Image.Image,
@@ -72,7 +305,7 @@ class ReplicateBackgroundGenerator:
         controlnet_conditioning_scale: float = 0.5
     ) -> Image.Image:
         """
-        Replicate API를 사용하여 배경 생성
+        Replicate API를 사용하여 배경 생성 (블로킹, 스크립트용)
         
         Args:
             product_image: 제품 이미지 (배경 제거된 상태)
@@ -86,56 +319,22 @@ class ReplicateBackgroundGenerator:
         Returns:
             배경이 생성된 최종 이미지
         """
-        # 인스타그램 비율 설정
-        dimensions = {
-            "square": (1080, 1080),    # 1:1
-            "portrait": (1080, 1352),  # 4:5
-            "landscape": (1080, 608)   # 16:9
-        }
-        
-        target_width, target_height = dimensions.get(aspect_ratio, dimensions["square"])
-        
-        # 스타일 프롬프트 가져오기
-        style_config = StylePrompts.get_prompt(style)
-        full_positive_prompt = f"{prompt_text}, {style_config['positive']}"
-        full_negative_prompt = f"{negative_prompt}, {style_config['negative']}"
-        
-        # 이미지 리사이즈 및 중앙 정렬
-        processed_image = self._resize_and_center(
-            product_image,
-            target_width,
-            target_height,
-            padding_percent=0.7
-        )
-        
-        # base64 인코딩
-        image_data_uri = self._image_to_base64(processed_image)
-        
-        self.logger.info(
-            f"Generating with Replicate: style={style}, "
-            f"ratio={aspect_ratio} ({target_width}x{target_height})"
+        model_input = self.prepare_input(
+            product_image, prompt_text, aspect_ratio, style,
+            negative_prompt, num_inference_steps, controlnet_conditioning_scale
         )
         
         try:
             # Replicate SDXL ControlNet 실행
-            output = self.client.run(
-                "stability-ai/sdxl:39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b",
-                input={
-                    "image": image_data_uri,
-                    "prompt": full_positive_prompt,
-                    "negative_prompt": full_negative_prompt,
-                    "num_inference_steps": num_inference_steps,
-                    "controlnet_conditioning_scale": controlnet_conditioning_scale,
-                    "width": target_width,
-                    "height": target_height,
-                }
-            )
+            # self.client 의 전송 계층은 비동기 전용이므로 동기 클라이언트를 따로 사용
+            client = replicate.Client(api_token=self.api_token, base_url=self.base_url, timeout=self.timeout)
+            output = client.run(f"stability-ai/sdxl:{SDXL_VERSION}", input=model_input)
             
             # 결과 이미지 로드
             if isinstance(output, list) and len(output) > 0:
                 # Replicate는 URL을 반환
-                import requests
-                response = requests.get(output[0])
+                response = httpx.get(output[0], timeout=self.timeout, follow_redirects=True)
+                response.raise_for_status()
                 result_image = Image.open(io.BytesIO(response.content))
                 
                 self.logger.info("Background generation completed successfully")
@@ -145,4 +344,175 @@ class ReplicateBackgroundGenerator:
                 
         except Exception as e:
             self.logger.error(f"Replicate generation failed: {e}")
-            raise Exception(f"Failed to generate background: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to generate background: {str(e)}")
+    
+    async def generate_background_async(
+        self,
+        product_image: Image.Image,
+        prompt_text: str,
+        aspect_ratio: str = "square",
+        style: str = "minimal",
+        negative_prompt: str = "",
+        num_inference_steps: int = 30,
+        controlnet_conditioning_scale: float = 0.5,
+        seed: Optional[int] = None
+    ) -> Image.Image:
+        """
+        Replicate API를 사용하여 배경 생성 (비동기)
+        
+        prediction 생성 → 완료까지 폴링 → 출력 이미지 스트리밍 다운로드
+        대기하는 동안 이벤트 루프는 다른 요청을 처리
+        
+        Args:
+            generate_background 와 동일
+            seed: 생성 시드 (None 이면 랜덤)
+            
+        Returns:
+            배경이 생성된 최종 이미지
+        """
+        model_input = await asyncio.to_thread(
+            self.prepare_input,
+            product_image, prompt_text, aspect_ratio, style,
+            negative_prompt, num_inference_steps, controlnet_conditioning_scale, seed
+        )
+        return await self.run_prediction(model_input)
+    
+    async def create_prediction(self, model_input: Dict[str, Any]):
+        """
+        prediction 생성 (재시도해도 되는 유일한 단계 - 실패 시 과금되는 prediction 이 없음)
+        
+        Raises:
+            ReplicateError / httpx.TransportError: API 호출 실패 (classify_error 참고)
+        """
+        prediction = await self.client.predictions.async_create(
+            version=SDXL_VERSION,
+            input=model_input
+        )
+        self.logger.info(f"Prediction created: {prediction.id}")
+        return prediction
+    
+    async def complete_prediction(self, prediction) -> str:
+        """
+        생성된 prediction 완료까지 폴링 (일시 장애는 같은 prediction 으로 다시 폴링)
+        
+        Returns:
+            출력 이미지 URL (stream_output / download_output 으로 읽음)
+        
+        Raises:
+            PredictionTimeoutError: 제한 시간 초과 (취소 요청됨)
+            PredictionFailedError: prediction failed / canceled
+            ReplicateError: 재시도할 수 없는 폴링 오류 (취소 요청됨)
+        """
+        prediction = await self.wait_for_prediction(prediction)
+        if prediction.status != "succeeded":
+            raise PredictionFailedError(f"Prediction {prediction.status}: {prediction.error}")
+        
+        output = prediction.output
+        if not (isinstance(output, list) and len(output) > 0):
+            raise PredictionFailedError("No output from Replicate")
+        
+        self.logger.info("Background generation completed successfully")
+        return output[0]
+    
+    @stage_timer("replicate_prediction")
+    async def run_prediction_output(self, model_input: Dict[str, Any]) -> str:
+        """
+        prediction 생성 → 완료까지 폴링 (create_prediction + complete_prediction)
+        
+        Args:
+            model_input: prepare_input / build_input 결과
+            
+        Returns:
+            출력 이미지 URL (stream_output / download_output 으로 읽음)
+        """
+        try:
+            prediction = await self.create_prediction(model_input)
+            return await self.complete_prediction(prediction)
+        except Exception as e:
+            self.logger.error(f"Replicate generation failed: {e!r}")
+            raise
+    
+    async def run_prediction(self, model_input: Dict[str, Any]) -> Image.Image:
+        """
+        prediction 생성 → 완료까지 폴링 → 출력 이미지 다운로드
+        
+        Args:
+            model_input: prepare_input / build_input 결과
+            
+        Returns:
+            배경이 생성된 최종 이미지
+        """
+        output_url = await self.run_prediction_output(model_input)
+        data = await self.download_output(output_url)
+        return Image.open(io.BytesIO(data))
+    
+    async def wait_for_prediction(self, prediction):
+        """
+        prediction 완료까지 폴링 (간격 점진 증가, prediction_timeout 초과 시 취소)
+        
+        폴링 중 일시 장애 (연결 오류, 429, 5xx) 는 다음 간격에 같은 prediction 을 다시 조회
+        (새 prediction 을 만들지 않음). 완료 전에 빠져나가면 (제한 시간 초과, 재시도할 수 없는 오류,
+        요청 취소 / 헤징에서 진 쪽) 과금이 계속되지 않도록 취소 요청
+        
+        Raises:
+            PredictionTimeoutError: 제한 시간 초과
+        """
+        deadline = time.monotonic() + self.prediction_timeout
+        interval = self.poll_interval
+        
+        try:
+            while prediction.status not in ("succeeded", "failed", "canceled"):
+                if time.monotonic() + interval > deadline:
+                    raise PredictionTimeoutError(
+                        f"Prediction {prediction.id} did not finish within {self.prediction_timeout}s"
+                    )
+                
+                await asyncio.sleep(interval)
+                interval = min(interval * 1.5, self.max_poll_interval)
+                try:
+                    prediction = await self.client.predictions.async_get(prediction.id)
+                except Exception as e:
+                    if classify_error(e) != "retry":
+                        raise
+                    self.logger.warning(f"Polling prediction {prediction.id} failed ({e!r}), retrying")
+        except asyncio.CancelledError:
+            asyncio.ensure_future(self.cancel_prediction(prediction.id))
+            raise
+        except Exception:
+            await self.cancel_prediction(prediction.id)
+            raise
+        
+        return prediction
+    
+    async def cancel_prediction(self, prediction_id: str) -> None:
+        """prediction 취소 요청 (실패해도 예외 없음)"""
+        try:
+            await self.client.predictions.async_cancel(prediction_id)
+        except Exception as e:
+            self.logger.warning(f"Failed to cancel prediction {prediction_id}: {e}")
+    
+    async def stream_output(self, url: str) -> AsyncIterator[bytes]:
+        """출력 이미지 스트리밍 (받는 대로 청크 전달, max_output_bytes 초과 시 중단)"""
+        received = 0
+        try:
+            async with self.http.stream("GET", url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    received += len(chunk)
+                    if received > self.max_output_bytes:
+                        raise Exception(f"Output image exceeds {self.max_output_bytes} bytes")
+                    yield chunk
+        finally:
+            record_bytes("replicate_output", received, "in")
+    
+    async def download_output(self, url: str) -> bytes:
+        """출력 이미지 전체 다운로드 (max_output_bytes 초과 시 중단)"""
+        buffer = bytearray()
+        async for chunk in self.stream_output(url):
+            buffer.extend(chunk)
+        return bytes(buffer)
+    
+    async def aclose(self) -> None:
+        """HTTP 커넥션 풀 종료"""
+        await self.http.aclose()
+        await self.transport.aclose()
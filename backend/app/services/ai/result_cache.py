@@ -0,0 +1,238 @@
+"""
+Remove-Background Result Cache
+이미지 바이트 해시 기반 다단계 캐시 (content-addressed)
+- mask:    image_hash                                         → 세그멘테이션 마스크
+- styled:  (image_hash, style, enhance_color, remove_wrinkles) → 스타일 적용 RGBA
+- encoded: styled 키 + (ratio, background_color, format)       → 최종 인코딩 바이트
+같은 사진을 비율/배경색만 바꿔 다시 요청하면 rembg 와 스타일 단계를 건너뜀
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set
+
+from PIL import Image
+
+from config import settings
+from app.core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+LAYERS = ("mask", "styled", "encoded")
+
+
+def hash_image_bytes(contents: bytes) -> str:
+    """업로드 바이트의 SHA-256 해시"""
+    return hashlib.sha256(contents).hexdigest()
+
+
+def _value_size(value: Any) -> int:
+    """캐시 값의 메모리 크기 추정 (bytes)"""
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    return len(value)
+
+
+class LRUCache:
+    """Byte-size bounded LRU cache (이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _value_size(value)
+        if size > self.max_bytes:
+            return
+
+        if key in self._data:
+            self.current_bytes -= self._data.pop(key)[1]
+        self._data[key] = (value, size)
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self.current_bytes -= evicted_size
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class DiskCache:
+    """Optional on-disk tier (파일 mtime 기준 LRU 정리)"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        for layer in LAYERS:
+            os.makedirs(os.path.join(directory, layer), exist_ok=True)
+        self.current_bytes = sum(size for _, size, _ in self._entries())
+
+    def _path(self, layer: str, key: Hashable) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return os.path.join(self.directory, layer, digest)
+
+    def _entries(self):
+        for layer in LAYERS:
+            with os.scandir(os.path.join(self.directory, layer)) as it:
+                for entry in it:
+                    stat = entry.stat()
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def read(self, layer: str, key: Hashable) -> Optional[Any]:
+        path = self._path(layer, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # 최근 사용으로 갱신
+        except FileNotFoundError:
+            return None
+
+        if layer == "encoded":
+            return data
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+
+    def write(self, layer: str, key: Hashable, value: Any) -> None:
+        if isinstance(value, Image.Image):
+            buffer = io.BytesIO()
+            value.save(buffer, format="PNG", compress_level=1)
+            data = buffer.getvalue()
+        else:
+            data = value
+
+        path = self._path(layer, key)
+        tmp_path = f"{path}.tmp.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            # 같은 키를 덮어쓰면 기존 파일 크기를 빼고 더함 (LRUCache.put 과 같은 방식)
+            try:
+                previous_size = os.stat(path).st_size
+            except FileNotFoundError:
+                previous_size = 0
+            os.replace(tmp_path, path)
+            self.current_bytes += len(data) - previous_size
+            if self.current_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 오래된 파일부터 max_bytes 의 90% 까지 삭제
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+        self.current_bytes = total
+
+
+class ResultCache:
+    """Layered result cache for /remove-background"""
+
+    def __init__(
+        self,
+        max_bytes: Dict[str, int],
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 1024 * 1024 * 1024,
+    ):
+        """
+        Args:
+            max_bytes: 레이어별 메모리 한도 (mask, styled, encoded)
+            disk_dir: 디스크 캐시 경로 (None 이면 메모리만 사용)
+            disk_max_bytes: 디스크 캐시 한도
+        """
+        self.memory = {layer: LRUCache(max_bytes[layer]) for layer in LAYERS}
+        self.disk = DiskCache(disk_dir, disk_max_bytes) if disk_dir else None
+        self._writes: Set[asyncio.Task] = set()
+
+    async def get(self, layer: str, key: Hashable) -> Optional[Any]:
+        """메모리 → 디스크 순서로 조회 (디스크 적중 시 메모리로 승격)"""
+        value = self.memory[layer].get(key)
+        if value is None and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.read, layer, key)
+            if value is not None:
+                self.memory[layer].put(key, value)
+        record_cache(f"result_{layer}", value is not None)
+        return value
+
+    def put(self, layer: str, key: Hashable, value: Any) -> None:
+        """메모리에 저장하고 디스크에는 백그라운드로 기록"""
+        if value is None:
+            return
+        self.memory[layer].put(key, value)
+
+        if self.disk is not None:
+            task = asyncio.create_task(asyncio.to_thread(self.disk.write, layer, key, value))
+            self._writes.add(task)
+            task.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task) -> None:
+        self._writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Result cache disk write failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {layer: cache.stats() for layer, cache in self.memory.items()}
+        if self.disk is not None:
+            stats["disk"] = {"bytes": self.disk.current_bytes, "max_bytes": self.disk.max_bytes}
+        return stats
+
+
+# Result Cache (싱글톤)
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get or create result cache instance (None if disabled)"""
+    global _result_cache
+    if _result_cache is None and settings.RESULT_CACHE_ENABLED:
+        mb = 1024 * 1024
+        logger.info(f"Initializing ResultCache (disk: {settings.RESULT_CACHE_DISK_DIR or 'off'})")
+        disk_dir = settings.RESULT_CACHE_DISK_DIR
+        if disk_dir and os.path.commonpath(
+            [os.path.abspath(disk_dir), os.path.abspath(settings.LOCAL_STORAGE_DIR)]
+        ) == os.path.abspath(settings.LOCAL_STORAGE_DIR):
+            logger.warning(
+                f"RESULT_CACHE_DISK_DIR ({disk_dir}) is inside LOCAL_STORAGE_DIR, "
+                f"which is served publicly at /uploads"
+            )
+        _result_cache = ResultCache(
+            max_bytes={
+                "mask": settings.RESULT_CACHE_MASK_MB * mb,
+                "styled": settings.RESULT_CACHE_STYLED_MB * mb,
+                "encoded": settings.RESULT_CACHE_ENCODED_MB * mb,
+            },
+            disk_dir=settings.RESULT_CACHE_DISK_DIR,
+            disk_max_bytes=settings.RESULT_CACHE_DISK_MB * mb,
+        )
+    return _result_cache
@@ -0,0 +1,182 @@
+"""
+Image Processing Tasks
+Executor 워커(프로세스/스레드)에서 실행되는 배경 제거 → 스타일 → 리사이즈 → 인코딩 파이프라인
+모든 함수는 모듈 레벨에 있어야 process pool 에서 pickle 가능
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+from PIL import Image
+import io
+import logging
+
+from config import settings
+from app.core.metrics import collect_timings, stage_timer
+from app.services.ai.background import BackgroundRemovalService
+from app.services.ai.img_processing import resize_to_instagram_ratio, add_background_color
+from app.services.ai.styles import StyleProcessor
+
+logger = logging.getLogger(__name__)
+
+# Initialize services (워커 프로세스별 싱글톤)
+bg_removal_service = None
+style_processor = None
+
+
+def get_bg_removal_service() -> BackgroundRemovalService:
+    """Get or create background removal service instance"""
+    global bg_removal_service
+    if bg_removal_service is None:
+        logger.info("Initializing BackgroundRemovalService...")
+        bg_removal_service = BackgroundRemovalService(model=settings.REMBG_MODEL)
+    return bg_removal_service
+
+
+def get_style_processor() -> StyleProcessor:
+    """Get or create style processor instance"""
+    global style_processor
+    if style_processor is None:
+        logger.info("Initializing StyleProcessor...")
+        style_processor = StyleProcessor()
+    return style_processor
+
+
+def init_worker() -> None:
+    """
+    Executor 워커 시작 시 서비스 사전 로드 (워커마다 1회, 풀 재생성 후 새 워커 포함)
+    REMBG_WARMUP 이면 더미 추론까지 실행 → 첫 작업 전에 ONNX 세션 초기화 완료
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    service = get_bg_removal_service()
+    get_style_processor()
+    
+    # 모델 로드 실패로 워커가 죽지 않도록 로그만 남김 (첫 요청에서 다시 시도)
+    try:
+        if settings.REMBG_WARMUP:
+            service.warmup()
+        else:
+            service.load()
+    except Exception as e:
+        logger.error(f"Failed to preload rembg model '{service.model}': {e}")
+
+
+def warmup_worker() -> bool:
+    """
+    워커 준비 확인 (main.lifespan 에서 워커 수만큼 동시에 제출 → 풀이 모든 워커를 생성)
+    워밍업은 init_worker 에서 끝났으므로 여기서는 로드 여부만 확인 (실패했으면 다시 로드)
+    """
+    get_bg_removal_service().load()
+    return True
+
+
+@dataclass
+class ProcessingResult:
+    """process_image 결과"""
+    content: bytes
+    output_format: str
+    timing: Dict[str, float] = field(default_factory=dict)
+    # keep_intermediates=True 일 때만 채워짐 (결과 캐시용)
+    mask: Optional[Image.Image] = None
+    styled: Optional[Image.Image] = None
+
+
+def segment_batch(contents_list: List[bytes]) -> List[Union[Image.Image, Exception]]:
+    """
+    Predict foreground masks for several images in one ONNX batch (blocking)
+    디코드할 수 없는 이미지는 배치에서 빼고 그 자리에 예외를 반환 (나머지 이미지는 정상 처리)
+
+    Args:
+        contents_list: Uploaded image bytes
+
+    Returns:
+        Masks in the same order (pass to process_image as mask), 실패한 이미지는 예외
+    """
+    service = get_bg_removal_service()
+    results: List[Union[Image.Image, Exception]] = []
+    images = []
+    for contents in contents_list:
+        try:
+            image = service.prepare(Image.open(io.BytesIO(contents)))
+            image.load()
+        except Exception as e:
+            results.append(e)
+        else:
+            results.append(image)
+            images.append(image)
+
+    masks = iter(service.predict_masks(images) if images else [])
+    return [result if isinstance(result, Exception) else next(masks) for result in results]
+
+
+def process_image(
+    contents: bytes,
+    ratio: str = "4:5",
+    background_color: Optional[str] = None,
+    style: str = "minimal",
+    mask: Optional[Image.Image] = None,
+    styled: Optional[Image.Image] = None,
+    keep_intermediates: bool = False,
+) -> ProcessingResult:
+    """
+    Remove background, apply style, resize and encode (blocking)
+
+    Args:
+        contents: Uploaded image bytes
+        ratio: Instagram aspect ratio ("4:5", "1:1", "16:9")
+        background_color: Optional hex color for background (e.g., "#FFFFFF")
+        style: Processing style ("minimal", "mood", "street")
+        mask: Precomputed foreground mask (skips segmentation)
+        styled: Precomputed styled RGBA image (skips segmentation and style)
+        keep_intermediates: Return mask and styled image for caching
+
+    Returns:
+        Encoded image with per-stage timing
+    """
+    computed_mask = None
+
+    # 워커 프로세스의 단계 시간은 결과와 함께 반환 (부모 프로세스에서 record_timings)
+    with collect_timings() as timing, stage_timer("worker_total"):
+        if styled is None:
+            service = get_bg_removal_service()
+            image = service.prepare(Image.open(io.BytesIO(contents)))
+
+            # 1. Remove background (마스크가 있으면 합성만 수행)
+            with stage_timer("background_removal"):
+                if mask is None:
+                    mask = computed_mask = service.predict_masks([image])[0]
+                result = service.cutout(image, mask)
+
+            # 2. Apply style processing
+            with stage_timer("style_processing"):
+                result = styled = get_style_processor().process_with_style(result, style=style)
+        else:
+            result = styled
+
+        # 3. Resize to Instagram ratio
+        with stage_timer("resize"):
+            result = resize_to_instagram_ratio(result, ratio=ratio)
+
+        # 4. Add background color if specified
+        if background_color:
+            with stage_timer("background_color"):
+                # Parse hex color
+                bg_color = tuple(int(background_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+                result = add_background_color(result, background_color=bg_color)
+            output_format = "JPEG"
+        else:
+            output_format = "PNG"
+
+        # 5. Convert to bytes
+        with stage_timer("encoding"):
+            output_buffer = io.BytesIO()
+            result.save(output_buffer, format=output_format, quality=95)
+
+    return ProcessingResult(
+        content=output_buffer.getvalue(),
+        output_format=output_format,
+        timing=dict(timing),
+        mask=computed_mask if keep_intermediates else None,
+        styled=styled if keep_intermediates else None
+    )
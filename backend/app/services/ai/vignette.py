@@ -0,0 +1,89 @@
+"""
+Vignette Module
+Vectorized radial vignette masks with per-size caching
+"""
+from functools import lru_cache
+from PIL import Image
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Instagram 프리셋 크기는 몇 가지뿐이므로 작은 캐시로 충분
+MASK_CACHE_SIZE = 32
+
+
+@lru_cache(maxsize=MASK_CACHE_SIZE)
+def build_vignette_mask(width: int, height: int, strength: float) -> np.ndarray:
+    """
+    Build radial vignette mask with NumPy broadcasting
+
+    Args:
+        width: Mask width
+        height: Mask height
+        strength: Vignette strength (0.0 to 1.0)
+
+    Returns:
+        Read-only uint8 mask (height x width), 255 at the center
+    """
+    center_x, center_y = width // 2, height // 2
+    max_dist = np.sqrt(center_x**2 + center_y**2) or 1.0
+
+    # (1, W) 과 (H, 1) 을 브로드캐스팅해 (H, W) 거리 맵 생성
+    xs = (np.arange(width, dtype=np.float64) - center_x) ** 2
+    ys = (np.arange(height, dtype=np.float64) - center_y) ** 2
+    dist = np.sqrt(ys[:, np.newaxis] + xs[np.newaxis, :])
+
+    mask = 255 * (1 - strength * (dist / max_dist))
+    mask = np.clip(mask.astype(np.float32), 0, 255).astype(np.uint8)
+    mask.flags.writeable = False
+
+    logger.debug(f"Built vignette mask: {width}x{height}, strength={strength}")
+    return mask
+
+
+def get_vignette_mask(size: tuple, strength: float) -> Image.Image:
+    """
+    Get cached vignette mask as PIL 'L' image
+
+    Args:
+        size: Image size (width, height)
+        strength: Vignette strength (0.0 to 1.0)
+
+    Returns:
+        Vignette mask image
+    """
+    width, height = size
+    return Image.fromarray(build_vignette_mask(width, height, float(strength)))
+
+
+def apply_vignette(image: Image.Image, strength: float = 0.3) -> Image.Image:
+    """
+    Apply vignette effect
+
+    Args:
+        image: RGB/RGBA image
+        strength: Vignette strength (0.0 to 1.0)
+
+    Returns:
+        Image with vignette
+    """
+    has_alpha = image.mode == 'RGBA'
+    if has_alpha:
+        alpha = image.split()[3]
+        rgb_image = image.convert('RGB')
+    else:
+        rgb_image = image
+
+    mask = get_vignette_mask(rgb_image.size, strength)
+    result = Image.composite(rgb_image, Image.new('RGB', rgb_image.size, (0, 0, 0)), mask)
+
+    if has_alpha:
+        result.putalpha(alpha)
+
+    return result
+
+
+def clear_mask_cache() -> None:
+    """Clear cached vignette masks"""
+    build_vignette_mask.cache_clear()
@@ -7,6 +7,8 @@ import numpy as np
 from PIL import Image
 import logging
 
+from app.core.metrics import stage_timer
+
 logger = logging.getLogger(__name__)
 
 
@@ -125,6 +127,32 @@ class WrinkleRemoval:
         
         return result
     
+    @stage_timer("wrinkle_removal")
+    def smooth_array(self, cv_image: np.ndarray, strength: str = "medium") -> np.ndarray:
+        """
+        Wrinkle smoothing steps on a BGR array
+        
+        Args:
+            cv_image: BGR image (numpy array)
+            strength: Smoothing strength ("light", "medium", "strong")
+            
+        Returns:
+            Smoothed BGR image
+        """
+        if strength == "light":
+            cv_image = self.detail_preserving_smooth(cv_image, strength=0.3)
+        elif strength == "medium":
+            cv_image = self.bilateral_filter(cv_image, d=9, sigma_color=50, sigma_space=50)
+        elif strength == "strong":
+            cv_image = self.bilateral_filter(cv_image, d=11, sigma_color=75, sigma_space=75)
+            # Apply second pass for very strong smoothing
+            cv_image = self.detail_preserving_smooth(cv_image, strength=0.4)
+        else:
+            logger.warning(f"Unknown strength '{strength}', using medium")
+            cv_image = self.bilateral_filter(cv_image, d=9, sigma_color=50, sigma_space=50)
+        
+        return cv_image
+    
     def remove_wrinkles(self, image: Image.Image, strength: str = "medium") -> Image.Image:
         """
         Main wrinkle removal pipeline
@@ -147,17 +175,7 @@ class WrinkleRemoval:
         cv_image = cv2.cvtColor(np.array(rgb_image), cv2.COLOR_RGB2BGR)
         
         # Apply smoothing based on strength
-        if strength == "light":
-            cv_image = self.detail_preserving_smooth(cv_image, strength=0.3)
-        elif strength == "medium":
-            cv_image = self.bilateral_filter(cv_image, d=9, sigma_color=50, sigma_space=50)
-        elif strength == "strong":
-            cv_image = self.bilateral_filter(cv_image, d=11, sigma_color=75, sigma_space=75)
-            # Apply second pass for very strong smoothing
-            cv_image = self.detail_preserving_smooth(cv_image, strength=0.4)
-        else:
-            logger.warning(f"Unknown strength '{strength}', using medium")
-            cv_image = self.bilateral_filter(cv_image, d=9, sigma_color=50, sigma_space=50)
+        cv_image = self.smooth_array(cv_image, strength=strength)
         
         # Convert back to PIL
         rgb_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
@@ -0,0 +1,148 @@
+"""
+Login throughput benchmark
+POST /api/auth/login 을 동시 요청 수별로 실행해 처리량과 이벤트 루프 지연을 측정 (benchmarks/harness.py)
+- pool:   PASSWORD_HASH_WORKERS 스레드 풀에서 bcrypt 실행 (기본)
+- inline: 이벤트 루프에서 직접 bcrypt 실행 (PASSWORD_HASH_WORKERS=0, 이전 동작)
+- loop lag: 로그인 버스트 동안 5ms 주기 하트비트가 늦어진 최대 시간 (harness.heartbeat)
+  (inline 이면 bcrypt 1회 시간만큼 다른 요청 - 업로드, 이미지 처리 - 이 멈춤)
+- bcrypt: cost 별 해싱 1회 시간 (BCRYPT_ROUNDS 선택용)
+
+앱 전체 대신 auth 라우터만 임시 SQLite DB 로 띄움 (ASGI in-process, 네트워크 제외)
+
+Usage (backend 디렉토리에서):
+    python -m benchmarks.bench_auth
+    python -m benchmarks.bench_auth --concurrency 1,8,32 --modes pool --workers 8
+    python -m benchmarks.bench_auth --rounds 10,12,14 --baseline benchmarks/results/baseline_auth.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+# app 모듈 import 전에 DB 지정 (app.db.base 가 import 시점에 엔진 생성)
+_DB_DIR = tempfile.mkdtemp(prefix="adgen-bench-auth-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_DB_DIR, 'bench.db')}")
+
+import asyncio
+import logging
+from typing import List
+
+import bcrypt
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.harness import Harness, add_arguments, finish, heartbeat
+from config import settings
+from app.api.routes import auth
+from app.core import security
+from app.db.base import Base, dispose_async_engine, engine
+
+MODES = ("pool", "inline")
+PASSWORD = "bench-password"
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(auth.router)
+    return app
+
+
+def use_mode(mode: str, workers: int) -> None:
+    """해싱 풀 재생성 (inline: 워커 0)"""
+    security.shutdown_password_executor()
+    settings.PASSWORD_HASH_WORKERS = workers if mode == "pool" else 0
+
+
+async def login_burst(app: FastAPI, emails: List[str], lags: List[float]) -> None:
+    """emails 전원이 동시에 로그인 (모두 200 이어야 함)"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        monitor = asyncio.create_task(heartbeat(stop, lags))
+        responses = await asyncio.gather(*[
+            client.post("/api/auth/login", data={"username": email, "password": PASSWORD})
+            for email in emails
+        ])
+        stop.set()
+        await monitor
+    failed = [r.status_code for r in responses if r.status_code != 200]
+    if failed:
+        raise RuntimeError(f"Login failed: {failed[:5]}")
+
+
+async def create_users(app: FastAPI, count: int) -> List[str]:
+    transport = httpx.ASGITransport(app=app)
+    emails = [f"bench-{i}@example.com" for i in range(count)]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i, email in enumerate(emails):
+            response = await client.post(
+                "/api/auth/signup", json={"email": email, "password": PASSWORD, "name": f"bench {i}"}
+            )
+            if response.status_code != 201:
+                raise RuntimeError(f"Signup failed: {response.status_code} {response.text}")
+    return emails
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Login throughput benchmark")
+    parser.add_argument("--concurrency", default="1,4,16", help="동시 로그인 수 (쉼표 구분)")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"쉼표 구분 ({', '.join(MODES)})")
+    parser.add_argument("--workers", type=int, default=settings.PASSWORD_HASH_WORKERS, help="pool 모드 스레드 수")
+    parser.add_argument("--rounds", default=str(settings.BCRYPT_ROUNDS), help="bcrypt cost 별 해싱 시간 (쉼표 구분)")
+    add_arguments(parser, output="benchmarks/results/bench_auth.json")
+    args = parser.parse_args()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    rounds = [int(r) for r in args.rounds.split(",")]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"Unknown mode: {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.WARNING)
+    # 로그인 경로는 principal 캐시를 쓰지 않지만 가입 시 로그 등 잡음 제거
+    settings.USER_CACHE_ENABLED = False
+
+    harness = Harness(repeat=args.repeat, warmup=args.warmup, memory=not args.no_memory)
+
+    for cost in rounds:
+        salt = bcrypt.gensalt(rounds=cost)
+        harness.measure("bcrypt", lambda: bcrypt.hashpw(PASSWORD.encode(), salt), variant=f"cost{cost}")
+
+    Base.metadata.create_all(bind=engine)
+    app = create_app()
+    # 비동기 DB 연결은 생성한 이벤트 루프에 묶이므로 모든 버스트를 같은 루프에서 실행
+    loop = asyncio.new_event_loop()
+    emails = loop.run_until_complete(create_users(app, max(levels)))
+
+    for mode in modes:
+        use_mode(mode, args.workers)
+        for level in levels:
+            lags: List[float] = []
+            result = harness.measure(
+                "login",
+                lambda: loop.run_until_complete(login_burst(app, emails[:level], lags)),
+                variant=f"{mode}-c{level}",
+                concurrency=level,
+                workers=args.workers if mode == "pool" else 0,
+            )
+            # 버스트 1회 = level 개 로그인
+            result["throughput"] = round(level / (result["median_ms"] / 1000), 2)
+            result["max_loop_lag_ms"] = round(max(lags, default=0.0) * 1000, 2)
+            print(
+                f"login {mode:<6} c{level:<4} {result['throughput']:8.1f} logins/s, "
+                f"max loop lag {result['max_loop_lag_ms']:.1f}ms"
+            )
+    security.shutdown_password_executor()
+    loop.run_until_complete(dispose_async_engine())
+    loop.close()
+
+    return finish(
+        harness, args,
+        bcrypt_rounds=settings.BCRYPT_ROUNDS,
+        database_url=os.environ["DATABASE_URL"].split("@")[-1],
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Image pipeline benchmark
+배경 제거 / 스타일별 처리 / 색 보정 / 주름 제거 / 리사이즈 / 인코딩을 Instagram 프리셋 크기별로 측정
+단계별 wall time, 피크 RSS, 할당량을 JSON 으로 저장하고 baseline 과 비교 (benchmarks/harness.py)
+
+입력 이미지:
+- synthetic: 시드 고정 합성 이미지 (배경 그라디언트 + 노이즈 + 옷 형태 전경, 재현 가능)
+- --fixtures 디렉토리의 jpg/png/webp (각 프리셋 크기로 center-crop)
+
+Usage (backend 디렉토리에서):
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --stages style,color --ratios 4:5 --repeat 3
+    python -m benchmarks.bench_pipeline --fixtures ~/product_photos --skip-rembg
+    python -m benchmarks.bench_pipeline --baseline benchmarks/results/baseline.json
+"""
+import argparse
+import io
+import logging
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+from benchmarks.harness import Harness, add_arguments, finish
+from app.services.ai.color import ColorCorrection
+from app.services.ai.img_processing import INSTAGRAM_RATIOS, resize_to_instagram_ratio
+from app.services.ai.pipeline import STYLE_OPERATORS
+from app.services.ai.styles import StyleProcessor
+from app.services.ai.wrinkle import WrinkleRemoval
+
+STAGES = ("rembg", "style", "color", "wrinkle", "resize", "encode")
+COLOR_STYLES = ("balanced", "vivid", "soft")
+WRINKLE_STRENGTHS = ("light", "medium", "strong")
+FIXTURE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# 리사이즈 입력은 업로드 원본을 흉내 내 프리셋 크기의 이 배수로 만듦
+RESIZE_SOURCE_SCALE = 2
+
+
+def synthetic_image(width: int, height: int, seed: int = 0) -> Image.Image:
+    """배경 그라디언트 + 센서 노이즈 + 가운데 옷 형태 (RGB)"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    background = np.stack([
+        200 + 40 * x / width,
+        190 + 30 * y / height,
+        180 + 20 * (x + y) / (width + height),
+    ], axis=-1)
+    background += rng.normal(0, 6, background.shape)
+    image = Image.fromarray(np.clip(background, 0, 255).astype(np.uint8), "RGB")
+
+    # 티셔츠 실루엣 + 주름 줄무늬
+    draw = ImageDraw.Draw(image)
+    cx, top, w, h = width // 2, height // 5, width // 3, height * 3 // 5
+    draw.polygon([
+        (cx - w // 2, top), (cx - w, top + h // 5), (cx - w * 3 // 4, top + h // 3),
+        (cx - w // 2, top + h // 4), (cx - w // 2, top + h), (cx + w // 2, top + h),
+        (cx + w // 2, top + h // 4), (cx + w * 3 // 4, top + h // 3), (cx + w, top + h // 5),
+        (cx + w // 2, top),
+    ], fill=(40, 70, 140))
+    for i in range(12):
+        offset = int(rng.integers(-w // 2, w // 2))
+        draw.line([(cx + offset, top + h // 4), (cx + offset + 20, top + h)], fill=(30, 55, 115), width=3)
+    return image.filter(ImageFilter.GaussianBlur(1))
+
+
+def synthetic_cutout(image: Image.Image) -> Image.Image:
+    """rembg 없이 스타일 단계를 측정하기 위한 RGBA (타원 알파 마스크)"""
+    mask = Image.new("L", image.size, 0)
+    width, height = image.size
+    ImageDraw.Draw(mask).ellipse(
+        (width // 8, height // 10, width * 7 // 8, height * 9 // 10), fill=255
+    )
+    rgba = image.convert("RGBA")
+    rgba.putalpha(mask.filter(ImageFilter.GaussianBlur(4)))
+    return rgba
+
+
+def load_images(fixtures: str, ratios: List[str]) -> Dict[Tuple[str, str], Image.Image]:
+    """(이미지 이름, 비율) → 프리셋 크기 RGB 이미지"""
+    images = {}
+    for ratio in ratios:
+        width, height = INSTAGRAM_RATIOS[ratio]
+        images[("synthetic", ratio)] = synthetic_image(width, height)
+
+    if fixtures:
+        paths = sorted(p for p in Path(fixtures).iterdir() if p.suffix.lower() in FIXTURE_EXTENSIONS)
+        if not paths:
+            raise SystemExit(f"No fixture images in {fixtures}")
+        for path in paths:
+            source = ImageOps.exif_transpose(Image.open(path)).convert("RGB")
+            for ratio in ratios:
+                images[(path.stem, ratio)] = ImageOps.fit(source, INSTAGRAM_RATIOS[ratio], Image.Resampling.LANCZOS)
+    return images
+
+
+def encode(image: Image.Image, output_format: str) -> bytes:
+    """tasks.process_image 와 같은 설정으로 인코딩"""
+    buffer = io.BytesIO()
+    image.save(buffer, format=output_format, quality=95)
+    return buffer.getvalue()
+
+
+def stage_cases(
+    stages: List[str],
+    image: Image.Image,
+    ratio: str,
+    rembg_service
+) -> List[Tuple[str, str, Callable[[], object]]]:
+    """(stage, variant, 측정 함수) 목록"""
+    processor = StyleProcessor()
+    color = ColorCorrection()
+    wrinkle = WrinkleRemoval()
+    cutout = synthetic_cutout(image)
+    cases = []
+
+    if "rembg" in stages and rembg_service is not None:
+        prepared = rembg_service.prepare(image)
+        mask = rembg_service.predict_masks([prepared])[0]
+        cases.append(("rembg", "predict", lambda: rembg_service.predict_masks([prepared])))
+        cases.append(("rembg", "cutout", lambda: rembg_service.cutout(prepared, mask)))
+    if "style" in stages:
+        for style in STYLE_OPERATORS:
+            cases.append(("style", style, lambda style=style: processor.process_with_style(cutout, style=style)))
+    if "color" in stages:
+        for style in COLOR_STYLES:
+            cases.append(("color", style, lambda style=style: color.auto_enhance(cutout, style=style)))
+    if "wrinkle" in stages:
+        for strength in WRINKLE_STRENGTHS:
+            cases.append(("wrinkle", strength, lambda strength=strength: wrinkle.remove_wrinkles(cutout, strength=strength)))
+    if "resize" in stages:
+        width, height = image.size
+        source = cutout.resize((width * RESIZE_SOURCE_SCALE, height * RESIZE_SOURCE_SCALE))
+        cases.append(("resize", "", lambda: resize_to_instagram_ratio(source, ratio=ratio)))
+    if "encode" in stages:
+        cases.append(("encode", "png", lambda: encode(cutout, "PNG")))
+        rgb = cutout.convert("RGB")
+        cases.append(("encode", "jpeg", lambda: encode(rgb, "JPEG")))
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Image pipeline benchmark")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"쉼표 구분 ({', '.join(STAGES)})")
+    parser.add_argument("--ratios", default=",".join(INSTAGRAM_RATIOS), help="쉼표 구분 Instagram 비율")
+    parser.add_argument("--fixtures", help="실제 상품 사진 디렉토리 (jpg/png/webp)")
+    parser.add_argument("--skip-rembg", action="store_true", help="배경 제거 생략 (모델 다운로드 불가 환경)")
+    parser.add_argument("--rembg-model", default=None, help="기본: settings.REMBG_MODEL")
+    add_arguments(parser, output="benchmarks/results/bench_pipeline.json")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    ratios = [r.strip() for r in args.ratios.split(",") if r.strip()]
+    unknown = [s for s in stages if s not in STAGES] + [r for r in ratios if r not in INSTAGRAM_RATIOS]
+    if unknown:
+        parser.error(f"Unknown stage/ratio: {', '.join(unknown)}")
+
+    # 단계 함수의 INFO 로그가 측정 출력에 섞이지 않도록
+    logging.basicConfig(level=logging.WARNING)
+
+    rembg_service = None
+    if "rembg" in stages and not args.skip_rembg:
+        from config import settings
+        from app.services.ai.background import BackgroundRemovalService
+        rembg_service = BackgroundRemovalService(model=args.rembg_model or settings.REMBG_MODEL)
+        rembg_service.warmup()
+
+    harness = Harness(repeat=args.repeat, warmup=args.warmup, memory=not args.no_memory)
+    images = load_images(args.fixtures, ratios)
+    for (name, ratio), image in images.items():
+        for stage, variant, func in stage_cases(stages, image, ratio, rembg_service):
+            width, height = image.size
+            harness.measure(stage, func, variant=variant, image=name, ratio=ratio, size=f"{width}x{height}")
+
+    return finish(harness, args, rembg_model=rembg_service.model if rembg_service else None)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
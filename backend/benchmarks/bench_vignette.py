@@ -0,0 +1,82 @@
+"""
+Vignette micro-benchmark
+기존 픽셀 루프 구현과 벡터화 마스크(콜드/웜 캐시)를 Instagram 프리셋 크기별로 비교
+
+Usage (backend 디렉토리에서):
+    python -m benchmarks.bench_vignette
+    python -m benchmarks.bench_vignette --strength 0.2 --repeat 5 --skip-legacy
+"""
+import argparse
+import time
+
+import numpy as np
+from PIL import Image
+
+from app.services.ai.img_processing import INSTAGRAM_RATIOS
+from app.services.ai.vignette import build_vignette_mask, clear_mask_cache
+
+
+def legacy_mask(width: int, height: int, strength: float) -> np.ndarray:
+    """기존 StyleProcessor.add_vignette 의 픽셀 단위 루프 (비교 기준)"""
+    center_x, center_y = width // 2, height // 2
+    max_dist = np.sqrt(center_x**2 + center_y**2)
+
+    vignette = Image.new('L', (width, height), 255)
+    vignette_array = np.array(vignette).astype(np.float32)
+
+    for y in range(height):
+        for x in range(width):
+            dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
+            vignette_array[y, x] = 255 * (1 - strength * (dist / max_dist))
+
+    return vignette_array.astype(np.uint8)
+
+
+def best_of(func, repeat: int) -> float:
+    """repeat 회 실행 중 최소 시간 (초)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vignette mask micro-benchmark")
+    parser.add_argument("--strength", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy", action="store_true", help="픽셀 루프 측정 생략 (느림)")
+    args = parser.parse_args()
+
+    print(f"{'ratio':>6} {'size':>11} {'legacy':>10} {'cold':>10} {'warm':>10} {'speedup':>9}")
+
+    for ratio, (width, height) in INSTAGRAM_RATIOS.items():
+        def cold():
+            clear_mask_cache()
+            build_vignette_mask(width, height, args.strength)
+
+        cold_time = best_of(cold, args.repeat)
+        warm_time = best_of(lambda: build_vignette_mask(width, height, args.strength), args.repeat)
+
+        if args.skip_legacy:
+            legacy_time = None
+        else:
+            # 레거시 루프는 수 초 걸리므로 1회만 측정하고 결과 동일성도 확인
+            start = time.perf_counter()
+            expected = legacy_mask(width, height, args.strength)
+            legacy_time = time.perf_counter() - start
+            clear_mask_cache()
+            if not np.array_equal(expected, build_vignette_mask(width, height, args.strength)):
+                print(f"⚠️  {ratio}: vectorized mask differs from legacy output")
+
+        legacy_col = f"{legacy_time * 1000:9.1f}ms" if legacy_time else f"{'-':>10}"
+        speedup_col = f"{legacy_time / cold_time:8.0f}x" if legacy_time else f"{'-':>9}"
+        print(
+            f"{ratio:>6} {width:>5}x{height:<5} {legacy_col} "
+            f"{cold_time * 1000:8.2f}ms {warm_time * 1000:8.4f}ms {speedup_col}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Benchmark harness
+단계별 wall time / 피크 RSS / 할당량 측정 → JSON 결과 저장 → 기준(baseline) 결과와 비교
+
+- 시간 측정 패스와 메모리 측정 패스를 분리 (tracemalloc 오버헤드가 시간에 섞이지 않도록)
+- 피크 RSS: 측정 중 /proc/self/statm 을 샘플링 (없으면 ru_maxrss)
+- 할당량: tracemalloc 피크 (Python 객체 + numpy 배열, Pillow/OpenCV 내부 버퍼는 RSS 로만 보임)
+- 결과 키 (stage, variant, image, ratio) 기준으로 baseline 과 비교해 회귀 표시
+
+Usage:
+    harness = Harness(repeat=5, warmup=1)
+    harness.measure("style", lambda: ..., variant="mood", image="synthetic", ratio="4:5")
+    harness.write("benchmarks/results/bench_pipeline.json", args=vars(args))
+    regressions = compare(harness.results, load_results("baseline.json"), threshold=0.1)
+"""
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULT_KEY_FIELDS = ("stage", "variant", "image", "ratio")
+
+# 비교 지표: (결과 필드, 표시 이름)
+COMPARED_METRICS = (
+    ("median_ms", "time"),
+    ("alloc_peak_mb", "alloc"),
+)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> Optional[int]:
+    """현재 RSS (바이트, /proc 가 없는 플랫폼은 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return None
+
+
+def max_rss() -> int:
+    """프로세스 수명 동안의 최대 RSS (바이트)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 는 KB, macOS 는 바이트
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler:
+    """측정 구간 동안 RSS 를 주기적으로 읽어 피크 기록 (with 블록)"""
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            rss = current_rss()
+            if rss is not None:
+                self.peak_rss = max(self.peak_rss, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        rss = current_rss()
+        if rss is None:
+            self.start_rss = self.peak_rss = max_rss()
+            return self
+        self.start_rss = self.peak_rss = rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._thread is None:
+            self.peak_rss = max_rss()
+            return
+        self._stop.set()
+        self._thread.join()
+        rss = current_rss()
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss, rss)
+
+
+async def heartbeat(stop: asyncio.Event, lags: List[float], interval: float = 0.005) -> None:
+    """
+    interval 마다 깨어나 예정보다 늦어진 시간(초)을 lags 에 기록 (이벤트 루프 지연 측정)
+    이벤트 루프를 막는 동기 작업(bcrypt, 동기 DB 호출)이 있으면 그만큼 늦어짐
+    """
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+def environment() -> Dict[str, Any]:
+    """결과 해석에 필요한 실행 환경 (라이브러리 버전, CPU, 커밋)"""
+    versions = {}
+    for module in ("numpy", "PIL", "cv2", "onnxruntime", "rembg", "bcrypt", "sqlalchemy", "aiosqlite", "asyncpg"):
+        try:
+            versions[module] = getattr(__import__(module), "__version__", "unknown")
+        except Exception:
+            continue
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "threads": {
+            name: os.environ.get(name)
+            for name in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+            if os.environ.get(name)
+        },
+        "versions": versions,
+    }
+
+
+class Harness:
+    """
+    단계 측정기
+
+    Args:
+        repeat: 시간 측정 반복 횟수 (min / median / mean 보고)
+        warmup: 측정 전 실행 횟수 (캐시/지연 로딩 제외)
+        memory: 메모리 측정 패스 실행 여부 (RSS 샘플링 + tracemalloc)
+    """
+
+    def __init__(self, repeat: int = 5, warmup: int = 1, memory: bool = True):
+        self.repeat = repeat
+        self.warmup = warmup
+        self.memory = memory
+        self.results: List[Dict[str, Any]] = []
+
+    def measure(
+        self,
+        stage: str,
+        func: Callable[[], Any],
+        variant: str = "",
+        image: str = "",
+        ratio: str = "",
+        **extra: Any
+    ) -> Dict[str, Any]:
+        """
+        func 실행 시간/메모리 측정 후 results 에 추가
+
+        Returns:
+            결과 dict (stage, variant, image, ratio, min_ms, median_ms, mean_ms,
+            peak_rss_mb, rss_delta_mb, alloc_peak_mb, 추가 필드)
+        """
+        for _ in range(self.warmup):
+            func()
+
+        samples = []
+        for _ in range(self.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+
+        result: Dict[str, Any] = {
+            "stage": stage,
+            "variant": variant,
+            "image": image,
+            "ratio": ratio,
+            "repeat": self.repeat,
+            "min_ms": round(min(samples), 3),
+            "median_ms": round(statistics.median(samples), 3),
+            "mean_ms": round(statistics.fmean(samples), 3),
+            **extra,
+        }
+
+        if self.memory:
+            gc.collect()
+            with RSSSampler() as sampler:
+                tracemalloc.start()
+                try:
+                    func()
+                    _, alloc_peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+            result["peak_rss_mb"] = round(sampler.peak_rss / 2**20, 2)
+            result["rss_delta_mb"] = round((sampler.peak_rss - sampler.start_rss) / 2**20, 2)
+            result["alloc_peak_mb"] = round(alloc_peak / 2**20, 2)
+
+        self.results.append(result)
+        return result
+
+    def write(self, path: str, **meta: Any) -> None:
+        """결과 JSON 저장 (environment + meta + results)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        document = {"environment": environment(), **meta, "results": self.results}
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+
+
+def result_key(result: Dict[str, Any]) -> Tuple[str, ...]:
+    return tuple(str(result.get(field, "")) for field in RESULT_KEY_FIELDS)
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    """저장된 결과 JSON 의 results 목록"""
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    threshold: float = 0.10,
+    min_delta_ms: float = 1.0
+) -> List[Dict[str, Any]]:
+    """
+    baseline 대비 회귀 목록
+
+    Args:
+        threshold: 허용 증가율 (0.10 = 10%)
+        min_delta_ms: 이보다 작은 시간 증가는 무시 (수 ms 단계의 측정 잡음)
+
+    Returns:
+        [{key, metric, baseline, current, change}] (change = 증가율)
+    """
+    previous = {result_key(r): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result_key(result))
+        if base is None:
+            continue
+        for field, metric in COMPARED_METRICS:
+            old, new = base.get(field), result.get(field)
+            if not old or new is None:
+                continue
+            if field.endswith("_ms") and new - old < min_delta_ms:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append({
+                    "key": "/".join(k for k in result_key(result) if k),
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": round(change, 3),
+                })
+    return regressions
+
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[List[Dict[str, Any]]] = None) -> None:
+    """결과 표 (baseline 이 있으면 시간 변화율 포함)"""
+    previous = {result_key(r): r for r in baseline or []}
+    print(
+        f"{'stage':<18} {'variant':<10} {'image':<12} {'ratio':>5} "
+        f"{'median':>10} {'min':>10} {'rss+':>8} {'alloc':>8} {'vs base':>8}"
+    )
+    for result in results:
+        base = previous.get(result_key(result))
+        change = (
+            f"{(result['median_ms'] - base['median_ms']) / base['median_ms']:+7.1%}"
+            if base and base.get("median_ms") else f"{'-':>8}"
+        )
+        memory = (
+            f"{result['rss_delta_mb']:6.1f}MB {result['alloc_peak_mb']:6.1f}MB"
+            if "alloc_peak_mb" in result else f"{'-':>8} {'-':>8}"
+        )
+        print(
+            f"{result['stage']:<18} {result['variant']:<10} {result['image']:<12} {result['ratio']:>5} "
+            f"{result['median_ms']:8.2f}ms {result['min_ms']:8.2f}ms {memory} {change}"
+        )
+
+
+def report_regressions(regressions: List[Dict[str, Any]], threshold: float) -> None:
+    if not regressions:
+        print(f"\n✅ No regressions over {threshold:.0%}")
+        return
+    print(f"\n⚠️  {len(regressions)} regression(s) over {threshold:.0%}:")
+    for r in regressions:
+        print(f"  {r['key']:<40} {r['metric']:<6} {r['baseline']} → {r['current']} ({r['change']:+.1%})")
+
+
+def add_arguments(parser, output: str) -> None:
+    """공통 CLI 옵션 (반복 횟수, 결과 경로, baseline 비교)"""
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="RSS / tracemalloc 측정 생략")
+    parser.add_argument("--output", default=output, help="결과 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON (회귀 시 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="회귀 판정 증가율 (기본 10%%)")
+
+
+def finish(harness: Harness, args, **meta: Any) -> int:
+    """
+    결과 출력 + JSON 저장 + baseline 비교
+
+    Returns:
+        종료 코드 (회귀가 있으면 1)
+    """
+    baseline = load_results(args.baseline) if args.baseline else None
+    print_results(harness.results, baseline)
+    harness.write(args.output, args=vars(args), **meta)
+    print(f"\n📄 Results: {args.output}")
+    if baseline is None:
+        return 0
+    regressions = compare(harness.results, baseline, threshold=args.threshold)
+    report_regressions(regressions, args.threshold)
+    return 1 if regressions else 0
@@ -16,18 +16,118 @@ class Settings(BaseSettings):
     DB_PASSWORD: Optional[str] = None
     DB_NAME: str = "adgen_ai"
     
+    # ===== DB Connection Pool (None 이면 ENVIRONMENT 별 기본값, app/db/base.py POOL_DEFAULTS) =====
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: float = 30.0  # 체크아웃 대기 한도 (초과 시 TimeoutError)
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # 오래된 연결 교체 (Cloud SQL / 프록시의 유휴 연결 종료 대비)
+    DB_POOL_PRE_PING: bool = True  # 체크아웃 시 연결 확인 (끊긴 연결 자동 교체)
+    
     # ===== JWT =====
     JWT_SECRET_KEY: str = "default-secret-key-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # ===== Password Hashing =====
+    BCRYPT_ROUNDS: int = 12  # work factor (변경 시 다음 로그인에서 재해싱)
+    PASSWORD_HASH_WORKERS: int = 4  # 해싱 전용 스레드 수 (0 이면 이벤트 루프에서 직접 실행)
+    
+    # ===== User Principal Cache (get_current_user DB 조회 생략) =====
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL_SECONDS: float = 60.0  # 토큰 만료가 더 이르면 만료까지
+    USER_CACHE_MAX_ENTRIES: int = 10000
+    
     # ===== GCS =====
     GCS_BUCKET_NAME: Optional[str] = None
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None  # ✅ 추가
+    STORAGE_EMULATOR_HOST: Optional[str] = None  # GCS 에뮬레이터 주소 (예: http://127.0.0.1:9200, fakes/gcs_server.py)
+    
+    # ===== Storage =====
+    STORAGE_BACKEND: str = "gcs"  # gcs | local (로컬 개발/테스트)
+    LOCAL_STORAGE_DIR: str = "uploads"  # STORAGE_BACKEND=local 일 때 저장 경로 (/uploads 로 제공)
+    LOCAL_STORAGE_PUBLIC_BASE_URL: Optional[str] = None  # 로컬 파일의 외부 접근 주소 (예: http://127.0.0.1:8000)
+    STORAGE_MAX_WORKERS: int = 8  # 블로킹 스토리지 호출용 스레드 수
+    STORAGE_HTTP_POOL_SIZE: int = 16  # GCS HTTP 커넥션 풀 크기 (STORAGE_MAX_WORKERS 이상 권장)
+    STORAGE_CONNECT_TIMEOUT: float = 5.0
+    STORAGE_READ_TIMEOUT: float = 60.0
+    STORAGE_UPLOAD_CHUNK_KB: int = 1024  # 스트림 업로드 청크 (GCS: 256KB 배수)
+    
+    # ===== Upload Derivatives (긴 변 기준 해상도 사다리) =====
+    DERIVATIVE_SIZES: List[int] = [150, 300, 720, 1080]
+    DERIVATIVE_FORMATS: List[str] = ["webp", "avif"]  # avif 는 pillow-avif-plugin 설치 시에만 생성
+    DERIVATIVE_WEBP_QUALITY: int = 80
+    DERIVATIVE_AVIF_QUALITY: int = 60
+    
+    # ===== Content Listing (GET /api/contents, keyset 페이지) =====
+    CONTENTS_PAGE_SIZE: int = 50  # limit 생략 시
+    CONTENTS_MAX_PAGE_SIZE: int = 200  # limit 상한
     
     # ===== Replicate API =====
     REPLICATE_API_TOKEN: Optional[str] = None  # ✅ 새로 추가
+    REPLICATE_BASE_URL: Optional[str] = None  # 기본값 https://api.replicate.com (로컬: fakes/replicate_server.py)
+    REPLICATE_HTTP_POOL_SIZE: int = 20
+    REPLICATE_CONNECT_TIMEOUT: float = 5.0
+    REPLICATE_READ_TIMEOUT: float = 30.0
+    REPLICATE_POLL_INTERVAL: float = 0.5  # 첫 폴링 간격 (1.5배씩 증가)
+    REPLICATE_MAX_POLL_INTERVAL: float = 3.0
+    REPLICATE_PREDICTION_TIMEOUT_SECONDS: float = 180.0  # 초과 시 prediction 취소
+    REPLICATE_MAX_OUTPUT_MB: int = 30
+    REPLICATE_INPUT_TRANSPORT: str = "auto"  # auto | url | data_uri (auto: 서명 URL 가능하면 url)
+    REPLICATE_INPUT_FORMAT: str = "png"  # png | webp (무손실)
+    REPLICATE_INPUT_PNG_COMPRESS_LEVEL: int = 1
+    REPLICATE_INPUT_URL_TTL_SECONDS: int = 3600
     
+    # ===== Replicate Resilience (동시성 제한 / 재시도 예산 / 서킷 브레이커) =====
+    REPLICATE_MAX_CONCURRENCY: int = 10  # 전체 동시 prediction 수
+    REPLICATE_MAX_CONCURRENCY_PER_USER: int = 3  # 요청자별 동시 prediction 수 (로그인 사용자 / 비로그인은 클라이언트 IP, 초과 대기 → 429)
+    TRUSTED_PROXY_HOPS: int = 0  # 앞단 프록시 수 (Cloud Run: 1) → X-Forwarded-For 뒤에서 이 위치의 주소를 클라이언트 IP 로 사용
+    REPLICATE_QUEUE_TIMEOUT_SECONDS: float = 30.0  # 슬롯 대기 한도
+    REPLICATE_MAX_ATTEMPTS: int = 3  # 일시 장애(연결 오류, 429, 5xx) 시 시도 횟수
+    REPLICATE_RETRY_BASE_DELAY: float = 0.5  # 지수 백오프 시작 (jitter 포함)
+    REPLICATE_RETRY_MAX_DELAY: float = 8.0
+    REPLICATE_RETRY_BUDGET_RATIO: float = 0.2  # 최근 요청 수 대비 재시도 허용 비율
+    REPLICATE_RETRY_BUDGET_MIN: int = 3  # 창 안에서 항상 허용되는 재시도 수
+    REPLICATE_RETRY_BUDGET_WINDOW_SECONDS: float = 10.0
+    REPLICATE_BREAKER_FAILURE_THRESHOLD: int = 5  # 연속 실패 시 서킷 open (503)
+    REPLICATE_BREAKER_RECOVERY_SECONDS: float = 30.0  # open 유지 시간 (이후 시험 호출 1회)
+    REPLICATE_HEDGE_DELAY_SECONDS: Optional[float] = None  # 설정 시 지연된 prediction 을 하나 더 실행 (비용 증가)
+    
+    # ===== Generation Cache (같은 이미지 + 스타일 + 시드 → 저장된 결과 재사용) =====
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_DETERMINISTIC_SEED: bool = True  # 시드 미지정 시 이미지 + 스타일로 시드 결정 (False: 랜덤 시드, 캐시 안 함)
+    GENERATION_FANOUT_CONCURRENCY: int = 3  # /generate-ad/styles 동시 prediction 수
+    GENERATION_OUTPUT_FORMATS: List[str] = ["jpeg", "png", "webp"]  # 변환 없이 저장하는 출력 포맷 (그 외 JPEG 변환)
+    
+    # ===== Generation Jobs (비동기 /generate-ad) =====
+    JOB_WORKERS: int = 2  # 동시에 실행되는 생성 작업 수
+    JOB_WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    JOB_WEBHOOK_ALLOWED_HOSTS: List[str] = []  # 비어 있으면 공인 IP 로 해석되는 호스트만 허용 (사설/루프백/링크로컬 차단)
+    JOB_SSE_HEARTBEAT_SECONDS: float = 15.0
+    JOB_LEASE_SECONDS: float = 60.0  # 실행 인스턴스 리스 (갱신이 끊기면 이 시간 후 다른 인스턴스가 회수)
+    JOB_LEASE_RENEW_SECONDS: float = 20.0  # 리스 연장 + 만료 작업 회수 주기 (JOB_LEASE_SECONDS 보다 충분히 작게)
+
+    # ===== Image Processing Executor =====
+    IMAGE_EXECUTOR: str = "process"  # process | thread
+    IMAGE_WORKERS: int = 2
+    IMAGE_QUEUE_SIZE: int = 8  # 워커가 모두 바쁠 때 대기 가능한 요청 수
+    IMAGE_RETRY_AFTER_SECONDS: int = 5
+
+    # ===== Background Removal (rembg) =====
+    REMBG_MODEL: str = "u2net"  # u2net | u2netp | isnet-general-use | silueta
+    REMBG_WARMUP: bool = True  # 시작 시 더미 추론으로 모델 로드
+    REMBG_MAX_BATCH_SIZE: int = 8
+    REMBG_BATCH_WAIT_MS: float = 0  # 단건 요청을 모으는 시간 (0 = 끔, 동시 요청이 많을 때만 켜기: 대기 시간만큼 단건 지연 증가)
+
+    # ===== Remove-Background Result Cache =====
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MASK_MB: int = 64
+    RESULT_CACHE_STYLED_MB: int = 256
+    RESULT_CACHE_ENCODED_MB: int = 128
+    # 디스크 캐시 경로 (None 이면 메모리만). uploads/ (LOCAL_STORAGE_DIR) 는 /uploads 로 공개 제공되므로
+    # 그 아래에 두지 않음 → 예: cache/results
+    RESULT_CACHE_DISK_DIR: Optional[str] = None
+    RESULT_CACHE_DISK_MB: int = 1024
+
     # ===== CORS =====
     allow_origins: List[str] = [
         "http://localhost:3000",
@@ -0,0 +1,269 @@
+"""
+Fake GCS Server (로컬 테스트 / 부하 테스트용)
+google-cloud-storage 클라이언트가 사용하는 JSON API 중 백엔드(app/core/storage.py)가 쓰는 부분만 흉내냄
+객체는 --directory 아래 {bucket}/{object} 파일로 저장
+- POST /upload/storage/v1/b/{bucket}/o?uploadType=multipart|media  (upload_from_string)
+- POST /upload/storage/v1/b/{bucket}/o?uploadType=resumable        (create_resumable_upload_session)
+- PUT / DELETE /upload/storage/v1/b/{bucket}/o?upload_id=...        (Content-Range 청크, 308 / 200)
+- GET /storage/v1/b/{bucket}/o/{object}                             (메타데이터, exists)
+- GET /download/storage/v1/b/{bucket}/o/{object}?alt=media          (download_as_bytes)
+- GET /{bucket}/{object}                                            (public_url / 서명 URL 대용)
+- 지연 주입: --latency (요청마다 추가 지연, 실제 GCS 왕복 시간 흉내)
+
+실행:
+    python -m fakes.gcs_server --port 9200 --directory /tmp/fake-gcs
+    STORAGE_BACKEND=gcs STORAGE_EMULATOR_HOST=http://127.0.0.1:9200 GCS_BUCKET_NAME=adgen uvicorn main:app
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+METADATA_SUFFIX = ".gcs-meta.json"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _parse_multipart(body: bytes, content_type: str) -> Tuple[Dict[str, Any], bytes]:
+    """multipart/related (JSON 메타데이터 + 미디어) 분리"""
+    boundary = content_type.split("boundary=", 1)[1].strip('"').encode()
+    parts = body.split(b"--" + boundary)
+    metadata_part, media_part = parts[1], parts[2]
+    metadata = json.loads(metadata_part.split(b"\r\n\r\n", 1)[1].strip())
+    media = media_part.split(b"\r\n\r\n", 1)[1]
+    if media.endswith(b"\r\n"):
+        media = media[:-2]
+    return metadata, media
+
+
+def _parse_content_range(value: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    """'bytes 0-99/*' → (0, 99, None), 'bytes */100' → (None, None, 100)"""
+    spec = value.split(" ", 1)[1]
+    byte_range, total = spec.split("/", 1)
+    total_size = None if total == "*" else int(total)
+    if byte_range == "*":
+        return None, None, total_size
+    start, end = byte_range.split("-", 1)
+    return int(start), int(end), total_size
+
+
+def create_app(directory: str, latency: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake GCS")
+    os.makedirs(directory, exist_ok=True)
+    uploads_dir = os.path.join(directory, ".uploads")
+    os.makedirs(uploads_dir, exist_ok=True)
+    # upload_id → (bucket, name, content_type, 수신 바이트)
+    sessions: Dict[str, Dict[str, Any]] = {}
+    stats = {"uploads": 0, "downloads": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def object_path(bucket: str, name: str) -> str:
+        path = os.path.normpath(os.path.join(directory, bucket, name))
+        if not path.startswith(os.path.join(directory, bucket) + os.sep):
+            raise HTTPException(status_code=400, detail="Invalid object name")
+        return path
+
+    def resource(request: Request, bucket: str, name: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        base = str(request.base_url).rstrip("/")
+        return {
+            "kind": "storage#object",
+            "id": f"{bucket}/{name}/1",
+            "bucket": bucket,
+            "name": name,
+            "generation": "1",
+            "metageneration": "1",
+            "mediaLink": f"{base}/download/storage/v1/b/{bucket}/o/{quote(name, safe='')}?alt=media",
+            **metadata,
+        }
+
+    def write_object(bucket: str, name: str, data: bytes, content_type: str) -> Dict[str, Any]:
+        path = object_path(bucket, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        metadata = {
+            "contentType": content_type,
+            "size": str(len(data)),
+            "md5Hash": base64.b64encode(hashlib.md5(data).digest()).decode(),
+            "timeCreated": _now(),
+            "updated": _now(),
+        }
+        with open(path + METADATA_SUFFIX, "w") as f:
+            json.dump(metadata, f)
+        stats["uploads"] += 1
+        stats["bytes_in"] += len(data)
+        return metadata
+
+    def read_metadata(bucket: str, name: str) -> Dict[str, Any]:
+        try:
+            with open(object_path(bucket, name) + METADATA_SUFFIX) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"No such object: {bucket}/{name}")
+
+    def read_object(bucket: str, name: str) -> bytes:
+        try:
+            with open(object_path(bucket, name), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"No such object: {bucket}/{name}")
+        stats["downloads"] += 1
+        stats["bytes_out"] += len(data)
+        return data
+
+    async def media_response(bucket: str, name: str) -> Response:
+        metadata = await asyncio.to_thread(read_metadata, bucket, name)
+        data = await asyncio.to_thread(read_object, bucket, name)
+        return Response(
+            content=data,
+            media_type=metadata.get("contentType", "application/octet-stream"),
+            headers={"x-goog-hash": f"md5={metadata['md5Hash']}"}
+        )
+
+    @app.middleware("http")
+    async def inject_latency(request: Request, call_next):
+        if latency > 0 and not request.url.path.startswith("/_stats"):
+            await asyncio.sleep(latency)
+        return await call_next(request)
+
+    @app.get("/_stats")
+    async def get_stats():
+        return {**stats, "open_sessions": len(sessions)}
+
+    @app.post("/upload/storage/v1/b/{bucket}/o")
+    async def upload(bucket: str, request: Request):
+        upload_type = request.query_params.get("uploadType")
+        body = await request.body()
+
+        if upload_type == "multipart":
+            metadata, data = _parse_multipart(body, request.headers["content-type"])
+            name = metadata["name"]
+            content_type = metadata.get("contentType") or "application/octet-stream"
+        elif upload_type == "media":
+            name = request.query_params["name"]
+            data = body
+            content_type = request.headers.get("content-type", "application/octet-stream")
+        elif upload_type == "resumable":
+            metadata = json.loads(body) if body else {}
+            name = metadata.get("name") or request.query_params["name"]
+            upload_id = uuid.uuid4().hex
+            sessions[upload_id] = {
+                "bucket": bucket,
+                "name": name,
+                "content_type": metadata.get("contentType")
+                    or request.headers.get("x-upload-content-type", "application/octet-stream"),
+                "received": 0,
+            }
+            open(os.path.join(uploads_dir, upload_id), "wb").close()
+            base = str(request.base_url).rstrip("/")
+            location = f"{base}/upload/storage/v1/b/{bucket}/o?uploadType=resumable&upload_id={upload_id}"
+            return Response(status_code=200, headers={"Location": location})
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported uploadType: {upload_type}")
+
+        metadata = await asyncio.to_thread(write_object, bucket, name, data, content_type)
+        return resource(request, bucket, name, metadata)
+
+    @app.put("/upload/storage/v1/b/{bucket}/o")
+    async def upload_chunk(bucket: str, request: Request):
+        upload_id = request.query_params.get("upload_id")
+        session = sessions.get(upload_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="No such upload session")
+
+        body = await request.body()
+        content_range = request.headers.get("content-range")
+        if content_range:
+            start, _, total = _parse_content_range(content_range)
+        else:
+            # 한 번에 전체 전송
+            start, total = 0, len(body)
+        if start is not None and start != session["received"]:
+            raise HTTPException(status_code=400, detail=f"Expected offset {session['received']}, got {start}")
+
+        part_path = os.path.join(uploads_dir, upload_id)
+        if body:
+            def append():
+                with open(part_path, "ab") as f:
+                    f.write(body)
+            await asyncio.to_thread(append)
+            session["received"] += len(body)
+
+        if total is None or session["received"] < total:
+            headers = {"Range": f"bytes=0-{session['received'] - 1}"} if session["received"] else {}
+            return Response(status_code=308, headers=headers)
+
+        def finish() -> Dict[str, Any]:
+            with open(part_path, "rb") as f:
+                data = f.read()
+            os.remove(part_path)
+            return write_object(session["bucket"], session["name"], data, session["content_type"])
+
+        metadata = await asyncio.to_thread(finish)
+        del sessions[upload_id]
+        return JSONResponse(resource(request, session["bucket"], session["name"], metadata))
+
+    @app.delete("/upload/storage/v1/b/{bucket}/o")
+    async def cancel_upload(bucket: str, request: Request):
+        upload_id = request.query_params.get("upload_id")
+        if sessions.pop(upload_id, None) is not None:
+            part_path = os.path.join(uploads_dir, upload_id)
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        # 실제 GCS 도 취소된 세션에 499 반환
+        return Response(status_code=499)
+
+    @app.get("/storage/v1/b/{bucket}/o/{name:path}")
+    async def get_object(bucket: str, name: str, request: Request):
+        if request.query_params.get("alt") == "media":
+            return await media_response(bucket, name)
+        metadata = await asyncio.to_thread(read_metadata, bucket, name)
+        return resource(request, bucket, name, metadata)
+
+    @app.delete("/storage/v1/b/{bucket}/o/{name:path}")
+    async def delete_object(bucket: str, name: str):
+        path = object_path(bucket, name)
+        if not os.path.exists(path):
+            raise HTTPException(status_code=404, detail=f"No such object: {bucket}/{name}")
+        os.remove(path)
+        os.remove(path + METADATA_SUFFIX)
+        return Response(status_code=204)
+
+    @app.get("/download/storage/v1/b/{bucket}/o/{name:path}")
+    async def download(bucket: str, name: str):
+        return await media_response(bucket, name)
+
+    @app.get("/{bucket}/{name:path}")
+    async def public_object(bucket: str, name: str):
+        return await media_response(bucket, name)
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake GCS server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--directory", default="fake-gcs", help="객체 저장 경로")
+    parser.add_argument("--latency", type=float, default=0.0, help="요청마다 추가 지연 (초)")
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.directory, args.latency), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
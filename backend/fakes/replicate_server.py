@@ -0,0 +1,225 @@
+"""
+Fake Replicate API Server (로컬 테스트용)
+Replicate prediction API 중 백엔드가 사용하는 부분만 흉내냄
+- POST /v1/predictions, GET /v1/predictions/{id}, POST /v1/predictions/{id}/cancel
+- GET /files/{id}.png: 입력 이미지를 단색 배경 위에 합성한 출력 이미지
+- 입력 이미지는 data URI 또는 http(s) URL (서명 URL 전송 확인용)
+- 장애 주입: 지연 편차(jitter), prediction 생성 오류율(429/5xx), 폴링 오류율, prediction 실패율
+  GET/POST /_faults 로 실행 중 변경 (서킷 브레이커/재시도 확인용)
+
+실행:
+    python -m fakes.replicate_server --port 9100 --latency 2.0
+    python -m fakes.replicate_server --port 9100 --latency 2.0 --jitter 1.0 --error-rate 0.3 --error-status 503
+    python -m fakes.replicate_server --port 9100 --poll-error-rate 0.5
+    REPLICATE_BASE_URL=http://127.0.0.1:9100 uvicorn main:app
+
+    curl -X POST localhost:9100/_faults -H 'Content-Type: application/json' -d '{"error_rate": 1.0}'
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from PIL import Image
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _load_input_image(value: str) -> Optional[Image.Image]:
+    if not isinstance(value, str):
+        return None
+    if value.startswith("data:"):
+        _, encoded = value.split(",", 1)
+        return Image.open(io.BytesIO(base64.b64decode(encoded)))
+    if value.startswith(("http://", "https://")):
+        response = httpx.get(value, timeout=30.0, follow_redirects=True)
+        response.raise_for_status()
+        return Image.open(io.BytesIO(response.content))
+    return None
+
+
+def render_output(model_input: Dict[str, Any]) -> bytes:
+    """입력 이미지를 프롬프트 해시 색상 배경에 합성 (SDXL 출력 대용)"""
+    width = int(model_input.get("width", 1024))
+    height = int(model_input.get("height", 1024))
+    digest = hashlib.md5(str(model_input.get("prompt", "")).encode()).digest()
+    canvas = Image.new("RGB", (width, height), tuple(digest[:3]))
+
+    product = _load_input_image(model_input.get("image"))
+    if product is not None:
+        product = product.convert("RGBA").resize((width, height))
+        canvas.paste(product, (0, 0), product)
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+
+def create_app(
+    latency: float = 2.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    error_status: int = 503,
+    fail_rate: float = 0.0,
+    poll_error_rate: float = 0.0
+) -> FastAPI:
+    """
+    Args:
+        latency: prediction 생성부터 succeeded 까지 걸리는 시간 (초)
+        jitter: prediction 마다 latency 에 더해지는 0~jitter 초 무작위 지연
+        error_rate: prediction 생성 요청이 error_status 로 실패할 확률 (0~1)
+        error_status: 주입할 HTTP 상태 코드 (429 / 500 / 503 ...)
+        fail_rate: prediction 이 status=failed 로 끝날 확률 (0~1)
+        poll_error_rate: prediction 조회 요청이 error_status 로 실패할 확률 (0~1)
+    """
+    app = FastAPI(title="Fake Replicate")
+    predictions: Dict[str, Dict[str, Any]] = {}
+    faults = {
+        "latency": latency,
+        "jitter": jitter,
+        "error_rate": error_rate,
+        "error_status": error_status,
+        "fail_rate": fail_rate,
+        "poll_error_rate": poll_error_rate,
+    }
+    stats = {"created": 0, "errors": 0, "poll_errors": 0, "failed": 0, "canceled": 0}
+
+    def state(prediction_id: str, request: Request) -> Dict[str, Any]:
+        prediction = predictions.get(prediction_id)
+        if prediction is None:
+            raise HTTPException(status_code=404, detail="Prediction not found")
+
+        if prediction["status"] not in ("succeeded", "failed", "canceled"):
+            elapsed = time.monotonic() - prediction["_created"]
+            duration = prediction["_duration"]
+            if elapsed >= duration and prediction["_fail"]:
+                stats["failed"] += 1
+                prediction["status"] = "failed"
+                prediction["completed_at"] = _now()
+                prediction["error"] = "Injected failure"
+            elif elapsed >= duration:
+                prediction["status"] = "succeeded"
+                prediction["completed_at"] = _now()
+                prediction["output"] = [f"{str(request.base_url).rstrip('/')}/files/{prediction_id}.png"]
+                prediction["metrics"] = {"predict_time": round(elapsed, 3)}
+            elif elapsed >= duration * 0.2:
+                prediction["status"] = "processing"
+                prediction["started_at"] = prediction["started_at"] or _now()
+
+        return {k: v for k, v in prediction.items() if not k.startswith("_")}
+
+    def injected_error() -> JSONResponse:
+        status = int(faults["error_status"])
+        return JSONResponse(
+            status_code=status,
+            content={"title": "Injected error", "detail": f"Injected {status}", "status": status}
+        )
+
+    @app.get("/_faults")
+    async def get_faults():
+        return {**faults, "stats": stats, "active": sum(
+            1 for p in predictions.values() if p["status"] in ("starting", "processing")
+        )}
+
+    @app.post("/_faults")
+    async def set_faults(request: Request):
+        body = await request.json()
+        unknown = set(body) - set(faults)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fault settings: {sorted(unknown)}")
+        faults.update(body)
+        return faults
+
+    @app.post("/v1/predictions", status_code=201)
+    async def create_prediction(request: Request):
+        body = await request.json()
+        if random.random() < faults["error_rate"]:
+            stats["errors"] += 1
+            return injected_error()
+        stats["created"] += 1
+        prediction_id = uuid.uuid4().hex
+        predictions[prediction_id] = {
+            "id": prediction_id,
+            "model": "stability-ai/sdxl",
+            "version": body.get("version", ""),
+            "status": "starting",
+            "input": body.get("input", {}),
+            "output": None,
+            "error": None,
+            "logs": "",
+            "metrics": None,
+            "created_at": _now(),
+            "started_at": None,
+            "completed_at": None,
+            "urls": {
+                "get": f"{str(request.base_url).rstrip('/')}/v1/predictions/{prediction_id}",
+                "cancel": f"{str(request.base_url).rstrip('/')}/v1/predictions/{prediction_id}/cancel",
+            },
+            "_created": time.monotonic(),
+            "_duration": faults["latency"] + random.uniform(0, faults["jitter"]),
+            "_fail": random.random() < faults["fail_rate"],
+        }
+        return state(prediction_id, request)
+
+    @app.get("/v1/predictions/{prediction_id}")
+    async def get_prediction(prediction_id: str, request: Request):
+        if random.random() < faults["poll_error_rate"]:
+            stats["poll_errors"] += 1
+            return injected_error()
+        return state(prediction_id, request)
+
+    @app.post("/v1/predictions/{prediction_id}/cancel")
+    async def cancel_prediction(prediction_id: str, request: Request):
+        current = state(prediction_id, request)
+        if current["status"] not in ("succeeded", "failed", "canceled"):
+            stats["canceled"] += 1
+            predictions[prediction_id]["status"] = "canceled"
+            predictions[prediction_id]["completed_at"] = _now()
+        return state(prediction_id, request)
+
+    @app.get("/files/{prediction_id}.png")
+    async def get_output(prediction_id: str):
+        prediction = predictions.get(prediction_id)
+        if prediction is None or prediction["status"] != "succeeded":
+            raise HTTPException(status_code=404, detail="Output not found")
+        if "_output" not in prediction:
+            prediction["_output"] = await asyncio.to_thread(render_output, prediction["input"])
+        return Response(content=prediction["_output"], media_type="image/png")
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake Replicate API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=2.0, help="prediction 완료까지 걸리는 시간 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="prediction 별 추가 무작위 지연 최대값 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="prediction 생성 오류 확률 (0~1)")
+    parser.add_argument("--error-status", type=int, default=503, help="주입할 HTTP 상태 코드")
+    parser.add_argument("--poll-error-rate", type=float, default=0.0, help="prediction 조회 오류 확률 (0~1)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="prediction 실패(status=failed) 확률 (0~1)")
+    args = parser.parse_args()
+
+    app = create_app(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        fail_rate=args.fail_rate,
+        poll_error_rate=args.poll_error_rate
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,173 @@
+"""
+Load-test scenarios
+가상 사용자: 가입 → 로그인 → 상품 이미지 업로드 후, 가중치에 따라 동작을 반복
+동작: login / upload / list / detail / remove_background / generate_ad
+"""
+import io
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from PIL import Image, ImageDraw
+
+# 이름 → {동작: 가중치}
+MIXES: Dict[str, Dict[str, float]] = {
+    # 일반 사용 패턴: 조회 위주 + 가끔 업로드/생성
+    "default": {"list": 4, "detail": 2, "upload": 1, "remove_background": 1, "generate_ad": 1, "login": 0.5},
+    "browse": {"list": 6, "detail": 3, "login": 1},
+    "upload": {"upload": 3, "list": 1},
+    "remove_background": {"remove_background": 1},
+    "generate": {"generate_ad": 3, "list": 1},
+}
+
+PASSWORD = "loadtest-password"
+
+# app.services.ai.generation.STYLE_MAP 의 키 (드라이버는 앱 모듈/DB 설정을 import 하지 않음)
+GENERATE_STYLES = ("minimal", "vintage", "modern", "natural", "luxury")
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """'default' 또는 'list=4,upload=1' 형식"""
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in ACTIONS:
+            raise ValueError(f"Unknown action '{name.strip()}'. Choose from: {', '.join(ACTIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def product_image(seed: int, size=(900, 1125)) -> bytes:
+    """단색 배경 위 옷 형태 JPEG (사용자마다 색상 다름)"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (235, 232, 228))
+    width, height = size
+    ImageDraw.Draw(image).rounded_rectangle(
+        (width // 4, height // 6, width * 3 // 4, height * 5 // 6),
+        radius=40,
+        fill=(rng.randint(0, 200), rng.randint(0, 200), rng.randint(0, 200))
+    )
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def unique_bytes(jpeg: bytes) -> bytes:
+    """
+    EOI 뒤에 임의 바이트 추가 (디코더는 무시, 해시는 달라짐)
+    결과 캐시에 적중하지 않고 매번 실제 처리 경로를 타도록
+    """
+    return jpeg + os.urandom(16)
+
+
+class Recorder:
+    """route 별 지연 시간 / 상태 코드 기록"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, seconds: float, status: str) -> None:
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+
+
+class VirtualUser:
+    """한 명의 사용자 세션 (토큰 + 업로드한 콘텐츠)"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, index: int):
+        self.client = client
+        self.recorder = recorder
+        self.index = index
+        self.email = f"lt-{uuid.uuid4().hex[:12]}@example.com"
+        self.token: Optional[str] = None
+        self.content_ids: List[str] = []
+        self.image = product_image(index)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    async def request(self, route: str, method: str, url: str, expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        """요청 + 기록 (기대하지 않은 상태 코드 / 연결 오류는 오류로 집계)"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.record(route, time.perf_counter() - start, type(e).__name__)
+            return None
+        self.recorder.record(route, time.perf_counter() - start, str(response.status_code))
+        return response if response.status_code in expected else None
+
+    async def setup(self) -> bool:
+        """가입 + 로그인 + 첫 업로드 (측정에 포함)"""
+        await self.request(
+            "POST /api/auth/signup", "POST", "/api/auth/signup", expected=(201,),
+            json={"email": self.email, "password": PASSWORD, "name": f"loadtest {self.index}"}
+        )
+        return await self.login() and await self.upload()
+
+    async def login(self) -> bool:
+        response = await self.request(
+            "POST /api/auth/login", "POST", "/api/auth/login",
+            data={"username": self.email, "password": PASSWORD}
+        )
+        if response is None:
+            return False
+        self.token = response.json()["access_token"]
+        return True
+
+    async def upload(self) -> bool:
+        response = await self.request(
+            "POST /api/contents/upload", "POST", "/api/contents/upload", expected=(201,),
+            files={"file": ("product.jpg", unique_bytes(self.image), "image/jpeg")},
+            data={"product_name": "loadtest", "category": "top"},
+            headers=self.headers
+        )
+        if response is None:
+            return False
+        self.content_ids.append(response.json()["content_id"])
+        return True
+
+    async def list(self) -> bool:
+        return await self.request("GET /api/contents", "GET", "/api/contents", headers=self.headers) is not None
+
+    async def detail(self) -> bool:
+        content_id = random.choice(self.content_ids)
+        return await self.request(
+            "GET /api/contents/{content_id}", "GET", f"/api/contents/{content_id}", headers=self.headers
+        ) is not None
+
+    async def remove_background(self) -> bool:
+        return await self.request(
+            "POST /api/v1/remove-background", "POST", "/api/v1/remove-background",
+            files={"file": ("product.jpg", unique_bytes(self.image), "image/jpeg")},
+            data={"style": random.choice(["minimal", "mood", "street"])}
+        ) is not None
+
+    async def generate_ad(self) -> bool:
+        # 새 시드 → 생성 캐시 미적중 (Replicate 스텁까지 호출)
+        return await self.request(
+            "POST /api/v1/generate-ad", "POST", "/api/v1/generate-ad",
+            data={
+                "content_id": random.choice(self.content_ids),
+                "style": random.choice(GENERATE_STYLES),
+                "seed": str(random.randint(0, 2**31 - 1))
+            }
+        ) is not None
+
+
+ACTIONS: Dict[str, Callable[[VirtualUser], Awaitable[bool]]] = {
+    "login": VirtualUser.login,
+    "upload": VirtualUser.upload,
+    "list": VirtualUser.list,
+    "detail": VirtualUser.detail,
+    "remove_background": VirtualUser.remove_background,
+    "generate_ad": VirtualUser.generate_ad,
+}
@@ -0,0 +1,155 @@
+"""
+Local load-test stack
+GCS / Replicate / Cloud SQL 대신 로컬 대체물로 앱 전체를 띄움 (각각 별도 프로세스)
+- fakes.gcs_server: 파일시스템 기반 GCS 에뮬레이터 (STORAGE_EMULATOR_HOST)
+- fakes.replicate_server: 지연/오류 설정 가능한 Replicate 스텁 (REPLICATE_BASE_URL)
+- DB: 임시 디렉토리의 SQLite (database_url 로 로컬 Postgres 지정 가능)
+- 앱: uvicorn main:app (workers 개)
+"""
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float) -> None:
+    """url 이 200 을 반환할 때까지 대기 (프로세스가 죽으면 즉시 실패)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited with {process.returncode} before {url} was ready")
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"{url} not ready within {timeout}s")
+
+
+@dataclass
+class StackConfig:
+    """로컬 스택 설정"""
+    app_workers: int = 1
+    replicate_latency: float = 2.0
+    replicate_jitter: float = 0.0
+    replicate_error_rate: float = 0.0
+    gcs_latency: float = 0.0
+    database_url: Optional[str] = None  # None 이면 임시 SQLite
+    rembg_model: Optional[str] = None
+    app_env: Dict[str, str] = field(default_factory=dict)  # 추가 앱 설정 (예: REPLICATE_MAX_CONCURRENCY)
+    startup_timeout: float = 180.0
+    keep_data: bool = False
+
+
+class LocalStack:
+    """
+    with LocalStack(config) as stack:
+        ... stack.base_url 로 요청 ...
+    """
+
+    def __init__(self, config: StackConfig):
+        self.config = config
+        self.data_dir = ""
+        self.base_url = ""
+        self.gcs_url = ""
+        self.replicate_url = ""
+        self._processes: List[subprocess.Popen] = []
+
+    def _spawn(self, args: List[str], env: Optional[Dict[str, str]] = None, log_name: str = "") -> subprocess.Popen:
+        log = open(os.path.join(self.data_dir, f"{log_name}.log"), "wb")
+        process = subprocess.Popen(
+            [sys.executable, *args],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **(env or {})},
+            stdout=log,
+            stderr=subprocess.STDOUT
+        )
+        self._processes.append(process)
+        return process
+
+    def start(self) -> "LocalStack":
+        config = self.config
+        self.data_dir = tempfile.mkdtemp(prefix="adgen-loadtest-")
+
+        gcs_port, replicate_port, app_port = free_port(), free_port(), free_port()
+        self.gcs_url = f"http://127.0.0.1:{gcs_port}"
+        self.replicate_url = f"http://127.0.0.1:{replicate_port}"
+        self.base_url = f"http://127.0.0.1:{app_port}"
+
+        gcs = self._spawn([
+            "-m", "fakes.gcs_server",
+            "--port", str(gcs_port),
+            "--directory", os.path.join(self.data_dir, "gcs"),
+            "--latency", str(config.gcs_latency),
+        ], log_name="gcs")
+        replicate = self._spawn([
+            "-m", "fakes.replicate_server",
+            "--port", str(replicate_port),
+            "--latency", str(config.replicate_latency),
+            "--jitter", str(config.replicate_jitter),
+            "--error-rate", str(config.replicate_error_rate),
+        ], log_name="replicate")
+        wait_until_ready(f"{self.gcs_url}/_stats", gcs, 30)
+        wait_until_ready(f"{self.replicate_url}/_faults", replicate, 30)
+
+        env = {
+            "ENVIRONMENT": "loadtest",
+            "DATABASE_URL": config.database_url or f"sqlite:///{os.path.join(self.data_dir, 'loadtest.db')}",
+            "STORAGE_BACKEND": "gcs",
+            "STORAGE_EMULATOR_HOST": self.gcs_url,
+            "GCS_BUCKET_NAME": "loadtest",
+            "LOCAL_STORAGE_DIR": os.path.join(self.data_dir, "uploads"),
+            "REPLICATE_BASE_URL": self.replicate_url,
+            "REPLICATE_API_TOKEN": "loadtest",
+            **({"REMBG_MODEL": config.rembg_model} if config.rembg_model else {}),
+            **config.app_env,
+        }
+        app = self._spawn([
+            "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1",
+            "--port", str(app_port),
+            "--workers", str(config.app_workers),
+            "--log-level", "warning",
+        ], env=env, log_name="app")
+        # /health 는 lifespan (테이블 생성, rembg 워밍업) 이후 응답
+        wait_until_ready(f"{self.base_url}/health", app, config.startup_timeout)
+        return self
+
+    def stop(self) -> None:
+        for process in reversed(self._processes):
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes = []
+        if self.data_dir and not self.config.keep_data:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def __enter__(self) -> "LocalStack":
+        try:
+            return self.start()
+        except BaseException:
+            self.config.keep_data = True  # 로그 확인용
+            self.stop()
+            raise
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
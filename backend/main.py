@@ -11,8 +11,9 @@ import os
 import logging
 
 from config import settings
-from app.api.routes import auth, contents, ai_generate
+from app.api.routes import auth, contents, ai_generate, jobs, metrics
 from app.api.routes import processing as image
+from app.core.metrics import MetricsMiddleware
 
 # ===== 로깅 설정 =====
 logging.basicConfig(
@@ -29,7 +30,7 @@ print(f"DB_NAME: {settings.DB_NAME}")
 print("=" * 50)
 
 # ===== 디렉토리 생성 =====
-UPLOAD_DIR = "uploads"
+UPLOAD_DIR = settings.LOCAL_STORAGE_DIR
 STATIC_DIR = "static"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(STATIC_DIR, exist_ok=True)
@@ -43,23 +44,68 @@ async def lifespan(app: FastAPI):
     
     # ===== SQLite 테이블 자동 생성 =====
     try:
-        from app.db.base import Base, engine
-        logger.info("🔧 데이터베이스 테이블 생성 중...")
-        Base.metadata.create_all(bind=engine)
-        logger.info("✅ 데이터베이스 테이블 생성 완료")
-        
-        # 생성된 테이블 목록 출력
+        # 비동기 엔진 사용 (Cloud SQL 에서 동기 엔진이 Connector 를 하나 더 만들지 않도록)
+        from app.db.base import Base, get_async_engine
         from sqlalchemy import inspect
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
+        logger.info("🔧 데이터베이스 테이블 생성 중...")
+        async with get_async_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            logger.info("✅ 데이터베이스 테이블 생성 완료")
+            
+            # 생성된 테이블 목록 출력
+            tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
         logger.info(f"📋 생성된 테이블: {', '.join(tables)}")
         
     except Exception as e:
         logger.error(f"❌ 데이터베이스 초기화 실패: {e}")
         logger.exception(e)
     
+    # ===== 이미지 처리 워커 풀 =====
+    from app.core.executor import get_image_executor, shutdown_image_executor
+    executor = get_image_executor()
+    
+    # ===== rembg 모델 워밍업 (첫 요청의 모델 로드 지연 제거) =====
+    if settings.REMBG_WARMUP:
+        from app.services.ai.tasks import warmup_worker
+        logger.info(f"🔥 rembg 모델 워밍업 중: {settings.REMBG_MODEL}")
+        if await executor.warmup(warmup_worker):
+            logger.info("✅ rembg 모델 워밍업 완료")
+        else:
+            logger.warning("⚠️ rembg 모델 워밍업 실패 (첫 요청에서 다시 로드)")
+    
+    # ===== 생성 작업 큐 (리스가 만료된 미완료 작업 복구) =====
+    from app.core.jobs import get_job_queue, shutdown_job_queue
+    from app.services.ai.generation_jobs import recover_jobs, release_leases
+    get_job_queue().start()
+    try:
+        recovered = await recover_jobs()
+        if recovered:
+            logger.info(f"♻️ 생성 작업 {recovered}개 복구")
+    except Exception as e:
+        logger.error(f"❌ 생성 작업 복구 실패: {e}")
+    
     yield
     
+    await shutdown_job_queue()
+    try:
+        # 실행 중이던 작업은 다른 인스턴스가 리스 만료를 기다리지 않고 바로 회수
+        await release_leases()
+    except Exception as e:
+        logger.error(f"❌ 생성 작업 리스 해제 실패: {e}")
+    
+    from app.services.ai.generation import shutdown_replicate_generator
+    await shutdown_replicate_generator()
+    shutdown_image_executor()
+    
+    from app.core.security import shutdown_password_executor
+    shutdown_password_executor()
+    
+    from app.core.storage import shutdown_storage
+    shutdown_storage()
+    
+    from app.db.base import dispose_async_engine, dispose_engine
+    await dispose_async_engine()
+    dispose_engine()
     logger.info("👋 서버 종료")
 
 # ===== FastAPI 앱 생성 =====
@@ -82,8 +128,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # GET /api/contents 다음 페이지 커서
 )
 
+# ===== 요청 지연 시간 메트릭 + Server-Timing 헤더 =====
+app.add_middleware(MetricsMiddleware)
+
 # ===== 정적 파일 제공 =====
 # /uploads - 사용자 업로드 파일 (조건부)
 if os.path.exists(UPLOAD_DIR):
@@ -99,8 +149,11 @@ app.include_router(auth.router)
 app.include_router(contents.router)
 app.include_router(image.router, prefix="/api/v1", tags=["Image Processing"])
 app.include_router(ai_generate.router, prefix="/api/v1", tags=["ai"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(metrics.router)
+app.include_router(metrics.prometheus_router)
 
-logger.info("✅ 라우터 등록 완료: auth, contents, image")
+logger.info("✅ 라우터 등록 완료: auth, contents, image, ai, jobs, metrics")
 
 # ===== 루트 엔드포인트 =====
 @app.get("/")
@@ -127,14 +180,29 @@ async def root():
                 },
                 "contents": {
                     "upload": "/api/contents/upload",
-                    "list": "/api/contents",
+                    "list": "/api/contents?limit=&cursor=",
                     "detail": "/api/contents/{id}"
                 },
                 "image_processing": {
                     "remove_background": "/api/v1/remove-background",
+                    "remove_background_batch": "/api/v1/remove-background/batch",
                     "image_info": "/api/v1/image-info",
                     "health": "/api/v1/health"
                 },
+                "ai_generation": {
+                    "generate_ad": "/api/v1/generate-ad",
+                    "generate_ad_styles": "/api/v1/generate-ad/styles",
+                    "submit_job": "/api/v1/generate-ad/jobs",
+                    "job_status": "/api/v1/jobs/{job_id}",
+                    "job_events": "/api/v1/jobs/{job_id}/events"
+                },
+                "metrics": {
+                    "prometheus": "/metrics",
+                    "storage": "/api/v1/metrics/storage",
+                    "replicate": "/api/v1/metrics/replicate",
+                    "auth": "/api/v1/metrics/auth",
+                    "db": "/api/v1/metrics/db"
+                },
                 "docs": "/docs",
                 "health": "/health"
             }
@@ -0,0 +1,105 @@
+"""
+Replicate 서킷 브레이커 테스트 (fakes/replicate_server.py 의 latency 장애)
+prediction 생성은 성공하지만 완료가 제한 시간을 넘기는 경우 (Replicate 가 느림)
+→ 연속 실패가 임계값에 닿으면 서킷이 열리고, 이후 요청은 prediction 을 만들지 않고 즉시 503
+
+Usage (backend 디렉토리에서):
+    python test_replicate_breaker.py
+"""
+import os
+import socket
+import tempfile
+
+# app 모듈 import 전에 설정 (config.settings 는 import 시점에 읽음)
+with socket.socket() as _sock:
+    _sock.bind(("127.0.0.1", 0))
+    FAKE_PORT = _sock.getsockname()[1]
+os.environ.update({
+    "REPLICATE_API_TOKEN": "test",
+    "REPLICATE_BASE_URL": f"http://127.0.0.1:{FAKE_PORT}",
+    "REPLICATE_POLL_INTERVAL": "0.05",
+    "REPLICATE_MAX_POLL_INTERVAL": "0.1",
+    "REPLICATE_PREDICTION_TIMEOUT_SECONDS": "0.5",
+    "REPLICATE_BREAKER_FAILURE_THRESHOLD": "3",
+    "REPLICATE_BREAKER_RECOVERY_SECONDS": "60",
+})
+os.environ.pop("REPLICATE_HEDGE_DELAY_SECONDS", None)
+# app.db.base 가 import 시점에 엔진 생성 (Cloud SQL 대신 임시 SQLite)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("STORAGE_BACKEND", "local")
+
+import asyncio
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from fakes.replicate_server import create_app
+from app.services.ai.generation import (
+    GenerationError,
+    get_replicate_resilience,
+    run_prediction,
+    shutdown_replicate_generator,
+)
+
+MODEL_INPUT = {"prompt": "breaker test", "width": 64, "height": 64}
+
+
+def start_fake_replicate(latency: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(latency=latency), host="127.0.0.1", port=FAKE_PORT, log_level="warning"
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise TimeoutError("Fake Replicate server did not start")
+        time.sleep(0.05)
+    return server
+
+
+async def run_breaker_scenario() -> None:
+    breaker = get_replicate_resilience().breaker
+    threshold = breaker.failure_threshold
+
+    # 1. 느린 prediction: 생성은 성공, 완료 대기가 제한 시간 초과 (504)
+    for _ in range(threshold):
+        try:
+            await run_prediction(MODEL_INPUT, "breaker-test")
+        except GenerationError as e:
+            assert e.status_code == 504, e.detail
+        else:
+            raise AssertionError("Slow prediction should time out")
+    assert breaker.state == breaker.OPEN, breaker.snapshot()
+    print(f"✅ {threshold}회 제한 시간 초과 후 서킷 open: {breaker.snapshot()}")
+
+    # 2. 서킷 open: prediction 을 만들지 않고 즉시 503
+    async with httpx.AsyncClient() as client:
+        created = (await client.get(f"http://127.0.0.1:{FAKE_PORT}/_faults")).json()["stats"]["created"]
+        start = time.perf_counter()
+        try:
+            await run_prediction(MODEL_INPUT, "breaker-test")
+        except GenerationError as e:
+            assert e.status_code == 503 and "Retry-After" in e.headers, e.detail
+        else:
+            raise AssertionError("Open circuit should reject the call")
+        elapsed = time.perf_counter() - start
+        after = (await client.get(f"http://127.0.0.1:{FAKE_PORT}/_faults")).json()["stats"]["created"]
+    assert after == created, f"Prediction created while open ({created} → {after})"
+    assert elapsed < 0.1, f"Rejection took {elapsed:.3f}s"
+    print(f"✅ 서킷 open 중 요청은 {elapsed * 1000:.1f}ms 만에 503 (prediction 생성 없음)")
+
+    await shutdown_replicate_generator()
+
+
+def test_breaker_opens_on_slow_predictions():
+    server = start_fake_replicate(latency=5.0)
+    try:
+        asyncio.run(run_breaker_scenario())
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    test_breaker_opens_on_slow_predictions()
@@ -71,6 +71,8 @@ export default function DashboardPage() {
   const [error, setError] = useState<string | null>(null);
   const [resultUrl, setResultUrl] = useState<string | null>(null);
   const [processingTime, setProcessingTime] = useState<number | null>(null);
+  // 시드 미지정 시 서버가 이미지 + 스타일로 시드를 정해 같은 결과(캐시)를 반환 → "다시 생성" 은 새 시드로 요청
+  const [nextSeed, setNextSeed] = useState<number | null>(null);
 
   // 업로드 관련 상태
   const [uploadFile, setUploadFile] = useState<File | null>(null);
@@ -153,6 +155,9 @@ export default function DashboardPage() {
       const formData = new FormData();
       formData.append('content_id', selectedContent.content_id);
       formData.append('style', selectedStyle);
+      if (nextSeed !== null) {
+        formData.append('seed', String(nextSeed));
+      }
 
       const response = await fetch(`${API_URL}/api/v1/generate-ad`, {
         method: 'POST',
@@ -169,6 +174,7 @@ export default function DashboardPage() {
       const data = await response.json();
       setResultUrl(data.result_url);
       setProcessingTime(data.processing_time);
+      setNextSeed(null);
     } catch (err: any) {
       setError(err.message || 'AI 생성 중 오류가 발생했습니다.');
     } finally {
@@ -191,6 +197,7 @@ export default function DashboardPage() {
     setResultUrl(null);
     setProcessingTime(null);
     setError(null);
+    setNextSeed(Math.floor(Math.random() * 2 ** 31));
   };
 
   if (!user) {
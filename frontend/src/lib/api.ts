@@ -29,6 +29,17 @@ export const authAPI = {
 
 export const contentAPI = {
   upload: (formData: FormData) => api.post<Content>('/api/contents/upload', formData),
-  getAll: () => api.get<Content[]>('/api/contents'),
+  // 목록은 페이지 단위로 응답 → X-Next-Cursor 헤더가 없을 때까지 이어서 요청
+  getAll: async () => {
+    let response = await api.get<Content[]>('/api/contents');
+    const data = [...response.data];
+    let cursor = response.headers['x-next-cursor'];
+    while (cursor) {
+      response = await api.get<Content[]>('/api/contents', { params: { cursor } });
+      data.push(...response.data);
+      cursor = response.headers['x-next-cursor'];
+    }
+    return { ...response, data };
+  },
   getOne: (id: string) => api.get<Content>(`/api/contents/${id}`),
 };
\ No newline at end of file